@@ -0,0 +1,199 @@
+"""
+Assets - Monitor Miner v3.0
+Cache de arquivos estáticos (web/) em RAM com ETag forte
+
+- Fingerprint (sha256) de cada arquivo calculado UMA vez no boot
+- Conteúdo dos arquivos quentes mantido em LRU limitado por bytes
+- Cliente com If-None-Match igual ao ETag recebe 304 sem corpo
+- Arquivos grandes (ou frios) são transmitidos do flash por http_writer
+- Com web.pack (tools/build_bundle.py): só o índice é carregado no boot e o
+  corpo gzip sai do pacote aberto por seek(); sem pacote, arquivos soltos
+"""
+
+import gc
+import json
+import struct
+import hashlib
+import binascii
+import http_writer
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ucollections import OrderedDict
+
+CONTENT_TYPES = {
+    'html': 'text/html',
+    'css': 'text/css',
+    'js': 'application/javascript',
+    'json': 'application/json',
+}
+
+PACK_MAGIC = b'MMPK'
+GZIP_HEADERS = b'Content-Encoding: gzip\r\nVary: Accept-Encoding\r\n'
+
+def content_type(filename):
+    """Content-Type pela extensão do arquivo"""
+    ext = filename.rsplit('.', 1)[-1]
+    return CONTENT_TYPES.get(ext, 'application/octet-stream')
+
+class AssetCache:
+    """Índice de ETags + LRU de conteúdo limitado por memória"""
+
+    def __init__(self, files, max_bytes=12288, max_entry=6144, max_age=86400, pack='web.pack'):
+        self.max_bytes = max_bytes    # Total de bytes mantidos em RAM
+        self.max_entry = max_entry    # Maior arquivo que entra no cache (o resto é streaming)
+        self.max_age = max_age        # Cache-Control para CSS/JS (segundos)
+        self.index = {}               # arquivo -> (etag, tamanho, content_type, headers)
+        self.lru = OrderedDict()      # arquivo -> bytes (mais recente no fim)
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.pack = None              # Pacote aberto (seek + readinto por requisição)
+        self.packed = {}              # arquivo -> (offset, tamanho, etag, content_type, headers)
+        self.missing = set()          # Arquivos soltos ausentes (não reabre o flash a cada requisição)
+
+        if pack:
+            self.load_pack(pack, files)
+        for filename in files:
+            # Arquivo no pacote: solto só indexado se um cliente não aceitar gzip
+            if filename not in self.packed:
+                self.fingerprint(filename)
+        gc.collect()
+
+    def load_pack(self, path, files):
+        """Lê só o índice do pacote; corpos ficam no flash"""
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            print(f"[ASSETS] Sem {path} - servindo arquivos soltos")
+            return
+        try:
+            magic, size = struct.unpack('<4sI', f.read(8))
+            if magic != PACK_MAGIC:
+                raise ValueError(magic)
+            index = json.loads(f.read(size))
+        except (ValueError, OSError) as e:
+            print(f"[ASSETS] Pacote {path} inválido ({e}) - servindo arquivos soltos")
+            f.close()
+            return
+
+        for filename, offset, length, etag, ctype in index['files']:
+            if filename in files:
+                headers = f"ETag: {etag}\r\nCache-Control: {self.cache_control(filename)}\r\n".encode() + GZIP_HEADERS
+                self.packed[filename] = (offset, length, etag, ctype, headers)
+        if self.packed:
+            self.pack = f
+            print(f"[ASSETS] {path}: {len(self.packed)} arquivos gzip")
+        else:
+            f.close()
+
+    def fingerprint(self, filename):
+        """Calcula ETag e tamanho lendo o arquivo em blocos de 512 bytes"""
+        h = hashlib.sha256()
+        buf = bytearray(512)
+        mv = memoryview(buf)
+        size = 0
+        try:
+            with open(filename, 'rb') as f:
+                while True:
+                    n = f.readinto(buf)
+                    if not n:
+                        break
+                    h.update(mv[:n])
+                    size += n
+        except OSError as e:
+            print(f"[ASSETS] Erro ao indexar {filename}: {e}")
+            self.missing.add(filename)
+            return None
+
+        etag = '"' + binascii.hexlify(h.digest()[:8]).decode() + '"'
+        # Linhas ETag/Cache-Control pré-codificadas: nada é formatado por requisição
+        headers = f"ETag: {etag}\r\nCache-Control: {self.cache_control(filename)}\r\n".encode()
+        if filename in self.packed:
+            headers += b'Vary: Accept-Encoding\r\n'
+        entry = (etag, size, content_type(filename), headers)
+        self.index[filename] = entry
+        print(f"[ASSETS] {filename}: {size} bytes, ETag {etag}")
+        return entry
+
+    def cache_control(self, filename):
+        """HTML sempre revalida (304 barato); CSS/JS podem ficar no browser"""
+        if filename.endswith('.html'):
+            return 'no-cache'
+        return f'public, max-age={self.max_age}'
+
+    def not_modified(self, filename, req, etag=None):
+        """True se o cliente já tem a versão atual do arquivo (If-None-Match)"""
+        if etag is None:
+            entry = self.index.get(filename)
+            if entry is None:
+                return False
+            etag = entry[0]
+        tag = req.header('if-none-match')
+        if not tag:
+            return False
+        return tag == '*' or etag in tag
+
+    def get(self, filename):
+        """Conteúdo do arquivo em RAM (bytes) ou None se deve ser transmitido do flash"""
+        body = self.lru.pop(filename, None)
+        if body is not None:
+            # Reinserir no fim = mais recentemente usado
+            self.lru[filename] = body
+            self.hits += 1
+            return body
+
+        self.misses += 1
+        entry = self.index.get(filename)
+        if entry is None or entry[1] > self.max_entry:
+            return None
+
+        try:
+            with open(filename, 'rb') as f:
+                body = f.read()
+        except OSError as e:
+            print(f"[ASSETS] Erro ao carregar {filename}: {e}")
+            return None
+
+        size = len(body)
+        # Despejar os menos usados até caber
+        while self.lru and self.used + size > self.max_bytes:
+            old = next(iter(self.lru))
+            self.used -= len(self.lru.pop(old))
+        if self.used + size <= self.max_bytes:
+            self.lru[filename] = body
+            self.used += size
+        return body
+
+    def send(self, conn, filename, req):
+        """Envia o arquivo: 304, gzip do pacote, da RAM ou transmitido do flash"""
+        keep_alive = req.keep_alive
+        packed = self.packed.get(filename)
+        if packed and 'gzip' in (req.header('accept-encoding') or ''):
+            offset, length, etag, ctype, headers = packed
+            if self.not_modified(filename, req, etag):
+                return http_writer.send_empty(conn, 304, headers, keep_alive)
+            self.pack.seek(offset)
+            return http_writer.send_stream(conn, self.pack, length, ctype, 200, headers, keep_alive)
+
+        # Cliente sem gzip: arquivo solto, indexado no primeiro pedido (se foi enviado ao flash)
+        entry = self.index.get(filename)
+        if entry is None and filename not in self.missing:
+            entry = self.fingerprint(filename)
+        if entry is None and packed:
+            print(f"[ASSETS] {filename} só existe em gzip - cliente sem gzip recebe 406")
+            return http_writer.send_bytes(conn, "<html><body><h1>Navegador sem suporte a gzip</h1></body></html>",
+                                          'text/html', 406, b'', keep_alive)
+        if entry is None:
+            return http_writer.send_bytes(conn, "<html><body><h1>Erro ao carregar página</h1></body></html>",
+                                          'text/html', 500, b'', keep_alive)
+
+        etag, size, ctype, headers = entry
+        if self.not_modified(filename, req):
+            return http_writer.send_empty(conn, 304, headers, keep_alive)
+
+        body = self.get(filename)
+        if body is not None:
+            return http_writer.send_bytes(conn, body, ctype, 200, headers, keep_alive)
+        return http_writer.send_file(conn, filename, ctype, 200, headers, keep_alive, size)
@@ -0,0 +1,195 @@
+"""
+Async Server - Monitor Miner v3.0
+Motor HTTP alternativo sobre asyncio.start_server (sem framework)
+
+Escolhido em data/config.json: {"server": {"engine": "asyncio"}}; o padrão
+continua sendo o loop select() do http_server.py. Rotas, scheduler e fontes
+são os mesmos: cada modo chama start(server) sem saber qual motor roda.
+
+- Uma coroutine por conexão, com os mesmos parsers pré-alocados, prazos de
+  headers/body e 503 quando cheio do motor select()
+- Leitura limitada ao espaço livre no buffer do parser (readinto no MicroPython):
+  nenhum buffer cresce por conexão
+- Respostas escritas direto no socket do stream pelo http_writer (buffer fixo
+  compartilhado); nada acumula no StreamWriter
+- Half-close (Connection: close, erro, 503) esperado na coroutine da conexão
+- Scheduler e fontes (mineradoras, SSE) numa task que consulta select() sem
+  bloquear e dorme até o próximo prazo; gc.collect() nessa task, não por requisição
+"""
+
+import gc
+import time
+import select
+from http_server import HttpServer, nodelay, MAX_WAIT_MS, LINGER_MS
+from http_parser import CLOSED
+
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+
+SOURCE_POLL_MS = 50   # Com sockets das fontes abertos, select() sem bloquear nesse intervalo
+
+def stream_socket(stream):
+    """Socket por trás do stream: .s no MicroPython, o do transporte no CPython"""
+    sock = getattr(stream, 's', None)
+    if sock is None:
+        sock = stream.get_extra_info('socket')
+        sock = getattr(sock, '_sock', sock)
+    return sock
+
+async def discard(reader):
+    """Lê e descarta até o FIN do cliente"""
+    while await reader.read(64):
+        pass
+
+class AsyncHttpServer(HttpServer):
+    """Mesma interface do HttpServer; conexões atendidas por coroutines"""
+
+    engine = 'asyncio'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.server = None
+        self.backlog = 5
+        self.streams = {}              # socket -> stream (fechar pelo asyncio)
+        self.detached = {}             # CPython: stream do SSE vivo enquanto o socket estiver aberto
+        self.served = False            # Requisições desde o último gc.collect()
+
+    # ------------------------------------------------------------------------
+    # Modo
+    # ------------------------------------------------------------------------
+
+    def listen(self, addr, backlog=5):
+        """Guarda o endereço; com o loop rodando (troca de modo/IP) refaz o bind"""
+        self.addr = addr
+        self.backlog = backlog
+        if self.running:
+            asyncio.create_task(self.bind())
+
+    async def bind(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        self.server = await asyncio.start_server(self.client, self.addr[0], self.addr[1], backlog=self.backlog)
+        if not self.listen_ms:
+            self.listen_ms = time.ticks_ms()
+            print(f"{self.tag} ⏱ Boot até o listen: {self.listen_ms}ms")
+
+    # ------------------------------------------------------------------------
+    # Conexões
+    # ------------------------------------------------------------------------
+
+    def detach(self, conn):
+        """Cliente sai do motor sem fechar (SSE): o socket passa a ser das fontes"""
+        super().detach(conn)
+        stream = self.streams.pop(conn, None)
+        transport = getattr(stream, 'transport', None)
+        if transport:
+            # CPython: o transporte para de ler o socket que agora é do select() das fontes
+            transport.pause_reading()
+            self.detached[conn] = stream
+
+    def close(self, conn, linger=False):
+        stream = self.streams.pop(conn, None)
+        if stream:
+            stream.close()  # CPython tira o socket do loop; no MicroPython é no-op
+            if getattr(stream, 'transport', None):
+                linger = False  # CPython: o transporte já entregou e fechou o socket
+        super().close(conn, linger)
+
+    async def client(self, reader, writer):
+        """Coroutine da conexão: lê no buffer do parser e processa como o select()"""
+        conn = stream_socket(writer)
+        nodelay(conn)
+        state = self.admit(conn)
+        if state is None:
+            await self.drain_stream(conn, reader)  # 503: descarta a requisição
+            writer.close()
+            return
+        self.streams[conn] = writer
+        req = state[0]
+        readinto = getattr(reader, 'readinto', None)
+
+        # Prazos e ociosidade: expire_idle fecha o socket e a leitura retorna
+        while conn in self.clients:
+            try:
+                if readinto:
+                    n = await readinto(req.mv[req.length:])
+                    if n is None:
+                        continue  # Acordou sem dados (socket non-blocking)
+                    status = req.received(n)
+                else:
+                    data = await reader.read(len(req.buf) - req.length)
+                    status = req.feed_bytes(data) if data else CLOSED
+            except OSError:
+                status = CLOSED
+            if conn not in self.clients:
+                break
+            try:
+                self.process(conn, state, status)
+            except Exception as e:
+                self.failed(conn, e)
+            self.tick()
+            self.served = True
+
+        if conn in self.closing:
+            await self.drain_stream(conn, reader)
+
+    async def drain_stream(self, conn, reader):
+        """Socket em closing: descarta o que chegar até o FIN ou LINGER_MS"""
+        try:
+            await asyncio.wait_for(discard(reader), LINGER_MS / 1000)
+        except (asyncio.TimeoutError, OSError):
+            pass
+        self.release(conn)
+
+    # ------------------------------------------------------------------------
+    # Loop
+    # ------------------------------------------------------------------------
+
+    async def background(self):
+        """Scheduler e fontes: select() sem bloquear, depois dorme até o próximo prazo"""
+        while self.running:
+            readers = []
+            writers = []
+            timeout = self.scheduler.timeout_ms() if self.scheduler else MAX_WAIT_MS
+            for source in self.sources:
+                readers += source.readers
+                writers += source.writers
+                timeout = source.timeout_ms(timeout)
+
+            try:
+                if readers or writers:
+                    timeout = min(timeout, SOURCE_POLL_MS)
+                    readable, writable, _ = select.select(readers, writers, [], 0)
+                    for sock in writable:
+                        for source in self.sources:
+                            source.on_writable(sock)
+                    for sock in readable:
+                        for source in self.sources:
+                            source.on_readable(sock)
+                self.tick()
+            except Exception as e:
+                print(f"{self.tag} Erro: {e}")
+                gc.collect()
+
+            for conn in [c for c in self.detached if c.fileno() < 0]:
+                del self.detached[conn]
+            # Coleta uma vez por passada, não por requisição (o select() coleta por iteração)
+            if self.served:
+                self.served = False
+                gc.collect()
+            else:
+                self.idle_loops += 1
+            self.loops += 1
+            await asyncio.sleep(timeout / 1000)
+
+    async def main(self):
+        self.running = True
+        await self.bind()
+        await self.background()
+
+    def run(self):
+        """Loop principal (não retorna)"""
+        asyncio.run(self.main())
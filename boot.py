@@ -5,33 +5,133 @@ MINIMALISTA: Apenas verifica configuração e direciona
 Fluxo:
 1. Desliga interfaces
 2. Verifica se WiFi está configurado
-3. Se SIM → Tenta conectar → main.py (STA + Async)
-4. Se NÃO ou FALHA → setup.py (AP + Sync)
+3. Se SIM → Reconexão rápida (BSSID/canal do último boot, IP por DHCP) → main.py (STA + Async)
+   Sem cache ou falha → conexão normal (scan + DHCP)
+4. Se NÃO ou FALHA → AP → main.py → setup_wifi.py (troca ao vivo para o dashboard)
+
+Sem sleeps fixos: cada espera consulta o status a cada 50ms até um deadline.
+Tempo de cada fase é logado ([BOOT] ⏱) para medir boot até o primeiro byte.
 """
 
 import network
 import time
 import gc
-import json
+import binascii
+from config_store import store
+
+T_BOOT = time.ticks_ms()
+
+FAST_TIMEOUT_MS = 5000     # Reconexão com BSSID/canal em cache
+CONNECT_TIMEOUT_MS = 15000 # Conexão normal (scan + DHCP)
+POLL_MS = 50
 
 # ============================================================================
 # HELPERS
 # ============================================================================
 
+_t_phase = T_BOOT
+
+def phase(name):
+    """Loga duração da fase e tempo total desde o boot"""
+    global _t_phase
+    now = time.ticks_ms()
+    print(f"[BOOT] ⏱ {name}: {time.ticks_diff(now, _t_phase)}ms (total {now}ms)")
+    _t_phase = now
+
 def format_mem(b):
     """Formata bytes para KB"""
     return f"{b/1024:.1f}KB ({b}b)"
 
-def load_config():
-    """Carrega configuração WiFi"""
+def wait_for(check, timeout_ms):
+    """Consulta check() a cada POLL_MS até ser verdadeiro ou o deadline"""
+    deadline = time.ticks_add(time.ticks_ms(), timeout_ms)
+    while not check():
+        if time.ticks_diff(deadline, time.ticks_ms()) <= 0:
+            return False
+        time.sleep_ms(POLL_MS)
+    return True
+
+# Status que encerram a espera sem adiantar esperar mais
+STAT_FAILED = tuple(getattr(network, name) for name in
+                    ('STAT_WRONG_PASSWORD', 'STAT_NO_AP_FOUND', 'STAT_CONNECT_FAIL')
+                    if hasattr(network, name))
+
+def wait_connected(timeout_ms):
+    """Espera o IP; retorna cedo se o driver reportar falha definitiva"""
+    failed = []
+
+    def done():
+        if sta.isconnected():
+            return True
+        status = sta.status()
+        if status in STAT_FAILED:
+            failed.append(status)
+            return True
+        return False
+
+    return wait_for(done, timeout_ms) and not failed
+
+def connect_fast(wifi):
+    """Reconexão direcionada com BSSID/canal do último boot (sem scan; IP continua por DHCP)"""
+    bssid = wifi.get('bssid')
+    print(f"[BOOT]   → Reconexão rápida (BSSID {bssid}, canal {wifi.get('channel')})")
+
+    if wifi.get('channel'):
+        try:
+            sta.config(channel=wifi['channel'])
+        except Exception:
+            pass
     try:
-        with open('data/config.json', 'r') as f:
-            return json.load(f)
-    except:
-        return {
-            "wifi": {"ssid": "", "password": "", "configured": False},
-            "system": {"name": "Monitor Miner", "version": "3.0", "first_boot": True}
-        }
+        if bssid:
+            sta.connect(wifi['ssid'], wifi['password'], bssid=binascii.unhexlify(bssid))
+        else:
+            sta.connect(wifi['ssid'], wifi['password'])
+    except Exception as e:
+        print(f"[BOOT]   Reconexão rápida indisponível: {e}")
+        return False
+
+    if wait_connected(FAST_TIMEOUT_MS):
+        return True
+
+    # Cache velho (AP trocou de canal ou foi substituído): volta ao caminho normal
+    print("[BOOT]   ⚠️ Reconexão rápida falhou - conexão normal")
+    sta.disconnect()
+    return False
+
+def remember_link():
+    """Guarda BSSID/canal atuais para o próximo boot (grava só se mudou)"""
+    link = {}
+    try:
+        bssid = sta.config('bssid')
+        if isinstance(bssid, bytes) and len(bssid) == 6:
+            link['bssid'] = binascii.hexlify(bssid).decode()
+    except Exception:
+        pass
+    try:
+        channel = sta.config('channel')
+        if isinstance(channel, int):
+            link['channel'] = channel
+    except Exception:
+        pass
+    if store.update('wifi', link):
+        store.save()
+
+def start_ap():
+    """Sobe o AP de configuração"""
+    ap.active(True)
+    wait_for(ap.active, 2000)
+    ap.ifconfig(('192.168.4.1', '255.255.255.0', '192.168.4.1', '8.8.8.8'))
+    ap.config(essid='MonitorMiner_Setup', authmode=0)
+
+    print("=" * 40)
+    print("[BOOT] ✅ AP ATIVO")
+    print("=" * 40)
+    print("[BOOT] WiFi: MonitorMiner_Setup")
+    print("[BOOT] 🌐 http://192.168.4.1:8080")
+    print("=" * 40)
+    print("[BOOT] ➡️  Carregando setup_wifi.py (Site Survey)")
+    print("=" * 40)
+    phase("AP")
 
 # ============================================================================
 # INICIALIZAÇÃO
@@ -49,13 +149,13 @@ ap = network.WLAN(network.AP_IF)
 if sta.active():
     sta.disconnect()
     sta.active(False)
-    time.sleep(1)
 
 if ap.active():
     ap.active(False)
-    time.sleep(1)
 
+wait_for(lambda: not sta.active() and not ap.active(), 1000)
 print("[BOOT]   ✅ Interfaces desligadas")
+phase("interfaces")
 
 # [2] Limpar memória
 print("[BOOT] [2/4] Limpando memória...")
@@ -65,12 +165,13 @@ print(f"[BOOT]   Memória: {format_mem(gc.mem_free())}")
 
 # [3] Verificar configuração
 print("[BOOT] [3/4] Verificando configuração...")
-config = load_config()
-wifi_configured = config.get('wifi', {}).get('configured', False)
-ssid = config.get('wifi', {}).get('ssid', '')
-password = config.get('wifi', {}).get('password', '')
+wifi = store.section('wifi')
+wifi_configured = store.get_bool('wifi', 'configured')
+ssid = store.get_str('wifi', 'ssid')
+password = store.get_str('wifi', 'password')
 
 print(f"[BOOT]   WiFi configurado: {wifi_configured}")
+phase("configuração")
 
 # [4] Decidir modo
 print("[BOOT] [4/4] Decidindo modo...")
@@ -78,19 +179,23 @@ print("[BOOT] [4/4] Decidindo modo...")
 if wifi_configured and ssid:
     # Tentar conectar em modo STA
     print(f"[BOOT]   → Conectando a: {ssid}")
-    
+
     sta.active(True)
-    time.sleep(1)
-    sta.connect(ssid, password)
-    
-    # Aguardar (15s)
-    timeout = 15
-    while timeout > 0 and not sta.isconnected():
-        time.sleep(1)
-        timeout -= 1
-    
-    if sta.isconnected():
+    wait_for(sta.active, 2000)
+
+    connected = False
+    if wifi.get('bssid'):
+        connected = connect_fast(wifi)
+        phase("reconexão rápida" if connected else "tentativa rápida")
+
+    if not connected:
+        sta.connect(ssid, password)
+        connected = wait_connected(CONNECT_TIMEOUT_MS)
+        phase("conexão normal")
+
+    if connected:
         # ✅ SUCESSO - Modo STA
+        remember_link()
         ip = sta.ifconfig()[0]
         print("=" * 40)
         print("[BOOT] ✅ CONECTADO!")
@@ -101,62 +206,32 @@ if wifi_configured and ssid:
         print("=" * 40)
         print("[BOOT] ➡️  Carregando main.py (Dashboard)")
         print("=" * 40)
-        
+
         gc.collect()
-        
+
         # Importar main.py (modo STA)
         import main
-        
+
     else:
         # ❌ FALHA - Entrar em modo AP
-        print("[BOOT] ❌ Falha ao conectar")
+        print(f"[BOOT] ❌ Falha ao conectar (status {sta.status()})")
         print("[BOOT] ➡️  Entrando em modo Setup...")
-        
+
         sta.active(False)
-        time.sleep(1)
-        
-        # Configurar AP
-        ap.active(True)
-        time.sleep(1)
-        ap.ifconfig(('192.168.4.1', '255.255.255.0', '192.168.4.1', '8.8.8.8'))
-        ap.config(essid='MonitorMiner_Setup', authmode=0)
-        time.sleep(1)
-        
-        print("=" * 40)
-        print("[BOOT] ✅ AP ATIVO")
-        print("=" * 40)
-        print("[BOOT] WiFi: MonitorMiner_Setup")
-        print("[BOOT] 🌐 http://192.168.4.1:8080")
-        print("=" * 40)
-        print("[BOOT] ➡️  Carregando setup_wifi.py (Site Survey)")
-        print("=" * 40)
-        
+        start_ap()
+
         gc.collect()
-        
-        # Importar setup_wifi.py (modo AP)
-        import setup_wifi
+
+        # main.py sobe o servidor com o setup (AP ativo)
+        import main
 
 else:
     # Não configurado - Modo AP
     print("[BOOT]   → Não configurado")
-    
-    # Configurar AP
-    ap.active(True)
-    time.sleep(1)
-    ap.ifconfig(('192.168.4.1', '255.255.255.0', '192.168.4.1', '8.8.8.8'))
-    ap.config(essid='MonitorMiner_Setup', authmode=0)
-    time.sleep(1)
-    
-    print("=" * 40)
-    print("[BOOT] ✅ AP ATIVO")
-    print("=" * 40)
-    print("[BOOT] WiFi: MonitorMiner_Setup")
-    print("[BOOT] 🌐 http://192.168.4.1:8080")
-    print("=" * 40)
-    print("[BOOT] ➡️  Carregando setup_wifi.py (Site Survey)")
-    print("=" * 40)
-    
+
+    start_ap()
+
     gc.collect()
-    
-    # Importar setup_wifi.py (modo AP)
-    import setup_wifi
+
+    # main.py sobe o servidor com o setup (AP ativo)
+    import main
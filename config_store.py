@@ -0,0 +1,170 @@
+"""
+Config Store - Monitor Miner v3.0
+Configuração (data/config.json) lida uma vez e mantida em RAM
+
+- Um único parse por boot: boot.py, setup e dashboard usam o mesmo objeto
+  (módulo fica em sys.modules)
+- Getters tipados com default: campo ausente ou de tipo errado não derruba o boot
+- Gravação atômica: temp + rename, linha de CRC32 no fim e uma geração de
+  backup (.bak); reset no meio da gravação não perde as credenciais
+- Gravação que não muda nada é pulada (menos tempo de boot e desgaste do flash)
+- Editado à mão (sem CRC ou CRC velho com JSON válido): aceito e regravado com CRC
+"""
+
+import os
+import json
+import binascii
+
+CONFIG_FILE = 'data/config.json'
+CRC_PREFIX = '#crc32 '
+
+DEFAULTS = {
+    "wifi": {"ssid": "", "password": "", "configured": False},
+    "system": {"name": "Monitor Miner", "version": "3.0", "first_boot": True},
+    "server": {"engine": "select"}
+}
+
+def _crc(text):
+    return binascii.crc32(text.encode()) & 0xffffffff
+
+def _exists(path):
+    try:
+        os.stat(path)
+        return True
+    except OSError:
+        return False
+
+class ConfigStore:
+    """Config em RAM + gravação atômica com CRC e backup"""
+
+    def __init__(self, filename=CONFIG_FILE):
+        self.filename = filename
+        self.backup = filename + '.bak'
+        self.data = None
+        self.source = None     # 'arquivo', 'backup' ou 'padrão'
+        self._crc = None       # CRC do que está no flash (gravação sem mudança é pulada)
+        self.writes = 0
+        self.skipped = 0
+        self.load()
+
+    # ------------------------------------------------------------------------
+    # Flash
+    # ------------------------------------------------------------------------
+
+    def _read(self, path):
+        """JSON + CRC do arquivo (None se editado à mão); ValueError se corrompido"""
+        with open(path, 'r') as f:
+            text = f.read()
+        body, sep, tail = text.rpartition('\n' + CRC_PREFIX)
+        if not sep:
+            # Sem linha de CRC: arquivo editado à mão ou gravado por versão anterior
+            return json.loads(text), None
+        crc = int(tail.strip(), 16)
+        data = json.loads(body)
+        if _crc(body) != crc:
+            # A gravação é temp + rename: o atual nunca fica pela metade, então
+            # JSON válido com CRC velho é edição à mão depois da última gravação
+            print(f"[CONFIG] {path}: CRC não confere mas o JSON é válido - editado à mão")
+            return data, None
+        return data, crc
+
+    def load(self):
+        """Arquivo principal, senão o backup, senão os padrões"""
+        for path, source in ((self.filename, 'arquivo'), (self.backup, 'backup')):
+            try:
+                self.data, self._crc = self._read(path)
+                self.source = source
+                if source == 'backup':
+                    print(f"[CONFIG] ⚠️ {self.filename} ausente ou corrompido - usando {self.backup}")
+                elif self._crc is None:
+                    self.save()  # Editado à mão: regrava já com o CRC
+                return self.data
+            except (OSError, ValueError) as e:
+                if source == 'arquivo':
+                    print(f"[CONFIG] Erro ao ler {path}: {e}")
+        print("[CONFIG] Usando configuração padrão")
+        self.data = json.loads(json.dumps(DEFAULTS))
+        self.source = 'padrão'
+        self._crc = None
+        return self.data
+
+    def save(self):
+        """Grava se mudou: temp + CRC, atual vira .bak, temp vira o atual"""
+        body = json.dumps(self.data)
+        crc = _crc(body)
+        if crc == self._crc:
+            self.skipped += 1
+            return True
+
+        tmp = self.filename + '.tmp'
+        try:
+            with open(tmp, 'w') as f:
+                f.write(body)
+                f.write(f"\n{CRC_PREFIX}{crc:08x}\n")
+            # FAT não renomeia sobre arquivo existente: libera o destino antes.
+            # Entre os dois renames só o .bak existe e load() o usa
+            if self.source == 'backup' and _exists(self.filename):
+                os.remove(self.filename)  # Corrompido: o .bak bom é preservado
+            elif _exists(self.filename):
+                if _exists(self.backup):
+                    os.remove(self.backup)
+                os.rename(self.filename, self.backup)
+            os.rename(tmp, self.filename)
+        except OSError as e:
+            print(f"[CONFIG] Erro ao gravar: {e}")
+            return False
+        self._crc = crc
+        self.source = 'arquivo'
+        self.writes += 1
+        return True
+
+    # ------------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------------
+
+    def section(self, name):
+        """Dict da seção (criado vazio se não existir)"""
+        value = self.data.get(name)
+        if not isinstance(value, dict):
+            value = self.data[name] = {}
+        return value
+
+    def get(self, section, key, default=None):
+        return self.section(section).get(key, default)
+
+    def _typed(self, section, key, default, types):
+        value = self.section(section).get(key)
+        return value if isinstance(value, types) else default
+
+    def get_str(self, section, key, default=''):
+        return self._typed(section, key, default, str)
+
+    def get_int(self, section, key, default=0):
+        value = self._typed(section, key, default, int)
+        return default if isinstance(value, bool) else value
+
+    def get_bool(self, section, key, default=False):
+        return self._typed(section, key, default, bool)
+
+    # ------------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------------
+
+    def update(self, section, values, replace=False):
+        """Aplica valores na seção (replace descarta o resto); True se algo mudou"""
+        current = self.section(section)
+        if replace:
+            changed = current != values
+            self.data[section] = dict(values)
+            return changed
+        changed = False
+        for key, value in values.items():
+            if current.get(key) != value or key not in current:
+                current[key] = value
+                changed = True
+        return changed
+
+    def stats(self):
+        return {'source': self.source, 'writes': self.writes, 'skipped': self.skipped}
+
+store = ConfigStore()
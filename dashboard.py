@@ -1,15 +1,43 @@
 """
 Dashboard - Monitor Miner v3.0
-Modo STA: Servidor Síncrono (socket puro)
-MOTIVO: Microdot + asyncio causa crash também em modo STA
+Modo STA: rotas, tasks e fontes registradas no motor HTTP (http_server.py)
+MOTIVO: Microdot + asyncio causa crash também em modo STA; o motor asyncio
+opcional (async_server.py) não usa framework e roda estas mesmas rotas
+
+O import só monta o estado (sensores, histórico, mineradoras); start(server)
+faz o bind no IP da STA e assume o loop - no boot em STA ou ao vivo, vindo
+do setup depois do /api/connect.
 """
 
-import socket
 import network
 import json
 import time
 import gc
-import select
+import http_writer
+from router import Router
+from assets import AssetCache
+from scheduler import Scheduler
+from sensor_state import SensorState
+from history import History
+from history_log import HistoryLog
+from snapshots import Snapshot
+from sse import EventStream
+from miner_poller import MinerPoller
+from miner_table import MinerTable, MinerReply
+from link_watchdog import LinkWatchdog
+from metrics import Metrics
+from config_store import store as config
+from rules import RuleEngine
+
+try:
+    from machine import Pin
+except ImportError:
+    Pin = None  # PC (host_sim): relés só no estado das regras
+
+try:
+    import ntptime
+except ImportError:
+    ntptime = None  # PC (host_sim): relógio do sistema já está certo
 
 print("[DASH] ========================================")
 print("[DASH] Dashboard - Servidor Síncrono")
@@ -18,178 +46,394 @@ print("[DASH] ========================================")
 gc.collect()
 print(f"[DASH] Memória: {gc.mem_free() / 1024:.1f}KB")
 
+# ============================================================================
+# CONFIGURAÇÃO DE CONEXÕES
+# ============================================================================
+
+PORT = 8080
+IDLE_TIMEOUT_MS = 7000     # Maior que o polling de 5s do dashboard.js
+MAX_REQUESTS = 100         # Requisições por conexão antes de fechar
+SENSOR_FLUSH_MS = 60000    # Tempo máximo com dados de sensores não gravados
+SENSOR_FLUSH_CHANGES = 30  # Mudanças que forçam gravação antes do intervalo
+HISTORY_INTERVAL_S = 30    # Resolução do histórico
+HISTORY_SLOTS = 2880       # 24h a 30s (2 bytes por amostra em int16)
+HISTORY_MAX_POINTS = 500   # Buckets máximos por consulta
+LOG_INTERVAL_S = 60        # Cadência do log binário no flash
+LOG_SEGMENT_BYTES = 16384  # ~1 dia por segmento (12 bytes por registro)
+LOG_MAX_SEGMENTS = 32      # Segmentos mantidos (~1 mês)
+LOG_FLUSH_RECORDS = 10     # Registros por escrita no flash
+SSE_MAX_SUBSCRIBERS = 3    # Abas/painéis recebendo push (o resto usa polling)
+SSE_HEARTBEAT_MS = 15000   # Comentário em streams sem envio
+SSE_STATUS_MS = 30000      # Status (uptime/memória) no stream
+MINERS_PUBLISH_MS = 10000  # Agregados das mineradoras no estado dos sensores
+LINK_CHECK_MS = 1000       # Verificação do WiFi (queda detectada em até 1s)
+LINK_RETRY_MAX_MS = 60000  # Intervalo máximo entre tentativas de reconexão
+CLOCK_RETRY_MS = 60000     # Nova tentativa de NTP enquanto o relógio não é válido
+CLOCK_RESYNC_MS = 21600000 # Ressincronização (6h) depois do primeiro acerto
+
 # ============================================================================
 # FUNÇÕES
 # ============================================================================
 
-def load_sensors():
-    """Carrega dados dos sensores"""
+# Estado dos sensores em RAM (gravado no flash em lote)
+sensors = SensorState('data/sensors.json', SENSOR_FLUSH_MS, SENSOR_FLUSH_CHANGES)
+
+def load_miners_config():
+    """Mineradoras a consultar (data/miners.json)"""
     try:
-        with open('data/sensors.json', 'r') as f:
+        with open('data/miners.json', 'r') as f:
             return json.load(f)
-    except:
-        return {
-            "temperature": 0.0,
-            "humidity": 0.0,
-            "miners": {"total": 0, "online": 0, "offline": 0},
-            "power": {"consumption": 0.0, "status": "unknown"},
-            "last_update": 0
-        }
-
-def load_file(filename):
-    """Carrega arquivo"""
+    except (OSError, ValueError) as e:
+        print(f"[DASH] Sem configuração de mineradoras: {e}")
+        return {'hosts': []}
+
+# Consulta às mineradoras no mesmo select() do HTTP
+miners_config = load_miners_config()
+miners = MinerTable(len(miners_config.get('hosts', [])))
+
+def on_miner_reply(idx, reply):
+    """Resposta (ou falha, reply=None) de uma mineradora"""
+    if reply is not None and reply.hashrate >= 0:
+        miners.update(idx, reply)
+    else:
+        miners.fail(idx)
+
+def publish_miners():
+    """Agregados da tabela no estado dos sensores (sensors só muda se algo mudou)"""
+    sensors.update({'miners': miners.summary()})
+
+poller = MinerPoller(miners_config.get('hosts', []), on_miner_reply, MinerReply,
+                     miners_config.get('port', 4028),
+                     miners_config.get('interval_s', 30) * 1000,
+                     miners_config.get('timeout_ms', 3000),
+                     miners_config.get('max_inflight', 8))
+publish_miners()
+
+# Histórico em memória fixa (alocado uma vez no boot)
+history = History(HISTORY_INTERVAL_S, HISTORY_SLOTS)
+history.add('temperature', decimals=1)
+history.add('humidity', decimals=1)
+history.add('power', decimals=1, typecode='i')
+
+# Regras de automação: reavaliadas a cada leitura que muda a métrica inscrita
+relay_pins = {}
+
+def on_rule(engine, i, active):
+    """Ação da regra: liga/desliga o relé (o alerta aparece no status e no SSE)"""
+    relay = engine.actions[i][0]
+    pin = relay_pins.get(relay)
+    if pin is not None:
+        pin.value(1 if active else 0)
+
+rules = RuleEngine('data/rules.json', on_rule)
+if Pin:
+    for relay, gpio in rules.relays.items():
+        relay_pins[relay] = Pin(gpio, Pin.OUT, value=0)
+sensors.listener = rules.on_change
+rules.prime(sensors.data)
+
+def record_history():
+    """Amostra o estado atual dos sensores no histórico"""
+    now = time.time()
+    data = sensors.data
+    history.append('temperature', now, data['temperature'])
+    history.append('humidity', now, data['humidity'])
+    history.append('power', now, data['power']['consumption'])
+
+# Log binário no flash (dias de leituras para análise de quedas)
+history_log = HistoryLog([('temperature', 1, 'h'), ('humidity', 1, 'h'), ('power', 1, 'i')],
+                         'data/hist', LOG_SEGMENT_BYTES, LOG_MAX_SEGMENTS, LOG_FLUSH_RECORDS)
+
+# Relógio: sem RTC com bateria o ESP32 volta perto de 2000 a cada boot.
+# O log só recebe registros depois do NTP, senão boots diferentes se misturam na exportação
+clock_synced = ntptime is None
+clock_task = None
+
+def sync_clock():
+    """Acerta o RTC pelo NTP (task: a cada minuto até acertar, depois a cada 6h)"""
+    global clock_synced
     try:
-        with open(filename, 'r') as f:
-            return f.read()
+        ntptime.settime()
     except Exception as e:
-        print(f"[DASH] Erro ao carregar {filename}: {e}")
-        return "<html><body><h1>Erro</h1></body></html>"
-
-def http_response(content, content_type='text/html', status='200 OK'):
-    """Resposta HTTP com CORS"""
-    response = f"HTTP/1.1 {status}\r\n"
-    response += f"Content-Type: {content_type}; charset=utf-8\r\n"
-    response += f"Content-Length: {len(content)}\r\n"
-    response += "Access-Control-Allow-Origin: *\r\n"
-    response += "Connection: close\r\n"
-    response += "\r\n"
-    
-    if isinstance(content, str):
-        return response.encode('utf-8') + content.encode('utf-8')
+        print(f"[DASH] NTP falhou: {e}")
+        return
+    if not clock_synced:
+        clock_synced = True
+        clock_task.period = CLOCK_RESYNC_MS
+        print(f"[DASH] 🕒 Relógio sincronizado: {time.time()}")
+
+def record_log():
+    """Acrescenta um registro ao log (gravado no flash a cada LOG_FLUSH_RECORDS)"""
+    if not clock_synced:
+        return  # Timestamp sem NTP não é comparável entre boots
+    data = sensors.data
+    history_log.append(time.time(), (data['temperature'], data['humidity'], data['power']['consumption']))
+
+# ============================================================================
+# ROTAS
+# ============================================================================
+
+routes = Router()
+
+# Contadores por rota (latência, bytes, heap) pré-alocados
+metrics = Metrics()
+
+def add_route(method, path, handler):
+    """Registra a rota já instrumentada"""
+    routes.add(method, path, metrics.wrap(path, handler))
+
+def page_index(conn, req):
+    """Dashboard"""
+    return assets.send(conn, 'web/index.html', req)
+
+def page_style(conn, req):
+    """CSS compartilhado"""
+    return assets.send(conn, 'web/css/style.css', req)
+
+def page_script(conn, req):
+    """JavaScript do dashboard"""
+    return assets.send(conn, 'web/js/dashboard.js', req)
+
+def sensors_data():
+    return sensors.data
+
+def system_info():
+    """Campos de sistema exibidos no dashboard"""
+    return {
+        'version': '3.0',
+        'mode': 'STA',
+        'memory_free': gc.mem_free(),
+        'ip': ip,
+        'uptime': time.ticks_ms() // 1000,
+        'alerts': rules.active_alerts()
+    }
+
+def status_data():
+    data = system_info()
+    data['tasks'] = scheduler.stats()
+    data['poller'] = poller.stats()
+    data['link'] = link.stats()
+    data['config'] = config.stats()
+    data['http'] = server.stats()
+    data['rules'] = rules.stats()
+    data['boot'] = {'listen_ms': server.listen_ms, 'first_byte_ms': server.first_byte_ms}
+    return data
+
+# Corpos serializados por versão (sensores) ou no máximo 1x por segundo (status/uptime)
+sensors_snapshot = Snapshot('s', sensors_data, lambda: sensors.version)
+status_snapshot = Snapshot('st', status_data, ttl_ms=1000)
+
+# Push por SSE: uma mensagem combinada quando as leituras mudam
+events = EventStream(SSE_MAX_SUBSCRIBERS, SSE_HEARTBEAT_MS)
+sse_last = {}               # Últimos valores publicados (para o delta)
+sse_version = -1
+sse_status_at = 0
+
+def sensors_delta():
+    """Chaves dos sensores que mudaram desde a última publicação"""
+    delta = {}
+    for key, value in sensors.data.items():
+        if sse_last.get(key) != value:
+            delta[key] = value
+            sse_last[key] = dict(value) if isinstance(value, dict) else value
+    return delta
+
+def sse_tick():
+    """Publica delta + status quando há mudança ou a cada SSE_STATUS_MS"""
+    global sse_version, sse_status_at
+    if not events.subscribers:
+        return
+    now = time.ticks_ms()
+    data = {}
+    if sensors.version != sse_version:
+        sse_version = sensors.version
+        delta = sensors_delta()
+        if delta:
+            data['sensors'] = delta
+    if data or time.ticks_diff(now, sse_status_at) >= SSE_STATUS_MS:
+        data['status'] = system_info()
+        sse_status_at = now
+        events.publish(EventStream.message(b'update', json.dumps(data)))
     else:
-        return response.encode('utf-8') + content
+        events.heartbeat()
+
+def api_events(conn, req):
+    """Stream SSE: estado completo ao conectar, depois só deltas"""
+    global sse_version, sse_status_at
+    initial = EventStream.message(b'update', json.dumps({'sensors': sensors.data, 'status': system_info()}))
+    if not events.subscribers:
+        # Sem inscritos o delta parou: o estado completo enviado vira a base
+        sse_version = sensors.version
+        sse_status_at = time.ticks_ms()
+        sse_last.clear()
+        sensors_delta()
+    if events.subscribe(conn, req, initial):
+        server.detach(conn)
+
+def api_sensors(conn, req):
+    """API Sensores (?since=<versão> -> 304)"""
+    return sensors_snapshot.send(conn, req)
+
+def api_history(conn, req):
+    """API Histórico: ?metric=&from=&to=&points= (streaming, sem montar a lista)"""
+    series = history.get(req.param('metric', 'temperature'))
+    if series is None:
+        return http_writer.send_bytes(conn, '{"error": "Métrica desconhecida"}', 'application/json', 404, b'', req.keep_alive)
+    try:
+        start = req.param('from')
+        end = req.param('to')
+        start = int(start) if start else None
+        end = int(end) if end else None
+        points = min(int(req.param('points', 120)), HISTORY_MAX_POINTS)
+    except ValueError:
+        return http_writer.send_bytes(conn, '{"error": "Parâmetro inválido"}', 'application/json', 400, b'', req.keep_alive)
+
+    # HTTP/1.0 não entende chunked: corpo termina no fechamento
+    if not req.http11:
+        req.keep_alive = False
+    w = http_writer.ChunkedWriter(conn, 'application/json', keep_alive=req.keep_alive, chunked=req.http11)
+    series.stream(w, start, end, points)
+    return w.close()
 
-def parse_request(request_data):
-    """Parse requisição"""
+def api_history_export(conn, req):
+    """Exporta o log do flash: ?from=&to=&format=csv|json (streaming)"""
     try:
-        request_str = request_data.decode('utf-8')
-        first_line = request_str.split('\r\n')[0]
-        method, path = first_line.split(' ')[0:2]
-        return method, path
-    except:
-        return 'GET', '/'
+        start = int(req.param('from') or 0)
+        end = int(req.param('to') or 0xFFFFFFFF)
+    except ValueError:
+        return http_writer.send_bytes(conn, '{"error": "Parâmetro inválido"}', 'application/json', 400, b'', req.keep_alive)
+
+    csv = req.param('format', 'csv') != 'json'
+    if not req.http11:
+        req.keep_alive = False
+    if csv:
+        w = http_writer.ChunkedWriter(conn, 'text/csv', 200, b'Content-Disposition: attachment; filename="history.csv"\r\n',
+                                      req.keep_alive, req.http11)
+    else:
+        w = http_writer.ChunkedWriter(conn, 'application/json', keep_alive=req.keep_alive, chunked=req.http11)
+    history_log.export(w, start, end, csv)
+    return w.close()
+
+def api_status(conn, req):
+    """API Status (?since=<versão> -> 304)"""
+    return status_snapshot.send(conn, req)
+
+def api_metrics(conn, req):
+    """Métricas no formato texto do Prometheus (streaming)"""
+    if not req.http11:
+        req.keep_alive = False
+    w = http_writer.ChunkedWriter(conn, 'text/plain; version=0.0.4', keep_alive=req.keep_alive, chunked=req.http11)
+    metrics.render(w, scheduler, server)
+    return w.close()
+
+def api_rules(conn, req):
+    """Regras compiladas com estado (idle/pending/active) e disparos"""
+    body = json.dumps({'success': True, 'rules': rules.describe(), 'stats': rules.stats()})
+    return http_writer.send_bytes(conn, body, 'application/json', 200, b'', req.keep_alive)
+
+add_route('GET', '/', page_index)
+add_route('GET', '/index.html', page_index)
+add_route('GET', '/css/style.css', page_style)
+add_route('GET', '/js/dashboard.js', page_script)
+add_route('GET', '/api/sensors', api_sensors)
+add_route('GET', '/api/status', api_status)
+add_route('GET', '/api/history', api_history)
+add_route('GET', '/api/history/export', api_history_export)
+add_route('GET', '/api/events', api_events)
+add_route('GET', '/api/metrics', api_metrics)
+add_route('GET', '/api/rules', api_rules)
+
+# Assets estáticos: ETag calculado uma vez, conteúdo quente em RAM
+assets = AssetCache([
+    'web/index.html',
+    'web/css/style.css',
+    'web/js/dashboard.js',
+])
+
+# ============================================================================
+# TASKS
+# ============================================================================
+
+def update_sensors():
+    """Leitura periódica dos sensores"""
+    # TODO: Implementar leitura real de sensores
+    # sensors.update(read_all_sensors())
+    pass
+
+# Supervisão do WiFi: reconecta sem reiniciar (histórico e mineradoras ficam na RAM)
+def on_link_down():
+    # Consultas às mineradoras falhariam e inflariam o backoff
+    poller.pause()
+
+def on_link_up(new_ip, previous):
+    global ip
+    poller.resume()
+    if new_ip == previous:
+        return  # Mesmo IP: socket de escuta e conexões continuam válidos
+
+    # IP novo: conexões antigas não têm volta, refaz o bind
+    print(f"[DASH] IP mudou ({previous} → {new_ip}) - refazendo o bind")
+    server.close_all()
+    for conn in list(events.subscribers):
+        events.drop(conn)
+    ip = new_ip
+    server.listen((ip, PORT))
+    print(f"[DASH] 🌐 http://{ip}:{PORT}")
 
 # ============================================================================
 # SERVIDOR
 # ============================================================================
 
-# Obter IP
-wlan = network.WLAN(network.STA_IF)
-if not wlan.isconnected():
-    print("[DASH] ⚠️ WiFi desconectado! Reiniciando...")
-    import machine
-    time.sleep(2)
-    machine.reset()
-
-ip = wlan.ifconfig()[0]
-port = 8080
-addr = (ip, port)
-
-# Configurar socket
-s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-s.setblocking(False)  # Non-blocking para usar select()
-s.bind(addr)
-s.listen(5)
-
-print("=" * 40)
-print(f"[DASH] ✅ Servidor rodando!")
-print(f"[DASH] ✅ Modo: Pseudo-assíncrono (select)")
-print("=" * 40)
-print(f"[DASH] 🌐 http://{ip}:{port}")
-print("=" * 40)
-
-# Contador para tasks periódicas
-last_sensor_update = time.ticks_ms()
-sensor_interval = 10000  # 10 segundos
-
-# Loop principal com select()
-while True:
-    try:
-        # select() espera conexão ou timeout (100ms)
-        readable, _, _ = select.select([s], [], [], 0.1)
-        
-        if not readable:
-            # Sem conexão - executar tasks periódicas
-            current_time = time.ticks_ms()
-            
-            # Atualizar sensores a cada 10s
-            if time.ticks_diff(current_time, last_sensor_update) > sensor_interval:
-                # TODO: Implementar leitura real de sensores
-                # sensors_data = read_all_sensors()
-                # save_sensors(sensors_data)
-                last_sensor_update = current_time
-                # print("[DASH] Sensores atualizados")
-            
-            continue
-        
-        # Tem conexão pronta!
-        conn, client_addr = s.accept()
-        print(f"[DASH] Conexão de {client_addr}")
-        
-        conn.settimeout(5.0)
-        request_data = conn.recv(2048)
-        
-        if not request_data:
-            conn.close()
-            continue
-        
-        method, path = parse_request(request_data)
-        print(f"[DASH] {method} {path}")
-        
-        # Roteamento
-        if path == '/' or path.startswith('/index'):
-            # Dashboard
-            html = load_file('web/index.html')
-            response = http_response(html, 'text/html')
-            
-        elif '/css/style.css' in path:
-            # CSS
-            print(f"[DASH] Servindo style.css")
-            css = load_file('web/css/style.css')
-            response = http_response(css, 'text/css')
-            
-        elif '/js/dashboard.js' in path:
-            # JavaScript
-            print(f"[DASH] Servindo dashboard.js")
-            js = load_file('web/js/dashboard.js')
-            response = http_response(js, 'application/javascript')
-            
-        elif path.startswith('/api/sensors'):
-            # API Sensores
-            data = json.dumps({
-                'success': True,
-                'data': load_sensors()
-            })
-            response = http_response(data, 'application/json')
-            
-        elif path.startswith('/api/status'):
-            # API Status
-            data = json.dumps({
-                'success': True,
-                'data': {
-                    'version': '3.0',
-                    'mode': 'STA',
-                    'memory_free': gc.mem_free(),
-                    'ip': ip,
-                    'uptime': time.ticks_ms() // 1000
-                }
-            })
-            response = http_response(data, 'application/json')
-            
-        else:
-            # 404
-            data = json.dumps({'error': '404'})
-            response = http_response(data, 'application/json', '404 Not Found')
-        
-        conn.send(response)
-        conn.close()
-        gc.collect()
-        
-    except Exception as e:
-        print(f"[DASH] Erro: {e}")
-        try:
-            conn.close()
-        except:
-            pass
-        gc.collect()
+server = None
+scheduler = None
+link = None
+ip = None
+
+def start(srv):
+    """Assume o servidor: bind no IP da STA, rotas, tasks e fontes do dashboard"""
+    global server, scheduler, link, ip, clock_task
+
+    wlan = network.WLAN(network.STA_IF)
+    if not wlan.isconnected():
+        # Sem link na partida ainda não há estado em RAM a perder: o boot reconecta mais rápido
+        print("[DASH] ⚠️ WiFi desconectado! Reiniciando...")
+        import machine
+        time.sleep(2)
+        machine.reset()
+    ip = wlan.ifconfig()[0]
+
+    # Headers pré-codificados (CORS + Keep-Alive) usados em todas as respostas
+    http_writer.configure(http_writer.CORS_BASIC, IDLE_TIMEOUT_MS // 1000, MAX_REQUESTS)
+
+    # Tasks periódicas (rodam no prazo mesmo com clientes ativos)
+    scheduler = Scheduler(max_wait_ms=1000)
+    link = LinkWatchdog(wlan, config.get_str('wifi', 'ssid'), config.get_str('wifi', 'password'),
+                        on_link_down, on_link_up, backoff_max_ms=LINK_RETRY_MAX_MS)
+    scheduler.add('link', link.check, LINK_CHECK_MS, budget_ms=50)
+    if ntptime:
+        clock_task = scheduler.add('clock', sync_clock, CLOCK_RETRY_MS, budget_ms=1500, delay_ms=0)
+    scheduler.add('sensors', update_sensors, 10000, budget_ms=100)
+    scheduler.add('idle_clients', srv.expire_idle, 1000, budget_ms=20)
+    scheduler.add('sensors_flush', sensors.maybe_flush, 1000, budget_ms=200)
+    scheduler.add('history', record_history, HISTORY_INTERVAL_S * 1000, budget_ms=20)
+    scheduler.add('history_log', record_log, LOG_INTERVAL_S * 1000, budget_ms=200)
+    scheduler.add('sse', sse_tick, 1000, budget_ms=50)
+    scheduler.add('miners', publish_miners, MINERS_PUBLISH_MS, budget_ms=20)
+    scheduler.add('rules', rules.tick, 1000, budget_ms=20)
+
+    # Troca de modo: conexões do setup não servem mais
+    server = srv
+    srv.close_all()
+    srv.tag = '[DASH]'
+    srv.configure(IDLE_TIMEOUT_MS, MAX_REQUESTS)
+    srv.routes = routes
+    srv.scheduler = scheduler
+    srv.sources = [poller, events]   # Mineradoras e inscritos SSE no mesmo select()
+    srv.listen((ip, PORT))
+
+    print("=" * 40)
+    print(f"[DASH] ✅ Servidor rodando!")
+    print(f"[DASH] ✅ Motor: {srv.engine} + keep-alive")
+    print("=" * 40)
+    print(f"[DASH] 🌐 http://{ip}:{PORT}")
+    print("=" * 40)
@@ -0,0 +1,140 @@
+"""
+History - Monitor Miner v3.0
+Histórico dos sensores em memória fixa (ring buffer por métrica)
+
+- array de inteiros escalados (int16 por padrão): 2 bytes por amostra
+- Timestamp implícito: slot = (t // interval) % slots - nada de guardar tempo
+- Append O(1); lacunas (sensor parado) marcadas como vazio
+- Consulta reduz o intervalo a N buckets (min/max/média) escritos direto no socket
+"""
+
+from array import array
+
+# typecode -> (bytes por amostra, marcador de slot vazio fora da faixa gravada)
+_TYPES = {'b': (1, -128), 'h': (2, -32768), 'i': (4, -(1 << 30))}
+
+class Series:
+    """Ring buffer de uma métrica"""
+
+    def __init__(self, name, interval_s, slots, decimals=1, typecode='h'):
+        self.name = name
+        self.interval = interval_s
+        self.slots = slots
+        self.decimals = decimals
+        self.scale = 10 ** decimals
+        size, self.empty = _TYPES[typecode]
+        self.top = -self.empty - 1
+        self.data = array(typecode, bytes(size * slots))
+        for i in range(slots):
+            self.data[i] = self.empty
+        self.last = -1             # Índice de tempo (t // interval) do slot mais novo
+        self.count = 0             # Slots válidos (até slots)
+
+    def append(self, t, value):
+        """Grava value no slot do instante t (sobrescreve o mesmo slot)"""
+        ts = int(t) // self.interval
+        data = self.data
+        if self.count and ts <= self.last:
+            if ts <= self.last - self.count:
+                return False       # Mais antigo que a janela
+        elif self.count:
+            # Lacuna: slots pulados ficam vazios (no máximo uma volta)
+            gap = min(ts - self.last - 1, self.slots)
+            i = self.last + 1
+            for _ in range(gap):
+                data[i % self.slots] = self.empty
+                i += 1
+            self.count = min(self.count + ts - self.last, self.slots)
+            self.last = ts
+        else:
+            self.count = 1
+            self.last = ts
+
+        v = int(round(value * self.scale))
+        if v > self.top:
+            v = self.top
+        elif v <= self.empty:
+            v = self.empty + 1
+        data[ts % self.slots] = v
+        return True
+
+    def stream(self, w, start=None, end=None, points=120):
+        """Escreve o JSON da consulta em w (http_writer.ChunkedWriter)
+
+        Cada bucket vira [t, min, max, média] com t = início do bucket;
+        buckets sem amostras são omitidos.
+        """
+        w.write(b'{"metric": "')
+        w.write(self.name)
+        w.write(b'", "interval": ')
+        w.write_int(self.interval)
+        w.write(b', "points": [')
+
+        if self.count and points > 0:
+            first = self.last - self.count + 1
+            lo = first if start is None else max(first, int(start) // self.interval)
+            hi = self.last if end is None else min(self.last, int(end) // self.interval)
+            n = hi - lo + 1
+            if n > 0:
+                self._buckets(w, lo, n, (n + points - 1) // points)
+
+        w.write(b']}')
+
+    def _buckets(self, w, lo, n, size):
+        """min/max/média de cada grupo de `size` slots a partir de lo"""
+        data = self.data
+        slots = self.slots
+        empty = self.empty
+        decimals = self.decimals
+        sep = False
+        i = lo
+        stop = lo + n
+        while i < stop:
+            bucket_end = min(i + size, stop)
+            vmin = vmax = empty
+            total = 0
+            count = 0
+            for ts in range(i, bucket_end):
+                v = data[ts % slots]
+                if v == empty:
+                    continue
+                if not count or v < vmin:
+                    vmin = v
+                if not count or v > vmax:
+                    vmax = v
+                total += v
+                count += 1
+            if count:
+                w.write(b',[' if sep else b'[')
+                w.write_int(i * self.interval)
+                w.write(b',')
+                w.write_fixed(vmin, decimals)
+                w.write(b',')
+                w.write_fixed(vmax, decimals)
+                w.write(b',')
+                w.write_fixed((total + count // 2) // count, decimals)
+                w.write(b']')
+                sep = True
+            i = bucket_end
+
+class History:
+    """Conjunto de séries com o mesmo intervalo de amostragem"""
+
+    def __init__(self, interval_s=30, slots=2880):
+        self.interval = interval_s
+        self.slots = slots
+        self.series = {}
+
+    def add(self, name, decimals=1, typecode='h'):
+        """Cria a série (memória alocada uma vez aqui)"""
+        series = Series(name, self.interval, self.slots, decimals, typecode)
+        self.series[name] = series
+        return series
+
+    def get(self, name):
+        return self.series.get(name)
+
+    def append(self, name, t, value):
+        series = self.series.get(name)
+        if series:
+            series.append(t, value)
@@ -0,0 +1,220 @@
+"""
+History Log - Monitor Miner v3.0
+Log binário append-only dos sensores no flash (dias de leituras)
+
+- Registro fixo via struct: timestamp uint32 + valores inteiros escalados
+- Segmentos de tamanho limitado em data/hist/; o mais antigo é apagado na rotação
+- Registros acumulados em RAM e gravados em lote (menos escritas no flash)
+- Índice em RAM (primeiro/último timestamp por segmento) + busca binária por seek
+- Segmento com registro incompleto no fim (queda de energia na gravação) não
+  recebe mais registros: o próximo lote abre outro segmento, alinhado
+- Exportação em streaming (CSV ou JSON) direto para o socket
+"""
+
+import os
+import struct
+
+class HistoryLog:
+    """Segmentos data/hist/NNNNNNNN.bin com registros de tamanho fixo"""
+
+    def __init__(self, fields, directory='data/hist', segment_bytes=16384,
+                 max_segments=32, flush_records=10):
+        self.fields = fields                          # [(nome, decimais, typecode)]
+        self.fmt = '<I' + ''.join(f[2] for f in fields)   # typecodes 'b', 'h', 'i'
+        self.record = struct.calcsize(self.fmt)
+        self.scales = [10 ** f[1] for f in fields]
+        self.directory = directory
+        self.segment_bytes = segment_bytes - segment_bytes % self.record
+        self.max_segments = max_segments
+        self.flush_records = flush_records
+
+        # Registros pendentes (gravados em lote)
+        self._pending = bytearray(self.record * flush_records)
+        self._count = 0
+        self._rec = bytearray(self.record)            # Leitura da busca binária
+        self.last_ts = 0
+        self.writes = 0
+
+        # Índice: [número, primeiro ts, último ts, registros] por segmento, em ordem
+        self.index = []
+        self._sealed = None                           # Segmento com cauda incompleta
+        self._load_index()
+
+    # ------------------------------------------------------------------------
+    # Índice
+    # ------------------------------------------------------------------------
+
+    def _path(self, number):
+        return f"{self.directory}/{number:08d}.bin"
+
+    def _load_index(self):
+        """Monta o índice lendo só o primeiro e o último registro de cada segmento"""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            os.mkdir(self.directory)
+            names = []
+
+        for name in sorted(names):
+            if not name.endswith('.bin'):
+                continue
+            try:
+                number = int(name[:-4])
+            except ValueError:
+                continue  # Arquivo estranho no diretório, não é segmento
+            path = self._path(number)
+            size = os.stat(path)[6]
+            count = size // self.record
+            if not count:
+                os.remove(path)
+                continue
+            if size % self.record:
+                # Append depois da cauda desalinharia todos os registros seguintes
+                self._sealed = number
+                print(f"[HIST] {path}: registro incompleto no fim ({size % self.record} bytes) - segmento fechado")
+            with open(path, 'rb') as f:
+                first = self._ts_at(f, 0)
+                last = self._ts_at(f, count - 1)
+            self.index.append([number, first, last, count])
+
+        if self.index:
+            self.last_ts = self.index[-1][2]
+        print(f"[HIST] {len(self.index)} segmentos no log")
+
+    def _ts_at(self, f, i):
+        """Timestamp do registro i do segmento aberto"""
+        f.seek(i * self.record)
+        f.readinto(self._rec)
+        return struct.unpack_from('<I', self._rec, 0)[0]
+
+    # ------------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------------
+
+    def append(self, ts, values):
+        """Acumula um registro (valores na ordem de fields)"""
+        ints = [int(round(v * s)) for v, s in zip(values, self.scales)]
+        struct.pack_into(self.fmt, self._pending, self._count * self.record, int(ts), *ints)
+        self._count += 1
+        if self._count >= self.flush_records:
+            self.flush()
+
+    def flush(self):
+        """Grava os registros pendentes no segmento atual (rotaciona se cheio)"""
+        if not self._count:
+            return False
+        first = struct.unpack_from('<I', self._pending, 0)[0]
+        last = struct.unpack_from('<I', self._pending, (self._count - 1) * self.record)[0]
+
+        seg = self.index[-1] if self.index else None
+        # Segmento novo se cheio ou se o relógio voltou (cada segmento fica ordenado)
+        if (seg is None or (seg[3] + self._count) * self.record > self.segment_bytes
+                or first < seg[2] or seg[0] == self._sealed):
+            seg = [seg[0] + 1 if seg else 1, first, first, 0]
+            self.index.append(seg)
+            while len(self.index) > self.max_segments:
+                old = self.index.pop(0)
+                try:
+                    os.remove(self._path(old[0]))
+                except OSError:
+                    pass
+
+        try:
+            with open(self._path(seg[0]), 'ab') as f:
+                f.write(memoryview(self._pending)[:self._count * self.record])
+        except OSError as e:
+            # Escrita pode ter ficado pela metade: lote vai inteiro para um segmento novo
+            self._sealed = seg[0]
+            print(f"[HIST] Erro ao gravar: {e}")
+            return False
+
+        seg[2] = last
+        seg[3] += self._count
+        self.last_ts = last
+        self._count = 0
+        self.writes += 1
+        return True
+
+    # ------------------------------------------------------------------------
+    # Consulta / exportação
+    # ------------------------------------------------------------------------
+
+    def _seek_first(self, f, count, start):
+        """Busca binária: primeiro registro com ts >= start"""
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._ts_at(f, mid) < start:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def export(self, w, start=0, end=0xFFFFFFFF, csv=True, block_records=32):
+        """Escreve os registros de [start, end] em w (http_writer.ChunkedWriter)"""
+        self.flush()
+        rec = self.record
+        fields = self.fields
+        buf = bytearray(rec * block_records)
+        mv = memoryview(buf)
+
+        if csv:
+            w.write(b'timestamp')
+            for f in fields:
+                w.write(b',')
+                w.write(f[0])
+            w.write(b'\n')
+        else:
+            w.write(b'{"fields": ["timestamp"')
+            for f in fields:
+                w.write(b', "')
+                w.write(f[0])
+                w.write(b'"')
+            w.write(b'], "records": [')
+
+        rows = 0
+        for number, first, last, count in list(self.index):
+            if last < start or first > end:
+                continue
+            try:
+                f = open(self._path(number), 'rb')
+            except OSError:
+                continue
+            with f:
+                i = self._seek_first(f, count, start) if first < start else 0
+                f.seek(i * rec)
+                done = False
+                while i < count and not done:
+                    n = f.readinto(mv[:min(block_records, count - i) * rec]) // rec
+                    if not n:
+                        break
+                    for k in range(n):
+                        values = struct.unpack_from(self.fmt, buf, k * rec)
+                        if values[0] > end:
+                            done = True
+                            break
+                        if csv:
+                            w.write_int(values[0])
+                        else:
+                            w.write(b',[' if rows else b'[')
+                            w.write_int(values[0])
+                        for j in range(len(fields)):
+                            w.write(b',')
+                            w.write_fixed(values[j + 1], fields[j][1])
+                        w.write(b'\n' if csv else b']')
+                        rows += 1
+                    i += n
+
+        if not csv:
+            w.write(b']}')
+        return rows
+
+    def stats(self):
+        """Resumo do log para APIs"""
+        return {
+            'segments': len(self.index),
+            'records': sum(seg[3] for seg in self.index) + self._count,
+            'first': self.index[0][1] if self.index else 0,
+            'last': self.last_ts,
+            'writes': self.writes,
+        }
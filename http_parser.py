@@ -0,0 +1,271 @@
+"""
+HTTP Parser - Monitor Miner v3.0
+Parser incremental de requisições HTTP (compartilhado pelos servidores)
+
+- Leituras parciais acumuladas num bytearray fixo por conexão (readinto)
+- Fim dos headers achado por máquina de estados (\\r\\n\\r\\n), sem split
+- Body completo só quando Content-Length bytes chegaram
+- Strings criadas só sob demanda: method/path e os headers que a rota pedir
+"""
+
+import json
+import errno
+
+# Estados do parser
+HEADERS = 0      # Aguardando fim dos headers
+BODY = 1         # Headers ok, aguardando body
+DONE = 2         # Requisição completa
+CLOSED = 3       # Cliente fechou a conexão
+ERROR = 4        # Requisição inválida (ver .error = status HTTP)
+
+_CR = 13
+_LF = 10
+_COLON = 58
+_SPACE = 32
+
+class Request:
+    """Requisição HTTP parseada in-place num buffer reutilizável"""
+
+    def __init__(self, size=2048):
+        self.buf = bytearray(size)
+        self.mv = memoryview(self.buf)
+        self.length = 0          # Bytes válidos no buffer
+        self.reset()
+
+    def reset(self):
+        """Prepara para a próxima requisição (mantém bytes já recebidos)"""
+        self.state = HEADERS
+        self.error = 0
+        self._scan = 0           # Próximo byte a examinar
+        self._match = 0          # Quantos bytes de \r\n\r\n já casaram
+        self.head_end = 0        # Início do body
+        self.content_length = 0
+        self.keep_alive = False
+        self.http11 = False
+        self.method = None
+        self.path = None
+        self.query = ''
+        self._lines = 0          # Início da primeira linha de header
+        self._params = None
+
+    def clear(self):
+        """Descarta tudo (conexão nova)"""
+        self.length = 0
+        self.reset()
+
+    # ------------------------------------------------------------------------
+    # Entrada
+    # ------------------------------------------------------------------------
+
+    def feed(self, conn):
+        """Lê o que estiver disponível no socket e avança o parser"""
+        if self.length >= len(self.buf):
+            return self._fail(431 if self.state == HEADERS else 413)
+
+        try:
+            if hasattr(conn, 'readinto'):
+                n = conn.readinto(self.mv[self.length:])
+            else:
+                n = conn.recv_into(self.mv[self.length:])
+        except OSError as e:
+            if e.args[0] == errno.EAGAIN:
+                return self.state
+            raise
+
+        if n is None:
+            # Socket non-blocking sem dados (MicroPython)
+            return self.state
+        return self.received(n)
+
+    def received(self, n):
+        """n bytes já gravados em mv[length:] (ex.: readinto de stream asyncio); 0 = fechou"""
+        if n == 0:
+            self.state = CLOSED
+            return CLOSED
+        self.length += n
+        return self.parse()
+
+    def feed_bytes(self, data):
+        """Acrescenta bytes já lidos (ex.: stream asyncio) e avança o parser"""
+        n = len(data)
+        if self.length + n > len(self.buf):
+            return self._fail(431 if self.state == HEADERS else 413)
+        self.buf[self.length:self.length + n] = data
+        self.length += n
+        return self.parse()
+
+    def parse(self):
+        """Avança com os bytes que já estão no buffer"""
+        if self.state == HEADERS:
+            if not self._scan_headers():
+                if self.length >= len(self.buf):
+                    return self._fail(431)
+                return HEADERS
+            if not self._parse_head():
+                return ERROR
+            self.state = BODY
+
+        if self.state == BODY:
+            if self.length - self.head_end >= self.content_length:
+                self.state = DONE
+
+        return self.state
+
+    def consume(self):
+        """Remove a requisição atendida do buffer (preserva pipelining)"""
+        end = self.head_end + self.content_length
+        rest = self.length - end
+        if rest > 0:
+            self.buf[0:rest] = bytes(self.mv[end:self.length])
+            self.length = rest
+        else:
+            self.length = 0
+        self.reset()
+        if self.length:
+            self.parse()
+        return self.state
+
+    def _fail(self, status):
+        self.state = ERROR
+        self.error = status
+        return ERROR
+
+    def _scan_headers(self):
+        """Procura \\r\\n\\r\\n a partir de onde parou (sem alocar)"""
+        buf = self.buf
+        i = self._scan
+        m = self._match
+        end = self.length
+        while i < end:
+            c = buf[i]
+            i += 1
+            if c == (_CR if m % 2 == 0 else _LF):
+                m += 1
+                if m == 4:
+                    self._scan = i
+                    self.head_end = i
+                    return True
+            elif c == _CR:
+                m = 1
+            else:
+                m = 0
+        self._scan = i
+        self._match = m
+        return False
+
+    def _parse_head(self):
+        """Linha de requisição + headers que o servidor sempre precisa"""
+        buf = self.buf
+        end = self.head_end - 4
+
+        # Linha de requisição: METHOD SP TARGET SP VERSION
+        sp1 = _index(buf, _SPACE, 0, end)
+        sp2 = _index(buf, _SPACE, sp1 + 1, end) if sp1 > 0 else -1
+        eol = _index(buf, _CR, 0, end + 2)
+        if sp1 <= 0 or sp2 <= sp1 + 1 or eol < sp2:
+            self._fail(400)
+            return False
+
+        self.method = bytes(self.mv[0:sp1]).decode()
+        q = _index(buf, 63, sp1 + 1, sp2)  # '?'
+        if q < 0:
+            self.path = bytes(self.mv[sp1 + 1:sp2]).decode()
+        else:
+            self.path = bytes(self.mv[sp1 + 1:q]).decode()
+            self.query = bytes(self.mv[q + 1:sp2]).decode()
+        http11 = eol - sp2 - 1 == 8 and buf[eol - 1] == 49 and buf[eol - 3] == 49  # HTTP/1.1
+        self.http11 = http11
+        self._lines = eol + 2
+
+        # Content-Length (sem criar string)
+        span = self._find(b'content-length')
+        if span:
+            n = 0
+            for i in range(span[0], span[1]):
+                c = buf[i]
+                if c < 48 or c > 57:
+                    self._fail(400)
+                    return False
+                n = n * 10 + c - 48
+            if self.head_end + n > len(buf):
+                self._fail(413)
+                return False
+            self.content_length = n
+
+        # Connection: HTTP/1.1 mantém por padrão
+        span = self._find(b'connection')
+        if span:
+            first = buf[span[0]] | 0x20
+            self.keep_alive = first == 107 if not http11 else first != 99  # 'k'eep-alive / 'c'lose
+        else:
+            self.keep_alive = http11
+        return True
+
+    # ------------------------------------------------------------------------
+    # Acesso (aloca só o que a rota pedir)
+    # ------------------------------------------------------------------------
+
+    def _find(self, name):
+        """(início, fim) do valor do header `name` (minúsculo, bytes) ou None"""
+        buf = self.buf
+        n = len(name)
+        i = self._lines
+        end = self.head_end - 2
+        while i < end:
+            if i + n < end and buf[i + n] == _COLON:
+                k = 0
+                while k < n and (buf[i + k] | 0x20) == name[k]:
+                    k += 1
+                if k == n:
+                    vs = i + n + 1
+                    while buf[vs] == _SPACE:
+                        vs += 1
+                    ve = _index(buf, _CR, vs, end)
+                    while ve > vs and buf[ve - 1] == _SPACE:
+                        ve -= 1
+                    return vs, ve
+            i = _index(buf, _LF, i, end)
+            if i < 0:
+                break
+            i += 1
+        return None
+
+    def header(self, name, default=None):
+        """Valor do header (str); name em minúsculas"""
+        span = self._find(name.encode() if isinstance(name, str) else name)
+        if span is None:
+            return default
+        return bytes(self.mv[span[0]:span[1]]).decode()
+
+    def body(self):
+        """Body como memoryview (sem cópia) - válido até consume()"""
+        return self.mv[self.head_end:self.head_end + self.content_length]
+
+    def json(self):
+        """Body decodificado como JSON (None se vazio ou inválido)"""
+        if not self.content_length:
+            return None
+        try:
+            return json.loads(bytes(self.body()).decode())
+        except ValueError as e:
+            print(f"[PARSE] Erro ao parsear JSON: {e}")
+            return None
+
+    def param(self, name, default=None):
+        """Parâmetro da query string (?a=1&b=2)"""
+        if self._params is None:
+            self._params = {}
+            if self.query:
+                for pair in self.query.split('&'):
+                    k, _, v = pair.partition('=')
+                    self._params[k] = v
+        return self._params.get(name, default)
+
+def _index(buf, byte, start, end):
+    """Posição de `byte` em buf[start:end] ou -1 (sem fatiar)"""
+    i = start
+    while i < end:
+        if buf[i] == byte:
+            return i
+        i += 1
+    return -1
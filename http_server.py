@@ -0,0 +1,369 @@
+"""
+HTTP Server - Monitor Miner v3.0
+Motor HTTP único dos dois modos (setup em AP e dashboard em STA)
+
+- select() com o socket de escuta, clientes keep-alive e fontes extras
+  (consultas às mineradoras, inscritos SSE) no mesmo loop
+- Parsers pré-alocados: conexão nova não aloca buffer
+- Controle de admissão: cheio, cede a conexão keep-alive ociosa mais antiga;
+  se todas estão no meio de uma requisição, 503 + Retry-After na hora
+- Prazos por conexão (headers desde o primeiro byte, body desde os headers):
+  cliente lento ou mudo recebe 408 e não segura um parser; quem não lê a
+  resposta em SEND_TIMEOUT_MS (http_writer) é fechado
+- Connection: close, erro e 503 fecham por half-close: o socket fica no
+  select() até o FIN do cliente ou LINGER_MS, sem parar o loop
+- Cada modo registra rotas, scheduler e fontes com start(server); trocar de
+  modo é trocar esses três e refazer o bind, sem reiniciar a placa
+"""
+
+import socket
+import time
+import errno
+import gc
+import select
+import http_writer
+from http_parser import Request, HEADERS, BODY, DONE, CLOSED, ERROR
+from router import Router
+
+MAX_CLIENTS = 4            # Conexões persistentes abertas ao mesmo tempo
+MAX_REQUEST_SIZE = 2048    # Buffer do parser por conexão (431 se os headers não cabem)
+IDLE_TIMEOUT_MS = 7000     # Maior que o polling de 5s do dashboard.js
+MAX_REQUESTS = 100         # Requisições por conexão antes de fechar
+MAX_WAIT_MS = 1000         # Teto do select() sem scheduler
+HEADER_TIMEOUT_MS = 3000   # Conexão nova ou requisição começada até o fim dos headers
+BODY_TIMEOUT_MS = 5000     # Fim dos headers até o body completo
+LINGER_MS = 250            # Espera máxima pelo FIN do cliente depois do half-close
+
+# 503 quando não há parser livre: o browser tenta de novo depois de Retry-After
+BUSY = b'{"error": "Servidor ocupado"}'
+RETRY_AFTER = b'Retry-After: 2\r\n'
+
+# Header e corpo saem em sends separados: com Nagle o último segmento espera o
+# ACK atrasado do cliente (~40ms por resposta). Nem todo port expõe a opção.
+TCP_NODELAY = getattr(socket, 'TCP_NODELAY', None)
+IPPROTO_TCP = getattr(socket, 'IPPROTO_TCP', 6)
+
+def nodelay(conn):
+    """Desliga o Nagle na conexão (se o port suporta)"""
+    if TCP_NODELAY is not None:
+        try:
+            conn.setsockopt(IPPROTO_TCP, TCP_NODELAY, 1)
+        except OSError:
+            pass
+
+class HttpServer:
+    """Loop select() + conexões persistentes; rotas/tasks definidas pelo modo
+
+    Fontes extras (server.sources) expõem readers/writers (listas de
+    sockets), on_readable/on_writable(sock), timeout_ms(limite) e run().
+    """
+
+    engine = 'select'
+
+    def __init__(self, max_clients=MAX_CLIENTS, max_request_size=MAX_REQUEST_SIZE):
+        self.max_clients = max_clients
+        self.idle_timeout = IDLE_TIMEOUT_MS
+        self.max_requests = MAX_REQUESTS
+        self.tag = '[HTTP]'            # Prefixo dos logs (modo atual)
+
+        self.sock = None
+        self.addr = None
+        self.routes = Router()
+        self.scheduler = None
+        self.sources = []
+
+        # socket -> [parser, último uso (ticks_ms), requisições atendidas,
+        #            prazo da fase (ticks_ms ou None se ocioso), fase]
+        self.clients = {}
+        self.parsers = [Request(max_request_size) for _ in range(max_clients)]
+        self.closing = {}              # socket -> prazo (ticks_ms) para o FIN do cliente
+
+        self.last_activity = time.ticks_ms()
+        self.listen_ms = 0
+        self.first_byte_ms = 0
+        self.loops = 0
+        self.idle_loops = 0            # select() acordou só pelo timeout
+        self.rejected = 0              # 503 por falta de parser livre
+        self.timeouts = 0              # 408 por prazo de headers/body + envio sem progresso
+        self.evicted = 0               # Keep-alive ocioso fechado para dar lugar a outro
+        self.running = False
+
+    # ------------------------------------------------------------------------
+    # Modo
+    # ------------------------------------------------------------------------
+
+    def configure(self, idle_timeout_ms=IDLE_TIMEOUT_MS, max_requests=MAX_REQUESTS):
+        """Limites de keep-alive do modo"""
+        self.idle_timeout = idle_timeout_ms
+        self.max_requests = max_requests
+
+    def listen(self, addr, backlog=5):
+        """(Re)faz o bind; fecha o socket de escuta anterior"""
+        if self.sock:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.setblocking(False)  # Non-blocking para usar select()
+        sock.bind(addr)
+        sock.listen(backlog)
+        self.sock = sock
+        self.addr = addr
+        if not self.listen_ms:
+            self.listen_ms = time.ticks_ms()
+            print(f"{self.tag} ⏱ Boot até o listen: {self.listen_ms}ms")
+
+    def close_all(self):
+        """Fecha todas as conexões de clientes (troca de modo/IP)"""
+        for conn in list(self.clients):
+            self.close(conn)
+        for conn in list(self.closing):
+            self.release(conn)
+
+    # ------------------------------------------------------------------------
+    # Conexões
+    # ------------------------------------------------------------------------
+
+    def detach(self, conn):
+        """Remove o cliente do select() sem fechar (ex.: conexão passou para o SSE)"""
+        state = self.clients.pop(conn, None)
+        if state:
+            self.parsers.append(state[0])
+
+    def close(self, conn, linger=False):
+        """Remove o cliente do select() e fecha o socket (linger: ver linger())"""
+        self.detach(conn)
+        if linger:
+            self.linger(conn)
+            return
+        try:
+            conn.close()
+        except:
+            pass
+
+    def linger(self, conn):
+        """Half-close depois da última resposta; o socket fica em closing
+
+        Fechar com dados não lidos faz o lwIP mandar RST e o browser perder a
+        resposta. O loop descarta o que chegar (drain) e fecha no FIN;
+        expire_idle fecha quem não mandar o FIN em LINGER_MS.
+        """
+        try:
+            shutdown = getattr(conn, 'shutdown', None)
+            if shutdown:
+                shutdown(1)  # SHUT_WR
+        except OSError:
+            pass
+        self.closing[conn] = time.ticks_add(time.ticks_ms(), LINGER_MS)
+
+    def drain(self, conn):
+        """Socket em closing ficou legível: descarta os dados, fecha no FIN"""
+        try:
+            if conn.recv(64):
+                return
+        except OSError as e:
+            if e.args[0] == errno.EAGAIN:
+                return
+        self.release(conn)
+
+    def release(self, conn):
+        """Fim do closing (FIN do cliente ou prazo)"""
+        self.closing.pop(conn, None)
+        try:
+            conn.close()
+        except:
+            pass
+
+    def accept(self):
+        """Aceita conexão nova do socket de escuta"""
+        conn, client_addr = self.sock.accept()
+        conn.setblocking(False)
+        nodelay(conn)
+        if self.admit(conn):
+            print(f"{self.tag} Conexão de {client_addr} ({len(self.clients)} abertas)")
+
+    def admit(self, conn):
+        """Reserva um parser para a conexão (cede um keep-alive ocioso ou recusa com 503 se cheio)"""
+        if not self.parsers:
+            # Só conexões entre requisições podem ser fechadas sem perder trabalho
+            oldest = None
+            for c, state in self.clients.items():
+                if state[3] is None and (oldest is None or
+                                         time.ticks_diff(state[1], self.clients[oldest][1]) < 0):
+                    oldest = c
+            if oldest is None:
+                self.reject(conn)
+                return None
+            self.evicted += 1
+            self.close(oldest)
+
+        req = self.parsers.pop()
+        req.clear()
+        now = time.ticks_ms()
+        # Conexão nova tem HEADER_TIMEOUT_MS para mandar a primeira requisição
+        state = self.clients[conn] = [req, now, 0, time.ticks_add(now, HEADER_TIMEOUT_MS), HEADERS]
+        return state
+
+    def reject(self, conn):
+        """503 + Retry-After sem parser; a requisição é descartada no closing"""
+        self.rejected += 1
+        print(f"{self.tag} Limite de {self.max_clients} conexões ocupadas - 503")
+        try:
+            http_writer.send_bytes(conn, BUSY, 'application/json', 503, RETRY_AFTER)
+        except OSError:
+            pass
+        self.linger(conn)
+
+    def arm(self, state, now):
+        """Prazo da fase atual; ocioso entre requisições fica sem prazo (vale o idle_timeout)"""
+        req = state[0]
+        phase = req.state if req.length or not state[2] else None
+        if phase == state[4]:
+            return
+        state[4] = phase
+        if phase == HEADERS:
+            state[3] = time.ticks_add(now, HEADER_TIMEOUT_MS)
+        elif phase == BODY:
+            state[3] = time.ticks_add(now, BODY_TIMEOUT_MS)
+        else:
+            state[3] = None
+
+    def handle(self, conn, req):
+        """Despacha pela tabela de rotas (cada rota escreve direto no socket)"""
+        print(f"{self.tag} {req.method} {req.path}")
+        sent = self.routes.dispatch(conn, req)
+        if not self.first_byte_ms:
+            self.first_byte_ms = time.ticks_ms()
+            print(f"{self.tag} ⏱ Boot até o primeiro byte: {self.first_byte_ms}ms")
+        return sent
+
+    def failed(self, conn, e):
+        """Exceção atendendo o cliente; envio sem progresso no prazo conta em timeouts"""
+        if isinstance(e, OSError) and e.args and e.args[0] == errno.ETIMEDOUT:
+            self.timeouts += 1
+            print(f"{self.tag} Cliente não leu a resposta em {http_writer.SEND_TIMEOUT_MS}ms - fechando")
+        else:
+            print(f"{self.tag} Erro no cliente: {e}")
+        self.close(conn)
+
+    def serve(self, conn):
+        """Lê o que chegou no socket e processa"""
+        state = self.clients[conn]
+        self.process(conn, state, state[0].feed(conn))
+
+    def process(self, conn, state, status):
+        """Responde cada requisição completa do buffer e arma o prazo da próxima"""
+        req = state[0]
+        now = state[1] = self.last_activity = time.ticks_ms()
+
+        # Atende todas as requisições completas (pipelining)
+        while status == DONE:
+            state[2] += 1
+            if state[2] >= self.max_requests:
+                req.keep_alive = False
+
+            self.handle(conn, req)
+            state[3] = state[4] = None  # Próxima requisição arma o próprio prazo
+            if conn not in self.clients:
+                return  # Conexão virou stream SSE (ou o modo trocou)
+
+            # Handler pode desligar keep-alive (ex.: streaming para HTTP/1.0)
+            if not req.keep_alive:
+                self.close(conn, linger=True)
+                return
+            status = req.consume()
+
+        if status == CLOSED:
+            self.close(conn)
+        elif status == ERROR:
+            print(f"{self.tag} Requisição inválida ({req.error}) - fechando")
+            http_writer.send_empty(conn, req.error)
+            self.close(conn, linger=True)
+        else:
+            self.arm(state, now)
+
+    def expire_idle(self):
+        """Task periódica: 408 para prazo de headers/body estourado, fecha ociosos
+        e os closing sem FIN no prazo"""
+        now = time.ticks_ms()
+        for conn, deadline in list(self.closing.items()):
+            if time.ticks_diff(now, deadline) >= 0:
+                self.release(conn)
+        for conn, state in list(self.clients.items()):
+            deadline = state[3]
+            if deadline is not None and time.ticks_diff(now, deadline) >= 0:
+                self.timeouts += 1
+                print(f"{self.tag} Requisição incompleta no prazo - 408")
+                try:
+                    http_writer.send_empty(conn, 408)
+                except OSError:
+                    pass
+                self.close(conn)
+            elif time.ticks_diff(now, state[1]) > self.idle_timeout:
+                self.close(conn)
+
+    def stats(self):
+        return {'engine': self.engine, 'clients': len(self.clients), 'closing': len(self.closing),
+                'rejected': self.rejected, 'timeouts': self.timeouts, 'evicted': self.evicted}
+
+    # ------------------------------------------------------------------------
+    # Loop
+    # ------------------------------------------------------------------------
+
+    def poll(self):
+        """Uma iteração: select() até evento ou próximo deadline, depois tasks"""
+        readers = [self.sock] + list(self.clients) + list(self.closing)
+        writers = []
+        timeout = self.scheduler.timeout_ms() if self.scheduler else MAX_WAIT_MS
+        for source in self.sources:
+            readers += source.readers
+            writers += source.writers
+            timeout = source.timeout_ms(timeout)
+
+        readable, writable, _ = select.select(readers, writers, [], timeout / 1000)
+        self.loops += 1
+        if not readable and not writable:
+            self.idle_loops += 1
+
+        for sock in writable:
+            for source in self.sources:
+                source.on_writable(sock)
+
+        sock_listen = self.sock
+        for sock in readable:
+            if sock is sock_listen:
+                self.accept()
+            elif sock in self.clients:
+                try:
+                    self.serve(sock)
+                except Exception as e:
+                    self.failed(sock, e)
+            elif sock in self.closing:
+                self.drain(sock)
+            else:
+                for source in self.sources:
+                    source.on_readable(sock)
+
+        self.tick()
+
+        if readable:
+            gc.collect()
+
+    def tick(self):
+        """Trabalho das fontes e tasks vencidas (depois de cada select)"""
+        for source in self.sources:
+            source.run()
+        if self.scheduler:
+            self.scheduler.run_due()
+
+    def run(self):
+        """Loop principal (não retorna)"""
+        self.running = True
+        while self.running:
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"{self.tag} Erro: {e}")
+                gc.collect()
@@ -0,0 +1,307 @@
+"""
+HTTP Writer - Monitor Miner v3.0
+Envio de respostas sem montar header + corpo em memória
+
+- Linhas de header pré-codificadas (bytes) montadas num buffer fixo
+- Arquivos lidos do flash direto para o mesmo buffer (readinto)
+- Content-Length vem do os.stat() - pico de heap não depende do arquivo
+- Envio guiado por select() (nada de sleep fixo)
+- Corpos de tamanho desconhecido em chunks montados no mesmo buffer
+"""
+
+import os
+import time
+import select
+import errno
+
+BUF_SIZE = 1024
+SEND_TIMEOUT_MS = 500      # Espera máxima por progresso no envio (o loop inteiro espera junto)
+
+# Buffer único reutilizado por todas as respostas (servidor single-thread)
+_buf = bytearray(BUF_SIZE)
+_mv = memoryview(_buf)
+
+# ============================================================================
+# TEMPLATES DE HEADER
+# ============================================================================
+
+STATUS = {
+    200: b'HTTP/1.1 200 OK\r\n',
+    204: b'HTTP/1.1 204 No Content\r\n',
+    304: b'HTTP/1.1 304 Not Modified\r\n',
+    400: b'HTTP/1.1 400 Bad Request\r\n',
+    404: b'HTTP/1.1 404 Not Found\r\n',
+    405: b'HTTP/1.1 405 Method Not Allowed\r\n',
+    406: b'HTTP/1.1 406 Not Acceptable\r\n',
+    408: b'HTTP/1.1 408 Request Timeout\r\n',
+    413: b'HTTP/1.1 413 Payload Too Large\r\n',
+    431: b'HTTP/1.1 431 Request Header Fields Too Large\r\n',
+    500: b'HTTP/1.1 500 Internal Server Error\r\n',
+    503: b'HTTP/1.1 503 Service Unavailable\r\n',
+}
+
+CORS_BASIC = b'Access-Control-Allow-Origin: *\r\n'
+CORS_FULL = (b'Access-Control-Allow-Origin: *\r\n'
+             b'Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n'
+             b'Access-Control-Allow-Headers: Content-Type\r\n')
+
+CONTENT_LENGTH = b'Content-Length: '
+CRLF = b'\r\n'
+CONN_CLOSE = b'Connection: close\r\n\r\n'
+TRANSFER_CHUNKED = b'Transfer-Encoding: chunked\r\n'
+
+# Ajustados por configure() conforme o servidor
+_cors = CORS_BASIC
+_keep_alive = b'Connection: keep-alive\r\n\r\n'
+
+# content_type -> linha de header pronta
+_content_types = {}
+
+def configure(cors=CORS_BASIC, keep_alive_timeout=5, max_requests=100):
+    """Define CORS e header Keep-Alive usados em todas as respostas"""
+    global _cors, _keep_alive
+    _cors = cors
+    _keep_alive = f"Connection: keep-alive\r\nKeep-Alive: timeout={keep_alive_timeout}, max={max_requests}\r\n\r\n".encode()
+
+def content_type_header(content_type):
+    """Linha Content-Type codificada uma vez por tipo"""
+    line = _content_types.get(content_type)
+    if line is None:
+        line = f"Content-Type: {content_type}; charset=utf-8\r\n".encode()
+        _content_types[content_type] = line
+    return line
+
+# ============================================================================
+# ENVIO
+# ============================================================================
+
+def write_all(conn, data, timeout_ms=SEND_TIMEOUT_MS):
+    """Envia todo o buffer; em socket non-blocking espera com select() neste cliente"""
+    mv = data if isinstance(data, memoryview) else memoryview(data)
+    total = len(mv)
+    sent = 0
+    deadline = time.ticks_add(time.ticks_ms(), timeout_ms)
+
+    while sent < total:
+        try:
+            n = conn.send(mv[sent:])
+        except OSError as e:
+            if e.args[0] != errno.EAGAIN:
+                raise
+            n = 0
+
+        if n:
+            sent += n
+            continue
+
+        # Buffer TCP cheio: dormir no select() até o socket aceitar mais
+        remaining = time.ticks_diff(deadline, time.ticks_ms())
+        if remaining <= 0:
+            raise OSError(errno.ETIMEDOUT)
+        select.select([], [conn], [], remaining / 1000)
+
+    return sent
+
+def _put(pos, data):
+    """Copia bytes para o buffer na posição pos"""
+    end = pos + len(data)
+    _buf[pos:end] = data
+    return end
+
+def _put_int(pos, n):
+    """Escreve inteiro em ASCII no buffer sem criar string"""
+    if n == 0:
+        _buf[pos] = 48
+        return pos + 1
+    start = pos
+    while n:
+        _buf[pos] = 48 + n % 10
+        n //= 10
+        pos += 1
+    # Dígitos saíram invertidos
+    i, j = start, pos - 1
+    while i < j:
+        _buf[i], _buf[j] = _buf[j], _buf[i]
+        i += 1
+        j -= 1
+    return pos
+
+def _header(status, content_type, length, headers, keep_alive):
+    """Monta o header no buffer e retorna o tamanho"""
+    pos = _put(0, STATUS.get(status) or STATUS[500])
+    if content_type:
+        pos = _put(pos, content_type_header(content_type))
+    pos = _put(pos, CONTENT_LENGTH)
+    pos = _put_int(pos, length)
+    pos = _put(pos, CRLF)
+    pos = _put(pos, _cors)
+    if headers:
+        pos = _put(pos, headers)
+    return _put(pos, _keep_alive if keep_alive else CONN_CLOSE)
+
+def send_bytes(conn, body, content_type='text/html', status=200, headers=b'', keep_alive=False):
+    """Envia resposta com corpo em memória (str ou bytes)"""
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    length = len(body)
+    pos = _header(status, content_type, length, headers, keep_alive)
+
+    if pos + length <= BUF_SIZE:
+        # Corpo pequeno: header + corpo num único send (um segmento TCP)
+        _buf[pos:pos + length] = body
+        return write_all(conn, _mv[:pos + length])
+
+    write_all(conn, _mv[:pos])
+    return pos + write_all(conn, body)
+
+def send_empty(conn, status=204, headers=b'', keep_alive=False):
+    """Resposta sem corpo (304, 204, OPTIONS)"""
+    pos = _header(status, None, 0, headers, keep_alive)
+    return write_all(conn, _mv[:pos])
+
+def send_file(conn, filename, content_type, status=200, headers=b'', keep_alive=False, size=None):
+    """Transmite arquivo do flash em blocos de BUF_SIZE pelo buffer fixo"""
+    if size is None:
+        size = os.stat(filename)[6]
+
+    with open(filename, 'rb') as f:
+        return send_stream(conn, f, size, content_type, status, headers, keep_alive)
+
+def send_stream(conn, f, size, content_type, status=200, headers=b'', keep_alive=False):
+    """Transmite size bytes a partir da posição atual de f (arquivo ou trecho do pacote)"""
+    pos = _header(status, content_type, size, headers, keep_alive)
+    total = pos
+    remaining = size
+
+    # Primeiro bloco aproveita o espaço livre depois do header
+    while remaining > 0:
+        n = f.readinto(_mv[pos:pos + remaining] if remaining < BUF_SIZE - pos else _mv[pos:])
+        if not n:
+            break
+        total += write_all(conn, _mv[:pos + n]) - pos
+        remaining -= n
+        pos = 0
+
+    if pos:
+        # Arquivo vazio: só o header
+        total = write_all(conn, _mv[:pos])
+
+    if remaining > 0:
+        # Arquivo encolheu entre stat() e leitura: conexão não pode ser reutilizada
+        raise OSError(errno.EIO)
+    return total
+
+# ============================================================================
+# CORPO EM STREAMING (Transfer-Encoding: chunked)
+# ============================================================================
+
+_HEX = b'0123456789abcdef'
+_CHUNK_HEAD = 5            # 'xxx\r\n': tamanho em 3 dígitos hex (zeros à esquerda)
+_LAST_CHUNK = b'0\r\n\r\n'
+_CHUNK_END = b'\r\n0\r\n\r\n'      # Fim do chunk atual + chunk final
+
+def _chunk_size(pos, n):
+    """Tamanho do chunk em hex no espaço reservado antes dos dados"""
+    _buf[pos] = _HEX[(n >> 8) & 15]
+    _buf[pos + 1] = _HEX[(n >> 4) & 15]
+    _buf[pos + 2] = _HEX[n & 15]
+    _buf[pos + 3] = 13
+    _buf[pos + 4] = 10
+
+class ChunkedWriter:
+    """Corpo gerado aos poucos, escrito direto no buffer fixo
+
+    Cada buffer cheio vira um chunk (um send); o header vai junto com o
+    primeiro chunk. Sem chunked (HTTP/1.0) o corpo termina no fechamento.
+    """
+
+    def __init__(self, conn, content_type, status=200, headers=b'', keep_alive=False, chunked=True):
+        self.conn = conn
+        self.chunked = chunked
+        self.sent = 0
+        pos = _put(0, STATUS.get(status) or STATUS[500])
+        pos = _put(pos, content_type_header(content_type))
+        if chunked:
+            pos = _put(pos, TRANSFER_CHUNKED)
+        pos = _put(pos, _cors)
+        if headers:
+            pos = _put(pos, headers)
+        pos = _put(pos, _keep_alive if keep_alive and chunked else CONN_CLOSE)
+        self._base = pos                       # Início do chunk atual
+        self.pos = pos + _CHUNK_HEAD if chunked else pos
+        # Espaço para fechar o chunk e o chunk final sem estourar o buffer
+        self._limit = BUF_SIZE - len(_CHUNK_END) if chunked else BUF_SIZE
+
+    def _flush(self):
+        """Envia o que está no buffer como um chunk"""
+        pos = self.pos
+        if self.chunked:
+            base = self._base
+            n = pos - base - _CHUNK_HEAD
+            if n == 0:
+                return
+            _chunk_size(base, n)
+            pos = _put(pos, CRLF)
+        self.sent += write_all(self.conn, _mv[:pos])
+        self._base = 0
+        self.pos = _CHUNK_HEAD if self.chunked else 0
+
+    def _room(self, n):
+        if self.pos + n > self._limit:
+            self._flush()
+
+    def write(self, data):
+        """Acrescenta bytes/str (quebrados em vários chunks se preciso)"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        mv = memoryview(data)
+        while len(mv):
+            self._room(1)
+            n = min(len(mv), self._limit - self.pos)
+            _buf[self.pos:self.pos + n] = mv[:n]
+            self.pos += n
+            mv = mv[n:]
+
+    def write_int(self, n):
+        """Inteiro em ASCII sem criar string"""
+        self._room(12)
+        if n < 0:
+            _buf[self.pos] = 45  # '-'
+            self.pos += 1
+            n = -n
+        self.pos = _put_int(self.pos, n)
+
+    def write_fixed(self, n, decimals):
+        """Inteiro escalado como decimal: write_fixed(-255, 1) -> -25.5"""
+        if not decimals:
+            return self.write_int(n)
+        self._room(16)
+        if n < 0:
+            _buf[self.pos] = 45
+            self.pos += 1
+            n = -n
+        scale = 10 ** decimals
+        self.pos = _put_int(self.pos, n // scale)
+        _buf[self.pos] = 46  # '.'
+        pos = self.pos + decimals
+        frac = n % scale
+        for i in range(decimals):
+            _buf[pos - i] = 48 + frac % 10
+            frac //= 10
+        self.pos = pos + 1
+
+    def close(self):
+        """Envia o restante e o chunk final; retorna total de bytes"""
+        pos = self.pos
+        if self.chunked:
+            base = self._base
+            n = pos - base - _CHUNK_HEAD
+            if n:
+                # Último chunk e terminador no mesmo send
+                _chunk_size(base, n)
+                pos = _put(pos, _CHUNK_END)
+            else:
+                pos = _put(base, _LAST_CHUNK)
+        if pos:
+            self.sent += write_all(self.conn, _mv[:pos])
+        return self.sent
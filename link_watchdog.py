@@ -0,0 +1,104 @@
+"""
+Link Watchdog - Monitor Miner v3.0
+Supervisão do WiFi em operação: reconecta sem machine.reset()
+
+- Task periódica do scheduler: nunca bloqueia (connect() do ESP32 é assíncrono)
+- Queda detectada pelo isconnected(); reconexão em segundo plano com backoff
+- Estado em RAM (histórico, tabela de mineradoras) preservado
+- Callbacks na queda e na volta (com o IP, para refazer o bind se mudou)
+"""
+
+import time
+import network
+
+UP = 0
+DOWN = 1
+CONNECTING = 2
+
+STATE_NAMES = ('up', 'down', 'connecting')
+
+# Status que encerram a tentativa antes do timeout
+STAT_FAILED = tuple(getattr(network, name) for name in
+                    ('STAT_WRONG_PASSWORD', 'STAT_NO_AP_FOUND', 'STAT_CONNECT_FAIL')
+                    if hasattr(network, name))
+
+class LinkWatchdog:
+    """Máquina de estados UP -> DOWN -> CONNECTING -> UP"""
+
+    def __init__(self, wlan, ssid, password, on_down=None, on_up=None,
+                 backoff_min_ms=2000, backoff_max_ms=60000, connect_timeout_ms=15000):
+        self.wlan = wlan
+        self.ssid = ssid
+        self.password = password
+        self.on_down = on_down              # on_down()
+        self.on_up = on_up                  # on_up(ip, ip_anterior)
+        self.backoff_min = backoff_min_ms
+        self.backoff_max = backoff_max_ms
+        self.connect_timeout = connect_timeout_ms
+        self.backoff = backoff_min_ms
+
+        self.state = UP if wlan.isconnected() else DOWN
+        self.ip = wlan.ifconfig()[0] if self.state == UP else None
+        self._at = time.ticks_ms()          # Próxima tentativa (DOWN) ou deadline (CONNECTING)
+        self._down_since = self._at
+        self.drops = 0
+        self.attempts = 0
+        self.last_outage_ms = 0
+
+    def check(self):
+        """Avança a máquina de estados (chamar a cada ~1s)"""
+        now = time.ticks_ms()
+
+        if self.state == UP:
+            if not self.wlan.isconnected():
+                self.state = DOWN
+                self.drops += 1
+                self._down_since = now
+                self._at = now
+                self.backoff = self.backoff_min
+                print("[LINK] ⚠️ WiFi caiu - reconectando em segundo plano")
+                if self.on_down:
+                    self.on_down()
+
+        elif self.state == DOWN:
+            if time.ticks_diff(now, self._at) >= 0:
+                self.attempts += 1
+                print(f"[LINK] Tentativa {self.attempts}: conectando a {self.ssid}")
+                try:
+                    self.wlan.active(True)
+                    self.wlan.disconnect()
+                    self.wlan.connect(self.ssid, self.password)
+                    self.state = CONNECTING
+                    self._at = time.ticks_add(now, self.connect_timeout)
+                except OSError as e:
+                    print(f"[LINK] Erro ao conectar: {e}")
+                    self._retry(now)
+
+        elif self.state == CONNECTING:
+            if self.wlan.isconnected():
+                previous = self.ip
+                self.ip = self.wlan.ifconfig()[0]
+                self.state = UP
+                self.last_outage_ms = time.ticks_diff(now, self._down_since)
+                print(f"[LINK] ✅ Reconectado em {self.last_outage_ms}ms - IP {self.ip}")
+                if self.on_up:
+                    self.on_up(self.ip, previous)
+            elif self.wlan.status() in STAT_FAILED or time.ticks_diff(now, self._at) >= 0:
+                self._retry(now)
+
+    def _retry(self, now):
+        """Volta a DOWN e agenda a próxima tentativa com backoff exponencial"""
+        self.state = DOWN
+        self._at = time.ticks_add(now, self.backoff)
+        print(f"[LINK] Falha (status {self.wlan.status()}) - nova tentativa em {self.backoff}ms")
+        self.backoff = min(self.backoff * 2, self.backoff_max)
+
+    def stats(self):
+        """Estado para APIs"""
+        return {
+            'state': STATE_NAMES[self.state],
+            'ip': self.ip,
+            'drops': self.drops,
+            'attempts': self.attempts,
+            'last_outage_ms': self.last_outage_ms,
+        }
@@ -1,10 +1,17 @@
 """
 Main - Monitor Miner v3.0
-ROTEADOR: Decide se carrega setup.py ou dashboard.py
+ROTEADOR: Decide se o servidor sobe com o setup ou com o dashboard
+
+Um único motor HTTP; cada modo registra rotas e tasks com start(server).
+O setup troca para o dashboard ao vivo, sem reiniciar.
+
+Motor em data/config.json ("server": {"engine": ...}): "select" (padrão,
+http_server.py) ou "asyncio" (async_server.py).
 """
 
-import json
+import sys
 import network
+from config_store import store as config
 
 print("[MAIN] ========================================")
 print("[MAIN] Monitor Miner v3.0")
@@ -14,15 +21,28 @@ print("[MAIN] ========================================")
 ap = network.WLAN(network.AP_IF)
 sta = network.WLAN(network.STA_IF)
 
+if config.get_str('server', 'engine', 'select') == 'asyncio':
+    from async_server import AsyncHttpServer as Server
+else:
+    from http_server import HttpServer as Server
+server = Server()
+print(f"[MAIN] Motor HTTP: {server.engine}")
+
 if ap.active():
     # Modo AP - Carregar setup_wifi
     print("[MAIN] Modo AP detectado → Carregando setup_wifi.py")
     import setup_wifi
+    setup_wifi.start(server)
+    # Daqui em diante só rotas e tasks seguram o setup: o handoff troca as
+    # duas pelas do dashboard e o módulo inteiro vira lixo
+    del setup_wifi
+    del sys.modules['setup_wifi']
     
 elif sta.active() and sta.isconnected():
     # Modo STA - Carregar dashboard
     print("[MAIN] Modo STA detectado → Carregando dashboard.py")
     import dashboard
+    dashboard.start(server)
     
 else:
     print("[MAIN] ⚠️ Nenhuma interface ativa! Reiniciando...")
@@ -30,3 +50,9 @@ else:
     import time
     time.sleep(2)
     machine.reset()
+
+# Loop principal (não retorna)
+try:
+    server.run()
+except KeyboardInterrupt:
+    print("[MAIN] Servidor encerrado")
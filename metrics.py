@@ -0,0 +1,216 @@
+"""
+Metrics - Monitor Miner v3.0
+Instrumentação das requisições exportada em formato texto do Prometheus
+
+- Contadores pré-alocados (array) por rota: medir não aloca no heap
+- Latência (ticks_us) em histograma de buckets fixos
+- Bytes enviados e delta de gc.mem_alloc() por requisição
+- Tasks do scheduler e iterações do loop select() (http_server) no mesmo /api/metrics
+- Exportação sem f-string por linha: nomes/rótulos em bytes prontos, valores via write_int
+"""
+
+import gc
+import time
+from array import array
+
+# Limites dos buckets de latência (µs); o último bucket é +Inf
+BUCKETS_US = (1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000, 500000, 1000000)
+
+class Metrics:
+    """Contadores por rota (id = ordem de registro) + contadores do loop"""
+
+    def __init__(self, max_routes=16, buckets_us=BUCKETS_US):
+        self.buckets = buckets_us
+        self.max_routes = max_routes
+        self.names = []                                   # id -> rota
+        self.labels = []                                  # id -> b'{route="..."' (sem fechar)
+        self.task_labels = {}                             # nome da task -> b'{task="..."} '
+        self.le = [_seconds(us).encode() for us in buckets_us]
+        n = max_routes
+        self.width = len(buckets_us) + 1
+        self.hist = array('I', bytes(4 * n * self.width))  # [id * width + bucket]
+        self.count = array('I', bytes(4 * n))
+        self.sum_s = array('I', bytes(4 * n))              # Soma das latências: segundos
+        self.sum_us = array('I', bytes(4 * n))             # ... e o resto em µs
+        self.sent = array('I', bytes(4 * n))
+        self.alloc = array('I', bytes(4 * n))              # Bytes alocados (soma dos deltas)
+        self.alloc_max = array('I', bytes(4 * n))
+
+    def wrap(self, name, handler):
+        """Handler instrumentado (criado uma vez, no registro da rota)"""
+        if name in self.names:
+            rid = self.names.index(name)
+        elif len(self.names) < self.max_routes:
+            rid = len(self.names)
+            self.names.append(name)
+            self.labels.append(f'{{route="{name}"'.encode())
+        else:
+            print(f"[METRICS] Limite de {self.max_routes} rotas - {name} sem métricas")
+            return handler
+
+        def measured(conn, req):
+            t0 = time.ticks_us()
+            a0 = gc.mem_alloc()
+            sent = handler(conn, req)
+            self.record(rid, time.ticks_diff(time.ticks_us(), t0), gc.mem_alloc() - a0, sent)
+            return sent
+        return measured
+
+    def record(self, rid, us, alloc, sent):
+        """Acumula uma requisição (só inteiros pequenos: sem alocação)"""
+        b = 0
+        for limit in self.buckets:
+            if us <= limit:
+                break
+            b += 1
+        self.hist[rid * self.width + b] += 1
+        self.count[rid] += 1
+        rem = self.sum_us[rid] + us
+        if rem >= 1000000:
+            self.sum_s[rid] += rem // 1000000
+            rem %= 1000000
+        self.sum_us[rid] = rem
+        if sent:
+            self.sent[rid] = (self.sent[rid] + sent) & 0xFFFFFFFF
+        # Delta negativo: o gc rodou no meio da requisição
+        if alloc > 0:
+            self.alloc[rid] = (self.alloc[rid] + alloc) & 0xFFFFFFFF
+            if alloc > self.alloc_max[rid]:
+                self.alloc_max[rid] = alloc
+
+    # ------------------------------------------------------------------------
+    # Exportação
+    # ------------------------------------------------------------------------
+
+    def render(self, w, scheduler=None, server=None):
+        """Escreve todas as métricas no writer (ChunkedWriter): nomes/rótulos
+        são bytes prontos, valores vão direto para o buffer com write_int"""
+        self._per_route(w, REQUESTS, self.count)
+
+        name, head = DURATION
+        w.write(head)
+        last = len(self.buckets)
+        for rid, label in enumerate(self.labels):
+            base = rid * self.width
+            total = 0
+            for b in range(self.width):
+                total += self.hist[base + b]
+                w.write(name)
+                w.write(b'_bucket')
+                w.write(label)
+                w.write(b',le="')
+                w.write(INF if b == last else self.le[b])
+                w.write(b'"} ')
+                w.write_int(total)
+                w.write(b'\n')
+            w.write(name)
+            w.write(b'_sum')
+            w.write(label)
+            w.write(b'} ')
+            w.write_int(self.sum_s[rid])
+            _micro(w, self.sum_us[rid])
+            w.write(name)
+            w.write(b'_count')
+            w.write(label)
+            w.write(b'} ')
+            w.write_int(total)
+            w.write(b'\n')
+
+        self._per_route(w, SENT, self.sent)
+        self._per_route(w, ALLOC, self.alloc)
+        self._per_route(w, ALLOC_MAX, self.alloc_max)
+
+        if scheduler:
+            tasks = scheduler.tasks
+            for metric, attr in TASK_METRICS:
+                self._per_task(w, metric, tasks, attr)
+
+        if server:
+            _single(w, LOOPS, server.loops)
+            _single(w, IDLE_LOOPS, server.idle_loops)
+            _single(w, CONNECTIONS, len(server.clients))
+            _single(w, REJECTED, server.rejected)
+            _single(w, TIMEOUTS, server.timeouts)
+            _single(w, EVICTED, server.evicted)
+        _single(w, HEAP_FREE, gc.mem_free())
+        _single(w, HEAP_ALLOC, gc.mem_alloc())
+        _single(w, UPTIME, time.ticks_ms() // 1000)
+
+    def _per_route(self, w, metric, values):
+        name, head = metric
+        w.write(head)
+        for rid, label in enumerate(self.labels):
+            w.write(name)
+            w.write(label)
+            w.write(b'} ')
+            w.write_int(values[rid])
+            w.write(b'\n')
+
+    def _per_task(self, w, metric, tasks, attr):
+        name, head = metric
+        w.write(head)
+        labels = self.task_labels
+        for task in tasks:
+            label = labels.get(task.name)
+            if label is None:
+                # Codificado uma vez por nome de task (o conjunto é fixo)
+                label = labels[task.name] = f'{{task="{task.name}"}} '.encode()
+            w.write(name)
+            w.write(label)
+            w.write_int(getattr(task, attr))
+            w.write(b'\n')
+
+def _metric(name, kind, text):
+    """(nome, linhas HELP/TYPE) em bytes, montados uma vez no import"""
+    return name.encode(), f'# HELP {name} {text}\n# TYPE {name} {kind}\n'.encode()
+
+REQUESTS = _metric('monitor_http_requests_total', 'counter', 'Requisições atendidas')
+DURATION = _metric('monitor_http_request_duration_seconds', 'histogram', 'Latência do handler')
+SENT = _metric('monitor_http_response_bytes_total', 'counter', 'Bytes enviados')
+ALLOC = _metric('monitor_http_alloc_bytes_total', 'counter', 'Heap alocado durante as requisições')
+ALLOC_MAX = _metric('monitor_http_alloc_bytes_max', 'gauge', 'Maior alocação numa requisição')
+
+TASK_METRICS = (
+    (_metric('monitor_task_runs_total', 'counter', 'Execuções'), 'runs'),
+    (_metric('monitor_task_overruns_total', 'counter', 'Execuções acima do budget'), 'overruns'),
+    (_metric('monitor_task_skipped_total', 'counter', 'Períodos perdidos'), 'skipped'),
+    (_metric('monitor_task_errors_total', 'counter', 'Exceções'), 'errors'),
+    (_metric('monitor_task_duration_us_max', 'gauge', 'Maior duração'), 'max_us'),
+    (_metric('monitor_task_duration_us_total', 'counter', 'Duração acumulada'), 'total_us'),
+    (_metric('monitor_task_jitter_ms_max', 'gauge', 'Maior atraso em relação ao deadline'), 'max_jitter'),
+)
+
+LOOPS = _metric('monitor_loop_iterations_total', 'counter', 'Iterações do loop select()')
+IDLE_LOOPS = _metric('monitor_loop_idle_total', 'counter', 'Iterações acordadas só pelo timeout')
+CONNECTIONS = _metric('monitor_http_connections', 'gauge', 'Conexões keep-alive abertas')
+REJECTED = _metric('monitor_http_rejected_total', 'counter', 'Conexões recusadas com 503 (servidor cheio)')
+TIMEOUTS = _metric('monitor_http_timeouts_total', 'counter', 'Prazos estourados: requisição incompleta (408) ou envio sem progresso')
+EVICTED = _metric('monitor_http_evicted_total', 'counter', 'Keep-alive ocioso fechado para dar lugar a outro')
+HEAP_FREE = _metric('monitor_heap_free_bytes', 'gauge', 'Heap livre')
+HEAP_ALLOC = _metric('monitor_heap_alloc_bytes', 'gauge', 'Heap alocado')
+UPTIME = _metric('monitor_uptime_seconds', 'gauge', 'Tempo desde o boot')
+
+INF = b'+Inf'
+
+def _single(w, metric, value):
+    name, head = metric
+    w.write(head)
+    w.write(name)
+    w.write(b' ')
+    w.write_int(value)
+    w.write(b'\n')
+
+def _micro(w, us):
+    """Fim da linha do _sum: '.000250\n' (µs com 6 dígitos) sem formatar string"""
+    w.write(b'.')
+    limit = 100000
+    while limit > 1 and us < limit:
+        w.write(b'0')
+        limit //= 10
+    w.write_int(us)
+    w.write(b'\n')
+
+def _seconds(us):
+    """Limite do bucket em segundos sem float ('0.0025')"""
+    s = f'{us // 1000000}.{us % 1000000:06d}'.rstrip('0')
+    return s + '0' if s.endswith('.') else s
@@ -0,0 +1,216 @@
+"""
+Miner Poller - Monitor Miner v3.0
+Consulta concorrente da API TCP do cgminer/bmminer (porta 4028)
+
+- Sockets non-blocking multiplexados no mesmo select() do servidor HTTP
+- Conexão, envio e leitura nunca bloqueiam: cada passo espera o select()
+- Limite de requisições simultâneas (in-flight) e timeout por mineradora
+- Backoff exponencial para hosts mortos; consultas espalhadas no intervalo
+- Resposta entregue em pedaços a um extrator (não fica inteira na RAM)
+"""
+
+import socket
+import errno
+from scheduler import Clock
+
+try:
+    import heapq
+except ImportError:
+    import uheapq as heapq
+
+EINPROGRESS = getattr(errno, 'EINPROGRESS', 115)
+
+RECV_SIZE = 512
+
+# Fases de uma consulta
+CONNECTING = 0
+READING = 1
+
+class MinerPoller:
+    """Agenda e executa consultas às mineradoras sem bloquear o loop"""
+
+    def __init__(self, hosts, handler, reply_factory, port=4028, interval_ms=30000, timeout_ms=3000,
+                 max_inflight=8, backoff_max_ms=300000, command=b'{"command":"summary+stats"}',
+                 clock=None):
+        self.handler = handler              # handler(idx, extrator | None)
+        self.interval = interval_ms
+        self.timeout = timeout_ms
+        self.max_inflight = max_inflight
+        self.backoff_max = backoff_max_ms
+        self.command = command
+        self.now = (clock or Clock()).now
+
+        # Endereços resolvidos uma vez ("ip" ou "ip:porta")
+        self.addrs = []
+        for host in hosts:
+            h, _, p = host.partition(':')
+            self.addrs.append(socket.getaddrinfo(h, int(p) if p else port)[0][-1])
+        n = len(self.addrs)
+        self.failures = bytearray(n)
+
+        # Próxima consulta de cada mineradora: (deadline, idx), espalhadas no intervalo
+        now = self.now()
+        self._due = [(now + i * interval_ms // max(n, 1), i) for i in range(n)]
+        heapq.heapify(self._due)
+
+        # Consultas em andamento: socket -> [idx, fase, deadline, extrator, bytes lidos]
+        self.inflight = {}
+        self.readers = []
+        self.writers = []
+        # Extratores reutilizados (reset() + feed(pedaço)), um por consulta simultânea
+        self._replies = [reply_factory() for _ in range(min(max_inflight, n))]
+
+        self.paused = False                 # Sem rede: não inicia consultas
+
+        self.polls = 0
+        self.errors = 0
+        self.timeouts = 0
+
+    # ------------------------------------------------------------------------
+    # Agenda
+    # ------------------------------------------------------------------------
+
+    def timeout_ms(self, limit):
+        """Quanto o select() pode dormir sem atrasar consultas/timeouts"""
+        now = self.now()
+        wait = limit
+        if self._due and not self.paused and len(self.inflight) < self.max_inflight:
+            wait = min(wait, self._due[0][0] - now)
+        for state in self.inflight.values():
+            wait = min(wait, state[2] - now)
+        return max(wait, 0)
+
+    def run(self):
+        """Expira consultas vencidas e inicia as que chegaram no horário"""
+        now = self.now()
+        for sock, state in list(self.inflight.items()):
+            if now >= state[2]:
+                self.timeouts += 1
+                self._finish(sock, False)
+
+        while not self.paused and self._due and self._due[0][0] <= now and len(self.inflight) < self.max_inflight:
+            _, idx = heapq.heappop(self._due)
+            self._start(idx, now)
+
+    def pause(self):
+        """Link caiu: cancela consultas em andamento sem contar como falha"""
+        self.paused = True
+        now = self.now()
+        for sock in list(self.inflight):
+            state = self._drop(sock)
+            self._replies.append(state[3])
+            heapq.heappush(self._due, (now, state[0]))
+
+    def resume(self):
+        """Link voltou: zera o backoff (a falha era da rede) e reagenda no intervalo"""
+        self.paused = False
+        now = self.now()
+        n = len(self._due)
+        self.failures = bytearray(len(self.addrs))
+        self._due = [(min(deadline, now + i * self.interval // max(n, 1)), idx)
+                     for i, (deadline, idx) in enumerate(sorted(self._due))]
+        heapq.heapify(self._due)
+
+    def _schedule(self, idx, ok):
+        """Próxima consulta: intervalo normal ou backoff exponencial"""
+        if ok:
+            self.failures[idx] = 0
+            delay = self.interval
+        else:
+            failures = min(self.failures[idx] + 1, 255)
+            self.failures[idx] = failures
+            delay = min(self.interval << min(failures, 8), self.backoff_max)
+        heapq.heappush(self._due, (self.now() + delay, idx))
+
+    # ------------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------------
+
+    def _start(self, idx, now):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        try:
+            sock.connect(self.addrs[idx])
+        except OSError as e:
+            if e.args[0] not in (EINPROGRESS, errno.EAGAIN):
+                sock.close()
+                self.errors += 1
+                self.handler(idx, None)
+                self._schedule(idx, False)
+                return
+        self.polls += 1
+        reply = self._replies.pop()
+        reply.reset()
+        self.inflight[sock] = [idx, CONNECTING, now + self.timeout, reply, 0]
+        self.writers.append(sock)
+
+    def on_writable(self, sock):
+        """Conexão estabelecida: envia o comando (cabe no buffer TCP)"""
+        state = self.inflight.get(sock)
+        if state is None or state[1] != CONNECTING:
+            return
+        try:
+            sock.send(self.command)
+        except OSError:
+            # Conexão recusada aparece aqui (ECONNREFUSED / ENOTCONN)
+            self._finish(sock, False)
+            return
+        state[1] = READING
+        self.writers.remove(sock)
+        self.readers.append(sock)
+
+    def on_readable(self, sock):
+        """Passa o pedaço ao extrator; cgminer termina com \\x00 e fecha a conexão"""
+        state = self.inflight.get(sock)
+        if state is None:
+            return
+        try:
+            data = sock.recv(RECV_SIZE)
+        except OSError as e:
+            if e.args[0] == errno.EAGAIN:
+                return
+            self._finish(sock, False)
+            return
+        if data is None:
+            return
+        if data:
+            state[3].feed(data)
+            state[4] += len(data)
+        if not data or data[-1] == 0:
+            self._finish(sock, state[4] > 0)
+
+    def _drop(self, sock):
+        """Tira o socket do select() e fecha"""
+        state = self.inflight.pop(sock)
+        if sock in self.writers:
+            self.writers.remove(sock)
+        if sock in self.readers:
+            self.readers.remove(sock)
+        try:
+            sock.close()
+        except OSError:
+            pass
+        return state
+
+    def _finish(self, sock, ok):
+        state = self._drop(sock)
+        idx, reply = state[0], state[3]
+        if not ok:
+            self.errors += 1
+        try:
+            self.handler(idx, reply if ok else None)
+        except Exception as e:
+            print(f"[MINERS] Erro ao processar resposta: {e}")
+        self._replies.append(reply)
+        self._schedule(idx, ok)
+
+    def stats(self):
+        """Contadores para APIs"""
+        return {
+            'miners': len(self.addrs),
+            'inflight': len(self.inflight),
+            'polls': self.polls,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'paused': self.paused,
+        }
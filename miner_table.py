@@ -0,0 +1,206 @@
+"""
+Miner Table - Monitor Miner v3.0
+Estado das mineradoras em colunas (array) - centenas de unidades no heap do ESP32
+
+- Uma array por campo, indexada pelo id da mineradora (sem dict por unidade)
+- Resposta da API lida em streaming: só hashrate, temperatura e fans são extraídos
+- Agregados (online/offline/hashrate total) atualizados a cada resposta, sem recontar
+"""
+
+import time
+from array import array
+
+# Campos extraídos da resposta summary+stats
+HASH_GHS = 1
+HASH_MHS = 2
+TEMP = 3
+FAN = 4
+
+MAX_CARRY = 128       # Token cortado entre dois recv() (chave + número)
+
+def _classify(key):
+    """Campo de interesse para a chave JSON (ou 0)"""
+    if key == b'GHS 5s':
+        return HASH_GHS
+    if key == b'MHS 5s':
+        return HASH_MHS
+    if key.startswith(b'temp'):
+        return 0 if key == b'temp_num' else TEMP
+    if key == b'Temperature':
+        return TEMP
+    if key.startswith(b'fan'):
+        return FAN if len(key) > 3 and 48 <= key[3] <= 57 else 0
+    if key == b'Fan Speed In':
+        return FAN
+    return 0
+
+class MinerReply:
+    """Extrator em streaming de "chave": número (sem montar o JSON)
+
+    feed() recebe os pedaços do recv(); só as chaves de interesse têm o
+    número convertido. Máximos de temperatura e fans entre todas as placas.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.hashrate = -1    # GH/s
+        self.temp = -1        # °C (máximo)
+        self.fan = -1         # RPM (máximo)
+        self._carry = b''
+        self._in_string = False
+
+    def feed(self, data):
+        if self._carry:
+            data = self._carry + data
+            self._carry = b''
+        end = len(data)
+        i = 0
+
+        if self._in_string:
+            # Valor string que começou no pedaço anterior
+            i = data.find(b'"')
+            if i < 0:
+                return
+            i += 1
+            self._in_string = False
+
+        while True:
+            q = data.find(b'"', i)
+            if q < 0:
+                return
+            e = data.find(b'"', q + 1)
+            if e < 0:
+                self._keep(data, q)
+                return
+
+            j = e + 1
+            while j < end and data[j] == 32:
+                j += 1
+            if j >= end:
+                self._keep(data, q)
+                return
+            if data[j] != 58:  # ':' - era valor string ou item de lista
+                i = e + 1
+                continue
+
+            j += 1
+            while j < end and data[j] == 32:
+                j += 1
+            if j >= end:
+                self._keep(data, q)
+                return
+
+            c = data[j]
+            if c == 34:  # Valor string: pular
+                k = data.find(b'"', j + 1)
+                if k < 0:
+                    self._in_string = True
+                    return
+                i = k + 1
+                continue
+
+            field = _classify(data[q + 1:e]) if c == 45 or 48 <= c <= 57 else 0
+            if not field:
+                i = j
+                continue
+
+            # Número: parte inteira + 1 decimal (x10)
+            value = 0
+            decimals = -1
+            neg = c == 45
+            if neg:
+                j += 1
+            while j < end:
+                c = data[j]
+                if 48 <= c <= 57:
+                    if decimals < 0:
+                        value = value * 10 + c - 48
+                    elif decimals == 0:
+                        value = value * 10 + c - 48
+                        decimals = 1
+                elif c == 46 and decimals < 0:  # '.'
+                    decimals = 0
+                else:
+                    break
+                j += 1
+            if j >= end:
+                self._keep(data, q)   # Número pode continuar no próximo pedaço
+                return
+            if decimals < 1:
+                value *= 10
+            if neg:
+                value = -value
+            self._store(field, value)
+            i = j
+
+    def _keep(self, data, start):
+        """Guarda o token incompleto para o próximo pedaço"""
+        if len(data) - start <= MAX_CARRY:
+            self._carry = data[start:]
+
+    def _store(self, field, value10):
+        if field == HASH_GHS:
+            v = value10 // 10
+        elif field == HASH_MHS:
+            v = value10 // 10000
+        else:
+            v = value10 // 10
+            if field == TEMP:
+                if v > self.temp:
+                    self.temp = v
+            elif v > self.fan:
+                self.fan = v
+            return
+        if v > self.hashrate:
+            self.hashrate = v
+
+class MinerTable:
+    """Colunas por mineradora + agregados incrementais"""
+
+    def __init__(self, count):
+        self.count = count
+        self.hashrate = array('i', bytes(4 * count))     # GH/s
+        self.temp = array('h', bytes(2 * count))         # °C
+        self.fan = array('H', bytes(2 * count))          # RPM
+        self.last_seen = array('i', bytes(4 * count))    # ticks_ms da última resposta
+        self.errors = array('H', bytes(2 * count))       # Falhas consecutivas
+        self.online = bytearray(count)
+
+        # Agregados
+        self.online_count = 0
+        self.total_hashrate = 0
+
+    def update(self, idx, reply):
+        """Resposta válida: grava colunas e ajusta agregados"""
+        hashrate = max(reply.hashrate, 0)
+        if self.online[idx]:
+            self.total_hashrate += hashrate - self.hashrate[idx]
+        else:
+            self.online[idx] = 1
+            self.online_count += 1
+            self.total_hashrate += hashrate
+        self.hashrate[idx] = hashrate
+        self.temp[idx] = max(reply.temp, 0)
+        self.fan[idx] = min(max(reply.fan, 0), 65535)
+        self.last_seen[idx] = time.ticks_ms()
+        self.errors[idx] = 0
+
+    def fail(self, idx):
+        """Sem resposta: marca offline e tira do hashrate total"""
+        if self.errors[idx] < 65535:
+            self.errors[idx] += 1
+        if self.online[idx]:
+            self.online[idx] = 0
+            self.online_count -= 1
+            self.total_hashrate -= self.hashrate[idx]
+
+    def summary(self):
+        """Bloco 'miners' do estado dos sensores"""
+        return {
+            'total': self.count,
+            'online': self.online_count,
+            'offline': self.count - self.online_count,
+            'hashrate': self.total_hashrate,
+        }
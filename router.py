@@ -0,0 +1,76 @@
+"""
+Router - Monitor Miner v3.0
+Tabela de rotas compartilhada pelos servidores
+
+- Caminhos exatos num dict: O(1) não importa quantas rotas existam
+- Prefixos ('/api/history/*') numa árvore de segmentos
+- Método casado por rota (405 se o caminho existe com outro método)
+- Query string ignorada no casamento
+"""
+
+import http_writer
+
+NOT_FOUND = b'{"error": "404 - Not Found"}'
+NOT_ALLOWED = b'{"error": "405 - Method Not Allowed"}'
+
+class Router:
+    """Rotas exatas + árvore de prefixos, montadas uma vez no import"""
+
+    def __init__(self):
+        self.exact = {}       # caminho -> {método: handler}
+        self.tree = {}        # segmento -> nó; handlers do prefixo no nó em None
+
+    def add(self, method, path, handler):
+        """Registra handler(conn, req); path terminado em '/*' casa o prefixo"""
+        if path.endswith('/*'):
+            node = self.tree
+            for segment in path[1:-2].split('/'):
+                if segment:
+                    node = node.setdefault(segment, {})
+            node.setdefault(None, {})[method] = handler
+        else:
+            self.exact.setdefault(path, {})[method] = handler
+
+    def match(self, method, path):
+        """Retorna (handler, status): status 200, 404 ou 405"""
+        q = path.find('?')
+        if q >= 0:
+            path = path[:q]
+
+        found = False
+        methods = self.exact.get(path)
+        if methods:
+            handler = methods.get(method)
+            if handler:
+                return handler, 200
+            found = True
+
+        # Prefixo mais longo que aceita o método
+        best = None
+        node = self.tree
+        methods = node.get(None)
+        if methods:
+            # '/*' (ex.: preflight OPTIONS) não transforma 404 em 405
+            best = methods.get(method)
+        for segment in path[1:].split('/'):
+            node = node.get(segment)
+            if node is None:
+                break
+            methods = node.get(None)
+            if methods:
+                found = True
+                handler = methods.get(method)
+                if handler:
+                    best = handler
+
+        if best:
+            return best, 200
+        return None, 405 if found else 404
+
+    def dispatch(self, conn, req):
+        """Chama o handler da rota ou responde 404/405 em JSON"""
+        handler, status = self.match(req.method, req.path)
+        if handler:
+            return handler(conn, req)
+        body = NOT_ALLOWED if status == 405 else NOT_FOUND
+        return http_writer.send_bytes(conn, body, 'application/json', status, b'', req.keep_alive)
@@ -0,0 +1,206 @@
+"""
+Rules - Monitor Miner v3.0
+Regras de automação (relés e alertas) declaradas em data/rules.json
+
+    {"name": "resfriamento", "if": "temperature > 40", "for_s": 30, "clear": 38, "relay": 2}
+    {"name": "mineradoras", "if": "miners.offline > 3", "alert": "Mineradoras offline"}
+
+- Compiladas no load em listas de inscrição por métrica: cada leitura nova
+  reavalia só as regras daquela métrica (custo não cresce com o total de regras)
+- for_s (debounce): condição precisa se manter por N segundos para ativar
+- clear (histerese): ativa em "value", só libera quando a condição deixa de
+  valer contra "clear"
+- Estado em arrays/bytearray (1 posição por regra), sem objeto por regra
+"""
+
+import json
+import time
+from array import array
+
+# Operadores (índice = código guardado em self.op)
+OPS = ('>', '>=', '<', '<=', '==', '!=')
+
+# Estados por regra
+IDLE = 0       # Condição falsa
+PENDING = 1    # Condição verdadeira, aguardando for_s
+ACTIVE = 2     # Disparada (relé ligado / alerta ativo)
+
+STATE_NAMES = ('idle', 'pending', 'active')
+
+def _compare(op, a, b):
+    if op == 0:
+        return a > b
+    if op == 1:
+        return a >= b
+    if op == 2:
+        return a < b
+    if op == 3:
+        return a <= b
+    if op == 4:
+        return a == b
+    return a != b
+
+class RuleEngine:
+    """Regras compiladas + estado compacto; on_action(engine, i, active) executa"""
+
+    def __init__(self, filename='data/rules.json', on_action=None):
+        self.filename = filename
+        self.on_action = on_action
+        self.names = []
+        self.metrics = []             # 'temperature', 'miners.offline'
+        self.actions = []             # (relé ou None, mensagem de alerta ou None)
+        self.relays = {}              # relé -> GPIO (mapa do rules.json)
+        self.subs = {}                # chave -> {subchave ou None: [índices]}
+        self.pending = []             # Índices aguardando for_s (tick só olha estes)
+        self.evaluations = 0
+        self.activations = 0
+        self.load()
+
+    # ------------------------------------------------------------------------
+    # Compilação
+    # ------------------------------------------------------------------------
+
+    def load(self):
+        """Lê e compila as regras (regra inválida é ignorada com log)"""
+        try:
+            with open(self.filename, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[RULES] Sem regras ({self.filename}): {e}")
+            data = {}
+
+        compiled = []
+        for rule in data.get('rules', []):
+            try:
+                compiled.append(self._compile(rule))
+            except (KeyError, ValueError) as e:
+                print(f"[RULES] Regra ignorada {rule.get('name', '?')}: {e}")
+
+        n = len(compiled)
+        self.op = bytearray(n)
+        self.value = array('f', bytes(4 * n))
+        self.clear = array('f', bytes(4 * n))
+        self.hold = array('I', bytes(4 * n))    # for_s em ms
+        self.since = array('i', bytes(4 * n))   # ticks_ms do início do PENDING
+        self.state = bytearray(n)
+        self.fired = array('I', bytes(4 * n))
+        self.names = []
+        self.metrics = []
+        self.actions = []
+        self.subs = {}
+        self.pending = []
+        for i, (name, metric, op, value, clear, hold, action) in enumerate(compiled):
+            self.names.append(name)
+            self.metrics.append(metric)
+            self.actions.append(action)
+            self.op[i] = op
+            self.value[i] = value
+            self.clear[i] = clear
+            self.hold[i] = hold
+            key, _, sub = metric.partition('.')
+            self.subs.setdefault(key, {}).setdefault(sub or None, []).append(i)
+
+        self.relays = {int(k): v for k, v in data.get('relays', {}).items()}
+        print(f"[RULES] {n} regras em {len(self.subs)} métricas")
+
+    def _compile(self, rule):
+        metric, op, value = rule['if'].split()
+        if op not in OPS:
+            raise ValueError(f"operador {op}")
+        value = float(value)
+        clear = float(rule.get('clear', value))
+        relay = rule.get('relay')
+        alert = rule.get('alert')
+        if relay is None and alert is None:
+            raise ValueError('sem ação (relay/alert)')
+        return (rule.get('name', metric), metric, OPS.index(op), value, clear,
+                int(rule.get('for_s', 0) * 1000), (relay, alert))
+
+    # ------------------------------------------------------------------------
+    # Avaliação
+    # ------------------------------------------------------------------------
+
+    def on_change(self, key, sub, value):
+        """Listener do SensorState: reavalia só as regras inscritas na métrica"""
+        node = self.subs.get(key)
+        if node is None:
+            return
+        indices = node.get(sub)
+        if indices is None or not isinstance(value, (int, float)):
+            return
+        now = time.ticks_ms()
+        for i in indices:
+            self.evaluate(i, value, now)
+
+    def evaluate(self, i, value, now):
+        self.evaluations += 1
+        state = self.state[i]
+        op = self.op[i]
+        if state == ACTIVE:
+            # Histerese: libera só quando a condição deixa de valer contra clear
+            if not _compare(op, value, self.clear[i]):
+                self._set(i, IDLE)
+        elif _compare(op, value, self.value[i]):
+            if state == IDLE:
+                if self.hold[i]:
+                    self.state[i] = PENDING
+                    self.since[i] = now
+                    self.pending.append(i)
+                else:
+                    self._set(i, ACTIVE)
+        elif state == PENDING:
+            # Debounce: condição caiu antes de for_s
+            self.state[i] = IDLE
+            self.pending.remove(i)
+
+    def tick(self):
+        """Ativa regras pendentes que completaram for_s (task periódica)"""
+        if not self.pending:
+            return
+        now = time.ticks_ms()
+        due = [i for i in self.pending if time.ticks_diff(now, self.since[i]) >= self.hold[i]]
+        for i in due:
+            self.pending.remove(i)
+            self._set(i, ACTIVE)
+
+    def prime(self, data):
+        """Avalia todas as regras contra o estado atual (uma vez, depois do load)"""
+        now = time.ticks_ms()
+        for i, metric in enumerate(self.metrics):
+            key, _, sub = metric.partition('.')
+            value = data.get(key)
+            if sub and isinstance(value, dict):
+                value = value.get(sub)
+            if isinstance(value, (int, float)):
+                self.evaluate(i, value, now)
+
+    def _set(self, i, state):
+        self.state[i] = state
+        active = state == ACTIVE
+        if active:
+            self.fired[i] += 1
+            self.activations += 1
+        print(f"[RULES] {self.names[i]}: {'ATIVA' if active else 'liberada'}")
+        if self.on_action:
+            self.on_action(self, i, active)
+
+    # ------------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------------
+
+    def describe(self):
+        """Regras com estado (para /api/rules)"""
+        return [{'name': self.names[i], 'if': f"{self.metrics[i]} {OPS[self.op[i]]} {self.value[i]:g}",
+                 'clear': self.clear[i], 'for_s': self.hold[i] // 1000,
+                 'relay': self.actions[i][0], 'alert': self.actions[i][1],
+                 'state': STATE_NAMES[self.state[i]], 'fired': self.fired[i]}
+                for i in range(len(self.names))]
+
+    def active_alerts(self):
+        """Mensagens dos alertas ativos"""
+        return [self.actions[i][1] for i in range(len(self.names))
+                if self.state[i] == ACTIVE and self.actions[i][1] is not None]
+
+    def stats(self):
+        return {'rules': len(self.names), 'pending': len(self.pending),
+                'evaluations': self.evaluations, 'activations': self.activations}
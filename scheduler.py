@@ -0,0 +1,165 @@
+"""
+Scheduler - Monitor Miner v3.0
+Tasks periódicas cooperativas para o loop do select()
+
+- Heap de próximos deadlines: só a task mais próxima é examinada
+- timeout_ms() diz quanto o select() pode dormir até o próximo deadline
+- Cada task tem período e orçamento (budget); atrasos (jitter) e estouros
+  de orçamento (overrun) ficam registrados por task
+- once(): task de execução única (sai do scheduler depois de rodar)
+- Relógio interno monotônico em ms, acumulado com ticks_diff (sem wrap)
+"""
+
+import time
+
+try:
+    import heapq
+except ImportError:
+    import uheapq as heapq
+
+class Clock:
+    """Relógio monotônico em ms, acumulado com ticks_diff (não dá a volta)"""
+
+    def __init__(self):
+        self._clock = 0
+        self._last = time.ticks_ms()
+
+    def now(self):
+        t = time.ticks_ms()
+        self._clock += time.ticks_diff(t, self._last)
+        self._last = t
+        return self._clock
+
+class Task:
+    """Task periódica + estatísticas"""
+
+    def __init__(self, name, fn, period_ms, budget_ms):
+        self.name = name
+        self.fn = fn
+        self.period = period_ms
+        self.budget = budget_ms
+        self.active = True
+        self.deadline = 0
+        self.runs = 0
+        self.overruns = 0          # Execuções acima do budget
+        self.skipped = 0           # Períodos perdidos por atraso
+        self.errors = 0
+        self.last_us = 0           # Duração da última execução
+        self.max_us = 0
+        self.total_us = 0
+        self.last_jitter = 0       # Atraso (ms) em relação ao deadline
+        self.max_jitter = 0
+
+    def stats(self):
+        """Estatísticas como dict (para APIs)"""
+        return {
+            'name': self.name,
+            'period_ms': self.period,
+            'budget_ms': self.budget,
+            'runs': self.runs,
+            'overruns': self.overruns,
+            'skipped': self.skipped,
+            'errors': self.errors,
+            'last_us': self.last_us,
+            'max_us': self.max_us,
+            'avg_us': self.total_us // self.runs if self.runs else 0,
+            'last_jitter_ms': self.last_jitter,
+            'max_jitter_ms': self.max_jitter,
+        }
+
+class Scheduler:
+    """Heap de deadlines executado a cada volta do loop principal"""
+
+    def __init__(self, max_wait_ms=1000):
+        self.max_wait = max_wait_ms    # Teto do timeout do select()
+        self.tasks = []
+        self._heap = []                # (deadline, seq, task)
+        self._seq = 0
+        self.clock = Clock()
+        self.now = self.clock.now     # ms desde a criação do scheduler
+
+    def add(self, name, fn, period_ms, budget_ms=50, delay_ms=None):
+        """Registra fn() a cada period_ms (primeira execução após delay_ms)"""
+        task = Task(name, fn, period_ms, budget_ms)
+        self.tasks.append(task)
+        self._push(task, self.now() + (period_ms if delay_ms is None else delay_ms))
+        return task
+
+    def once(self, name, fn, delay_ms, budget_ms=50):
+        """Registra fn() para rodar uma única vez daqui a delay_ms"""
+        task = Task(name, fn, 0, budget_ms)
+        self.tasks.append(task)
+        self._push(task, self.now() + delay_ms)
+        return task
+
+    def cancel(self, task):
+        """Desativa a task (sai do heap na próxima vez que vencer)"""
+        task.active = False
+        if task in self.tasks:
+            self.tasks.remove(task)
+
+    def _push(self, task, deadline):
+        task.deadline = deadline
+        self._seq += 1
+        heapq.heappush(self._heap, (deadline, self._seq, task))
+
+    def timeout_ms(self):
+        """Quanto o select() pode esperar até o deadline mais próximo"""
+        if not self._heap:
+            return self.max_wait
+        wait = self._heap[0][0] - self.now()
+        if wait <= 0:
+            return 0
+        return min(wait, self.max_wait)
+
+    def run_due(self):
+        """Executa as tasks vencidas em ordem de deadline"""
+        heap = self._heap
+        now = self.now()
+        ran = 0
+        while heap and heap[0][0] <= now:
+            deadline, _, task = heapq.heappop(heap)
+            if not task.active:
+                continue
+
+            jitter = now - deadline
+            task.last_jitter = jitter
+            if jitter > task.max_jitter:
+                task.max_jitter = jitter
+
+            start = time.ticks_us()
+            try:
+                task.fn()
+            except Exception as e:
+                task.errors += 1
+                print(f"[SCHED] Erro na task {task.name}: {e}")
+            elapsed = time.ticks_diff(time.ticks_us(), start)
+
+            task.runs += 1
+            task.last_us = elapsed
+            task.total_us += elapsed
+            if elapsed > task.max_us:
+                task.max_us = elapsed
+            if elapsed > task.budget * 1000:
+                task.overruns += 1
+                print(f"[SCHED] ⚠️ {task.name}: {elapsed // 1000}ms (budget {task.budget}ms)")
+            ran += 1
+
+            if not task.period:
+                self.cancel(task)  # once(): não volta ao heap
+                continue
+
+            # Taxa fixa (sem deriva); se atrasou mais de um período, pula os perdidos
+            next_deadline = deadline + task.period
+            now = self.now()
+            if next_deadline <= now:
+                missed = (now - deadline) // task.period
+                task.skipped += missed
+                next_deadline = deadline + (missed + 1) * task.period
+            if task.active:
+                self._push(task, next_deadline)
+        return ran
+
+    def stats(self):
+        """Estatísticas de todas as tasks"""
+        return [task.stats() for task in self.tasks]
@@ -0,0 +1,108 @@
+"""
+Sensor State - Monitor Miner v3.0
+Estado dos sensores residente em RAM com gravação adiada (write-behind)
+
+- Leitores acessam o dict/JSON em memória: nada de flash + json.load por requisição
+- Escritores só marcam sujo; gravação em lote por intervalo ou nº de mudanças
+- Grava em arquivo temporário e renomeia: queda de energia nunca deixa JSON pela metade
+- version incrementa a cada mudança (snapshots reserializam só então)
+- listener(chave, subchave, valor) chamado por valor que mudou (regras)
+"""
+
+import os
+import json
+import time
+
+DEFAULTS = {
+    "temperature": 0.0,
+    "humidity": 0.0,
+    "miners": {"total": 0, "online": 0, "offline": 0},
+    "power": {"consumption": 0.0, "status": "unknown"},
+    "last_update": 0
+}
+
+class SensorState:
+    """Dados dos sensores em memória + flush periódico para o flash"""
+
+    def __init__(self, filename='data/sensors.json', flush_interval_ms=60000, flush_changes=30):
+        self.filename = filename
+        self.flush_interval = flush_interval_ms   # Tempo máximo sujo
+        self.flush_changes = flush_changes        # Mudanças que forçam gravação
+        self.data = self._load()
+        self.version = 0
+        self.changes = 0                           # Mudanças desde o último flush
+        self._dirty_since = 0
+        self.flushes = 0
+        self.listener = None                       # listener(chave, subchave ou None, valor)
+
+    def _load(self):
+        """Lê o arquivo uma vez no boot (defaults se ausente/corrompido)"""
+        data = json.loads(json.dumps(DEFAULTS))
+        try:
+            with open(self.filename, 'r') as f:
+                data.update(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"[SENSORS] Usando valores padrão: {e}")
+        return data
+
+    # ------------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------------
+
+    def update(self, values):
+        """Aplica mudanças (dicts aninhados são mesclados) e marca sujo"""
+        changed = False
+        listener = self.listener
+        for key, value in values.items():
+            current = self.data.get(key)
+            if isinstance(value, dict) and isinstance(current, dict):
+                for k, v in value.items():
+                    if current.get(k) != v:
+                        current[k] = v
+                        changed = True
+                        if listener:
+                            listener(key, k, v)
+            elif current != value:
+                self.data[key] = value
+                changed = True
+                if listener:
+                    listener(key, None, value)
+        if not changed:
+            return False
+
+        self.data['last_update'] = time.time()
+        self.version += 1
+        if not self.changes:
+            self._dirty_since = time.ticks_ms()
+        self.changes += 1
+        return True
+
+    def maybe_flush(self):
+        """Grava se passou o intervalo ou acumulou mudanças suficientes (task periódica)"""
+        if not self.changes:
+            return False
+        if (self.changes >= self.flush_changes or
+                time.ticks_diff(time.ticks_ms(), self._dirty_since) >= self.flush_interval):
+            return self.flush()
+        return False
+
+    def flush(self):
+        """Grava no flash de forma atômica (temp + rename)"""
+        if not self.changes:
+            return False
+        tmp = self.filename + '.tmp'
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(self.data, f)
+            try:
+                os.rename(tmp, self.filename)
+            except OSError:
+                # FAT não renomeia sobre arquivo existente
+                os.remove(self.filename)
+                os.rename(tmp, self.filename)
+        except OSError as e:
+            print(f"[SENSORS] Erro ao gravar: {e}")
+            return False
+        self.changes = 0
+        self.flushes += 1
+        return True
@@ -1,75 +1,59 @@
 """
 Setup - Monitor Miner v3.0
 Modo AP: Configuração WiFi com Site Survey
-Servidor HTTP Síncrono (socket puro)
+Rotas e tasks registradas no motor HTTP (http_server.py) por start(server)
+
+Depois do /api/connect a troca para o dashboard é ao vivo: mesmo servidor,
+rotas/tasks do dashboard, bind no IP da STA e AP desligado - sem reboot.
 """
 
-import socket
 import network
 import json
 import time
 import gc
 import machine
-import select
+import http_writer
+from router import Router
+from assets import AssetCache
+from metrics import Metrics
+from scheduler import Scheduler
+from link_watchdog import STAT_FAILED
+from config_store import store
+from http_server import IDLE_TIMEOUT_MS, MAX_REQUESTS
 
 print("[SETUP] ========================================")
 print("[SETUP] Modo Setup - Configuração WiFi")
 print("[SETUP] ========================================")
 
+SCAN_TTL_MS = 60000   # Resultado mais velho que isso dispara um scan novo
+SCAN_IDLE_MS = 200    # Servidor ocioso por esse tempo antes de rodar o scan pendente
+CONNECT_TIMEOUT_MS = 15000
+HANDOFF_DELAY_MS = 1000  # Tempo para a resposta do /api/connect chegar antes da troca
+AP_IP = '192.168.4.1'
+PORT = 8080
+
+# Segurança por authmode do scan()
+SECURITY = {0: "Open", 1: "WEP", 2: "WPA-PSK", 3: "WPA2-PSK", 4: "WPA/WPA2-PSK"}
+
 # ============================================================================
 # FUNÇÕES AUXILIARES
 # ============================================================================
 
-def load_config():
-    """Carrega configuração"""
-    try:
-        with open('data/config.json', 'r') as f:
-            return json.load(f)
-    except:
-        return {
-            "wifi": {"ssid": "", "password": "", "configured": False},
-            "system": {"name": "Monitor Miner", "version": "3.0", "first_boot": True}
-        }
-
-def save_config(config):
-    """Salva configuração"""
-    try:
-        with open('data/config.json', 'w') as f:
-            json.dump(config, f)
-        return True
-    except Exception as e:
-        print(f"[SETUP] Erro ao salvar: {e}")
-        return False
-
-def load_file(filename):
-    """Carrega arquivo HTML"""
-    try:
-        with open(filename, 'r') as f:
-            return f.read()
-    except Exception as e:
-        print(f"[SETUP] Erro ao carregar {filename}: {e}")
-        return "<html><body><h1>Erro ao carregar página</h1></body></html>"
-
 def scan_networks():
     """Escaneia redes WiFi"""
     start_time = time.ticks_ms()
     print("[SETUP] Escaneando redes...")
     
     sta = network.WLAN(network.STA_IF)
-    was_active = sta.active()
-    
-    if not was_active:
+    if not sta.active():
+        # STA fica ativa entre scans (sem liga/desliga a cada busca)
         print("[SETUP]   Ativando STA...")
         sta.active(True)
-        time.sleep(1)
     
     print("[SETUP]   Iniciando scan...")
     networks_raw = sta.scan()
     print(f"[SETUP]   Scan concluído ({len(networks_raw)} redes brutas)")
     
-    if not was_active:
-        sta.active(False)
-    
     # Formatar
     networks = []
     seen = set()
@@ -80,317 +64,252 @@ def scan_networks():
             continue
         seen.add(ssid)
         
-        auth = net[4]
-        security = {0: "Open", 1: "WEP", 2: "WPA-PSK", 3: "WPA2-PSK", 4: "WPA/WPA2-PSK"}.get(auth, "WPA2")
-        
         networks.append({
             'ssid': ssid,
             'rssi': net[3],
             'channel': net[2],
-            'security': security
+            'security': SECURITY.get(net[4], "WPA2")
         })
     
     elapsed = time.ticks_diff(time.ticks_ms(), start_time)
     print(f"[SETUP] ✅ Encontradas {len(networks)} redes ({elapsed}ms)")
     return networks
 
+class ScanCache:
+    """Último scan em RAM; scan novo roda no loop quando o servidor está ocioso
+
+    sta.scan() bloqueia ~2s: nunca roda dentro de uma requisição.
+    """
+
+    def __init__(self, ttl_ms):
+        self.ttl = ttl_ms
+        self.body = '[]'      # Lista de redes já serializada
+        self.count = 0
+        self.at = None        # ticks_ms do último scan
+        self.pending = True   # Primeiro scan logo após subir o AP
+        self.scans = 0
+
+    def age_ms(self):
+        return -1 if self.at is None else time.ticks_diff(time.ticks_ms(), self.at)
+
+    def request(self, force=False):
+        """Agenda scan se pedido ou se o resultado passou do TTL"""
+        if force or self.at is None or self.age_ms() >= self.ttl:
+            self.pending = True
+
+    def run(self):
+        """Executa o scan pendente com o servidor ocioso (task periódica)"""
+        if not self.pending or time.ticks_diff(time.ticks_ms(), server.last_activity) < SCAN_IDLE_MS:
+            return
+        try:
+            networks = scan_networks()
+            self.body = json.dumps(networks)
+            self.count = len(networks)
+            self.at = time.ticks_ms()
+            self.scans += 1
+        except Exception as e:
+            print(f"[SETUP] Erro no scan: {e}")
+        self.pending = False
+
 def connect_wifi(ssid, password):
-    """Conecta ao WiFi"""
+    """Conecta ao WiFi (consulta o status a cada 100ms até o deadline)"""
     print(f"[SETUP] Conectando a: {ssid}")
     
     sta = network.WLAN(network.STA_IF)
     sta.active(True)
-    time.sleep(1)
-    
     sta.connect(ssid, password)
     
-    timeout = 15
-    while timeout > 0 and not sta.isconnected():
-        time.sleep(1)
-        timeout -= 1
+    deadline = time.ticks_add(time.ticks_ms(), CONNECT_TIMEOUT_MS)
+    while not sta.isconnected() and sta.status() not in STAT_FAILED:
+        if time.ticks_diff(deadline, time.ticks_ms()) <= 0:
+            break
+        time.sleep_ms(100)
     
     if sta.isconnected():
         ip = sta.ifconfig()[0]
         print(f"[SETUP] ✅ Conectado! IP: {ip}")
         
-        # Salvar config
-        config = load_config()
-        config['wifi']['ssid'] = ssid
-        config['wifi']['password'] = password
-        config['wifi']['configured'] = True
-        config['system']['first_boot'] = False
-        save_config(config)
+        # Rede nova: descarta BSSID/canal da reconexão rápida (boot.py grava de novo)
+        store.update('wifi', {'ssid': ssid, 'password': password, 'configured': True}, replace=True)
+        store.update('system', {'first_boot': False})
+        store.save()
         
         return True, ip
     else:
-        print("[SETUP] ❌ Falha na conexão")
-        sta.active(False)
+        print(f"[SETUP] ❌ Falha na conexão (status {sta.status()})")
+        sta.disconnect()
         return False, None
 
-def http_response(content, content_type='text/html', status='200 OK'):
-    """Cria resposta HTTP com CORS"""
-    response = f"HTTP/1.1 {status}\r\n"
-    response += f"Content-Type: {content_type}; charset=utf-8\r\n"
-    response += f"Content-Length: {len(content)}\r\n"
-    response += "Access-Control-Allow-Origin: *\r\n"
-    response += "Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
-    response += "Access-Control-Allow-Headers: Content-Type\r\n"
-    response += "Connection: close\r\n"
-    response += "\r\n"
-    
-    if isinstance(content, str):
-        return response.encode('utf-8') + content.encode('utf-8')
-    else:
-        return response.encode('utf-8') + content
-
-def send_response_safe(conn, response):
-    """Envia resposta por chunks e aguarda confirmação"""
-    try:
-        # Enviar por chunks pequenos (512 bytes) para garantir entrega
-        chunk_size = 512
-        total_sent = 0
-        
-        while total_sent < len(response):
-            chunk = response[total_sent:total_sent + chunk_size]
-            sent = conn.send(chunk)
-            if sent == 0:
-                print(f"[SETUP_WIFI] Erro: Conexão fechada pelo cliente")
-                return False
-            total_sent += sent
-            
-            # Aguardar um pouco para garantir entrega
-            time.sleep(0.01)  # 10ms entre chunks
-            
-        print(f"[SETUP_WIFI] Resposta enviada: {total_sent}/{len(response)} bytes")
-        
-        # AGUARDAR CONFIRMAÇÃO: Tentar receber dados do cliente
-        # (isso força o cliente a processar completamente antes de fechar)
-        try:
-            conn.settimeout(1.0)  # 1 segundo para confirmação
-            confirmation = conn.recv(1)  # Tentar receber 1 byte
-            print(f"[SETUP_WIFI] Confirmação recebida: {len(confirmation) if confirmation else 0} bytes")
-        except:
-            # Timeout é normal - cliente não enviou confirmação
-            print(f"[SETUP_WIFI] Cliente não confirmou (timeout normal)")
-        
-        return total_sent == len(response)
-        
-    except Exception as e:
-        print(f"[SETUP_WIFI] Erro ao enviar: {e}")
-        return False
-
-def parse_request(request_data):
-    """Parse básico da requisição HTTP"""
+def handoff():
+    """Troca ao vivo para o dashboard: mesmo servidor, sem reboot"""
+    print("[SETUP] ========================================")
+    print("[SETUP] ➡️  Trocando para o dashboard (sem reiniciar)")
+    print("[SETUP] ========================================")
+    start_ms = time.ticks_ms()
     try:
-        # Decodificar uma vez
-        request_str = request_data.decode('utf-8')
-        
-        # Separar headers e body
-        parts = request_str.split('\r\n\r\n', 1)
-        headers_part = parts[0]
-        body_part = parts[1] if len(parts) > 1 else ''
-        
-        # Parse primeira linha
-        first_line = headers_part.split('\r\n')[0]
-        method, path = first_line.split(' ')[0:2]
-        
-        # Parse body (JSON)
-        body = None
-        if body_part.strip():
-            print(f"[PARSE] Body raw: {body_part[:100]}")  # Debug
-            try:
-                body = json.loads(body_part)
-                print(f"[PARSE] Body parsed: {body}")  # Debug
-            except Exception as e:
-                print(f"[PARSE] Erro ao parsear JSON: {e}")
-                print(f"[PARSE] Body era: {body_part}")
-        
-        return method, path, body
+        # Scan e expiração do setup não podem rodar depois da troca (o
+        # run_due do scheduler antigo continua na mesma volta)
+        for task in setup_tasks:
+            scheduler.cancel(task)
+        import dashboard
+        dashboard.start(server)
     except Exception as e:
-        print(f"[PARSE] Erro geral: {e}")
-        return 'GET', '/', None
+        print(f"[SETUP] ❌ Troca falhou ({e}) - reiniciando")
+        time.sleep(1)
+        machine.reset()
+    network.WLAN(network.AP_IF).active(False)
+    gc.collect()
+    print(f"[SETUP] ✅ Dashboard no ar em {time.ticks_diff(time.ticks_ms(), start_ms)}ms")
 
 # ============================================================================
-# SERVIDOR HTTP SÍNCRONO
+# ROTAS
 # ============================================================================
 
-def run_server():
-    """Servidor HTTP com select() - pseudo-assíncrono"""
+routes = Router()
+
+# Contadores por rota (latência, bytes, heap) pré-alocados
+metrics = Metrics()
+
+def add_route(method, path, handler):
+    """Registra a rota já instrumentada"""
+    routes.add(method, path, metrics.wrap(path, handler))
+
+def preflight(conn, req):
+    """Preflight CORS (qualquer caminho)"""
+    print(f"[SETUP] Preflight CORS para {req.path}")
+    return http_writer.send_empty(conn, 204, b'', req.keep_alive)
+
+def page_setup(conn, req):
+    """Página principal (setup_wifi.html)"""
+    return assets.send(conn, 'web/setup_wifi.html', req)
+
+def page_style(conn, req):
+    """CSS compartilhado"""
+    return assets.send(conn, 'web/css/style.css', req)
+
+def page_script(conn, req):
+    """JavaScript do setup"""
+    return assets.send(conn, 'web/js/setup_wifi.js', req)
+
+def api_scan(conn, req):
+    """API Scan: resposta imediata do cache; ?refresh=1 agenda um scan novo"""
+    scans.request(req.param('refresh') == '1')
+    response_data = '{"success": true, "count": %d, "age_ms": %d, "scanning": %s, "networks": %s}' % (
+        scans.count, scans.age_ms(), 'true' if scans.pending else 'false', scans.body)
+    print(f"[SETUP] Scan em cache: {scans.count} redes ({scans.age_ms()}ms)")
+    return http_writer.send_bytes(conn, response_data, 'application/json', 200, b'', req.keep_alive)
+
+def api_connect(conn, req):
+    """API Connect"""
+    body = req.json()
+    print(f"[SETUP] Body: {body}")
+    if not body:
+        response_data = json.dumps({'success': False, 'error': 'Dados inválidos'})
+        return http_writer.send_bytes(conn, response_data, 'application/json', 200, b'', req.keep_alive)
     
-    # Configurar socket
-    addr = ('192.168.4.1', 8080)
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    s.setblocking(True)   # Blocking para setup síncrono!
-    s.bind(addr)
-    s.listen(5)
+    ssid = body.get('ssid', '')
+    password = body.get('password', '')
     
-    print("[SETUP] ========================================")
-    print(f"[SETUP_WIFI] ✅ Servidor rodando em http://{addr[0]}:{addr[1]}")
-    print("[SETUP_WIFI] ✅ Modo: Síncrono (1 usuário)")
-    print("[SETUP_WIFI] ========================================")
+    success, ip = connect_wifi(ssid, password)
     
-    # Loop principal SÍNCRONO
-    while True:
-        try:
-            # SÍNCRONO: Aguarda conexão (sem timeout)
-            print(f"[SETUP_WIFI] Aguardando conexão...")
-            conn, client_addr = s.accept()
-            print(f"[SETUP_WIFI] ============ Nova Conexão ============")
-            print(f"[SETUP_WIFI] Cliente: {client_addr}")
-            
-            # Receber requisição
-            conn.settimeout(5.0)
-            request_data = conn.recv(2048)
-            
-            if not request_data:
-                print(f"[SETUP] ⚠️ Requisição vazia")
-                conn.close()
-                continue
-            
-            # Parse
-            method, path, body = parse_request(request_data)
-            print(f"[SETUP] → {method} {path}")
-            if body:
-                print(f"[SETUP] Body: {body}")
-            
-            # Roteamento
-            if method == 'OPTIONS':
-                # Preflight CORS
-                print(f"[SETUP] Preflight CORS para {path}")
-                response = http_response('', 'text/plain')
-                
-            elif path == '/' or path.startswith('/index') or path.startswith('/setup_wifi.html'):
-                # Página principal (setup_wifi.html)
-                print(f"[SETUP_WIFI] Servindo setup_wifi.html")
-                html = load_file('web/setup_wifi.html')
-                response = http_response(html, 'text/html')
-                
-            elif '/css/style.css' in path:
-                # CSS Compartilhado
-                print(f"[SETUP_WIFI] Servindo style.css")
-                css = load_file('web/css/style.css')
-                print(f"[SETUP_WIFI] CSS carregado: {len(css)} bytes")
-                response = http_response(css, 'text/css')
-                
-            elif '/js/setup_wifi.js' in path:
-                # JavaScript
-                print(f"[SETUP_WIFI] Servindo setup_wifi.js")
-                js = load_file('web/js/setup_wifi.js')
-                print(f"[SETUP_WIFI] JS carregado: {len(js)} bytes")
-                response = http_response(js, 'application/javascript')
-                
-            elif path == '/api/scan' or path.startswith('/api/scan'):
-                # API Scan
-                print(f"[SETUP] Executando scan de redes...")
-                networks = scan_networks()
-                print(f"[SETUP] Scan retornou {len(networks)} redes")
-                
-                response_data = json.dumps({
-                    'success': True,
-                    'networks': networks,
-                    'count': len(networks)
-                })
-                print(f"[SETUP] Enviando resposta: {len(response_data)} bytes")
-                response = http_response(response_data, 'application/json')
-                
-            elif path == '/api/connect' and method == 'POST':
-                # API Connect
-                if body:
-                    ssid = body.get('ssid', '')
-                    password = body.get('password', '')
-                    
-                    success, ip = connect_wifi(ssid, password)
-                    
-                    if success:
-                        response_data = json.dumps({
-                            'success': True,
-                            'ip': ip,
-                            'message': 'Conectado! Reiniciando...'
-                        })
-                        response = http_response(response_data, 'application/json')
-                        
-                        # Enviar resposta e reiniciar
-                        send_response_safe(conn, response)
-                        time.sleep(0.5)  # Aguardar processamento
-                        conn.close()
-                        
-                        print("[SETUP] ========================================")
-                        print("[SETUP] ✅ WiFi configurado! Reiniciando...")
-                        print("[SETUP] ========================================")
-                        
-                        time.sleep(2)
-                        machine.reset()
-                    else:
-                        response_data = json.dumps({
-                            'success': False,
-                            'error': 'Falha na conexão. Verifique a senha.'
-                        })
-                        response = http_response(response_data, 'application/json')
-                else:
-                    response_data = json.dumps({'success': False, 'error': 'Dados inválidos'})
-                    response = http_response(response_data, 'application/json')
-                    
-            elif path == '/api/status':
-                # API Status
-                response_data = json.dumps({
-                    'success': True,
-                    'data': {
-                        'version': '3.0',
-                        'mode': 'AP',
-                        'memory_free': gc.mem_free(),
-                        'ip': '192.168.4.1'
-                    }
-                })
-                response = http_response(response_data, 'application/json')
-                
-            else:
-                # 404
-                response_data = json.dumps({'error': '404 - Not Found'})
-                response = http_response(response_data, 'application/json', '404 Not Found')
-            
-            # Enviar resposta
-            print(f"[SETUP_WIFI] Enviando resposta ({len(response)} bytes)...")
-            success = send_response_safe(conn, response)
-            if success:
-                print(f"[SETUP_WIFI] ✅ Resposta enviada completamente")
-            else:
-                print(f"[SETUP_WIFI] ❌ Erro no envio da resposta")
-            
-            # AGUARDAR antes de fechar (garantir que cliente processou)
-            print(f"[SETUP_WIFI] Aguardando processamento do cliente...")
-            time.sleep(0.5)  # 500ms para garantir processamento
-            
-            conn.close()
-            print(f"[SETUP_WIFI] ============ Conexão Fechada ============")
-            
-            # Limpar memória
-            gc.collect()
-            
-        except Exception as e:
-            print(f"[SETUP] Erro: {e}")
-            try:
-                conn.close()
-            except:
-                pass
-            gc.collect()
+    if not success:
+        response_data = json.dumps({
+            'success': False,
+            'error': 'Falha na conexão. Verifique a senha.'
+        })
+        return http_writer.send_bytes(conn, response_data, 'application/json', 200, b'', req.keep_alive)
+    
+    response_data = json.dumps({
+        'success': True,
+        'ip': ip,
+        'message': 'Conectado! Abrindo o dashboard...',
+        'dashboard': f'http://{ip}:{PORT}/'
+    })
+    
+    # Enviar resposta; a troca roda depois que ela sai pelo AP
+    sent = http_writer.send_bytes(conn, response_data, 'application/json', 200, b'', False)
+    req.keep_alive = False
+    scheduler.once('handoff', handoff, HANDOFF_DELAY_MS)
+    return sent
+
+def api_status(conn, req):
+    """API Status"""
+    response_data = json.dumps({
+        'success': True,
+        'data': {
+            'version': '3.0',
+            'mode': 'AP',
+            'memory_free': gc.mem_free(),
+            'ip': '192.168.4.1'
+        }
+    })
+    return http_writer.send_bytes(conn, response_data, 'application/json', 200, b'', req.keep_alive)
+
+def api_metrics(conn, req):
+    """Métricas no formato texto do Prometheus (streaming)"""
+    if not req.http11:
+        req.keep_alive = False
+    w = http_writer.ChunkedWriter(conn, 'text/plain; version=0.0.4', keep_alive=req.keep_alive, chunked=req.http11)
+    metrics.render(w, scheduler, server)
+    return w.close()
+
+routes.add('OPTIONS', '/*', preflight)
+add_route('GET', '/', page_setup)
+add_route('GET', '/index.html', page_setup)
+add_route('GET', '/setup_wifi.html', page_setup)
+add_route('GET', '/css/style.css', page_style)
+add_route('GET', '/js/setup_wifi.js', page_script)
+add_route('GET', '/api/scan', api_scan)
+add_route('POST', '/api/connect', api_connect)
+add_route('GET', '/api/status', api_status)
+add_route('GET', '/api/metrics', api_metrics)
 
 # ============================================================================
-# INICIAR AUTOMATICAMENTE
+# SERVIDOR
 # ============================================================================
 
-# Garantir que AP está ativo
-ap = network.WLAN(network.AP_IF)
-if not ap.active():
-    print("[SETUP] Ativando AP...")
-    ap.active(True)
-    time.sleep(1)
-
-# Executar servidor (bloqueante - isso impede que main.py seja carregado)
-try:
-    run_server()
-except KeyboardInterrupt:
-    print("[SETUP] Servidor encerrado")
-except Exception as e:
-    print(f"[SETUP] Erro fatal: {e}")
+# Resultado do scan (primeiro scan roda assim que o servidor fica ocioso)
+scans = ScanCache(SCAN_TTL_MS)
 
+# Assets estáticos: ETag calculado uma vez, conteúdo quente em RAM
+assets = AssetCache([
+    'web/setup_wifi.html',
+    'web/css/style.css',
+    'web/js/setup_wifi.js',
+])
+
+server = None
+scheduler = None
+setup_tasks = ()
+
+def start(srv):
+    """Assume o servidor em modo AP: bind em 192.168.4.1, rotas e tasks do setup"""
+    global server, scheduler, setup_tasks
+
+    # Garantir que AP está ativo
+    ap = network.WLAN(network.AP_IF)
+    if not ap.active():
+        print("[SETUP] Ativando AP...")
+        ap.active(True)
+
+    # Headers pré-codificados (CORS completo para o preflight do setup)
+    http_writer.configure(http_writer.CORS_FULL, IDLE_TIMEOUT_MS // 1000, MAX_REQUESTS)
+
+    scheduler = Scheduler(max_wait_ms=1000)
+    setup_tasks = (
+        scheduler.add('idle_clients', srv.expire_idle, 1000, budget_ms=20),
+        scheduler.add('scan', scans.run, SCAN_IDLE_MS, budget_ms=5000),
+    )
+
+    server = srv
+    srv.tag = '[SETUP_WIFI]'
+    srv.configure(IDLE_TIMEOUT_MS, MAX_REQUESTS)
+    srv.routes = routes
+    srv.scheduler = scheduler
+    srv.sources = []
+    srv.listen((AP_IP, PORT))
+
+    print("[SETUP] ========================================")
+    print(f"[SETUP_WIFI] ✅ Servidor rodando em http://{AP_IP}:{PORT}")
+    print(f"[SETUP_WIFI] ✅ Motor: {srv.engine} (mesmo motor do dashboard)")
+    print("[SETUP_WIFI] ========================================")
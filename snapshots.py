@@ -0,0 +1,71 @@
+"""
+Snapshots - Monitor Miner v3.0
+Respostas JSON pré-serializadas e versionadas para as APIs mais acessadas
+
+- Corpo serializado uma vez por mudança (ou por TTL, ex.: uptime a cada 1s)
+- Linhas ETag/Cache-Control pré-codificadas junto com o corpo
+- Versão sobe a cada reconstrução; ?since=<versão> ou If-None-Match -> 304
+- ETag inclui um id de boot: versões reiniciadas após reset não colidem
+"""
+
+import os
+import json
+import time
+import binascii
+import http_writer
+
+# Id de boot (4 hex) compartilhado por todos os snapshots
+BOOT_ID = binascii.hexlify(os.urandom(2)).decode()
+
+class Snapshot:
+    """Corpo JSON + headers em cache, reconstruídos só quando a fonte muda"""
+
+    def __init__(self, name, build, source_version=None, ttl_ms=0):
+        self.name = name
+        self.build = build                    # () -> dict com os dados
+        self.source_version = source_version  # () -> versão da fonte (ou None)
+        self.ttl = ttl_ms                     # Reconstruir no máximo a cada ttl_ms (0 = só por versão)
+        self.version = 0
+        self.body = None
+        self.etag = None
+        self.headers = b''
+        self._source = None
+        self._built = 0
+        self.builds = 0
+
+    def refresh(self):
+        """Reconstrói o corpo se a fonte mudou ou o TTL venceu"""
+        if self.body is not None:
+            if self.ttl:
+                if time.ticks_diff(time.ticks_ms(), self._built) < self.ttl:
+                    return self.body
+            elif self.source_version is None or self.source_version() == self._source:
+                return self.body
+
+        if self.source_version:
+            self._source = self.source_version()
+        self.version += 1
+        self.body = json.dumps({
+            'success': True,
+            'version': self.version,
+            'data': self.build()
+        }).encode()
+        self.etag = f'"{self.name}-{BOOT_ID}-{self.version}"'
+        self.headers = f"ETag: {self.etag}\r\nCache-Control: no-cache\r\n".encode()
+        self._built = time.ticks_ms()
+        self.builds += 1
+        return self.body
+
+    def not_modified(self, req):
+        """Cliente já tem esta versão (?since= ou If-None-Match)"""
+        since = req.param('since')
+        if since:
+            return since == str(self.version)
+        return req.header('if-none-match') == self.etag
+
+    def send(self, conn, req):
+        """Responde com o corpo em cache ou 304"""
+        body = self.refresh()
+        if self.not_modified(req):
+            return http_writer.send_empty(conn, 304, self.headers, req.keep_alive)
+        return http_writer.send_bytes(conn, body, 'application/json', 200, self.headers, req.keep_alive)
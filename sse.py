@@ -0,0 +1,113 @@
+"""
+SSE - Monitor Miner v3.0
+Server-Sent Events: o dashboard recebe atualizações sem polling
+
+- Uma conexão por aba em vez de 2 fetch a cada 5s
+- Mensagem serializada uma vez e enviada a todos os inscritos
+- Heartbeat (comentário) mantém a conexão viva através de proxies/NAT
+- Limite de inscritos: excedente recebe 503 e o JS volta ao polling
+- Inscrito lento (buffer TCP cheio) é desconectado, não trava o loop
+"""
+
+import time
+import errno
+import http_writer
+
+HEADER_EXTRA = b'Cache-Control: no-cache\r\nX-Accel-Buffering: no\r\n'
+HEARTBEAT = b': hb\n\n'
+FULL = b'{"error": "Limite de inscritos SSE"}'
+
+class EventStream:
+    """Conjunto de conexões SSE mantidas pelo loop do servidor"""
+
+    def __init__(self, max_subscribers=3, heartbeat_ms=15000, send_timeout_ms=200, retry_ms=3000):
+        self.max_subscribers = max_subscribers
+        self.heartbeat_ms = heartbeat_ms
+        self.send_timeout = send_timeout_ms
+        self.subscribers = {}          # socket -> ticks do último envio
+        self._head = (b'HTTP/1.1 200 OK\r\n'
+                      b'Content-Type: text/event-stream\r\n' + HEADER_EXTRA +
+                      http_writer.CORS_BASIC +
+                      b'Connection: keep-alive\r\n\r\n' +
+                      f"retry: {retry_ms}\n\n".encode())
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, conn, req, initial=None):
+        """Responde o header do stream e registra a conexão; False se lotado"""
+        if len(self.subscribers) >= self.max_subscribers:
+            http_writer.send_bytes(conn, FULL, 'application/json', 503, b'Retry-After: 30\r\n', req.keep_alive)
+            return False
+        http_writer.write_all(conn, self._head)
+        self.subscribers[conn] = time.ticks_ms()
+        if initial:
+            self._send(conn, initial)
+        print(f"[SSE] Inscrito ({len(self.subscribers)}/{self.max_subscribers})")
+        return True
+
+    @staticmethod
+    def message(event, data):
+        """Monta a mensagem (data em uma linha: JSON compacto)"""
+        if isinstance(data, str):
+            data = data.encode()
+        return b'event: ' + event + b'\ndata: ' + data + b'\n\n'
+
+    def _send(self, conn, msg):
+        try:
+            http_writer.write_all(conn, msg, self.send_timeout)
+            self.subscribers[conn] = time.ticks_ms()
+            return True
+        except OSError as e:
+            print(f"[SSE] Removendo inscrito: {e}")
+            self.dropped += 1
+            self.drop(conn)
+            return False
+
+    def publish(self, msg):
+        """Envia a mesma mensagem a todos os inscritos"""
+        for conn in list(self.subscribers):
+            self._send(conn, msg)
+        self.published += 1
+
+    def heartbeat(self):
+        """Comentário para inscritos sem envio há heartbeat_ms (task periódica)"""
+        now = time.ticks_ms()
+        for conn, last in list(self.subscribers.items()):
+            if time.ticks_diff(now, last) >= self.heartbeat_ms:
+                self._send(conn, HEARTBEAT)
+
+    # Fonte do loop do servidor (http_server.HttpServer.sources)
+    writers = ()
+
+    @property
+    def readers(self):
+        return self.subscribers
+
+    def timeout_ms(self, limit):
+        return limit
+
+    def run(self):
+        pass
+
+    def on_writable(self, conn):
+        pass
+
+    def on_readable(self, conn):
+        """Cliente SSE não envia nada: legível = fechou (ou lixo a descartar)"""
+        if conn not in self.subscribers:
+            return
+        try:
+            data = conn.recv(64)
+        except OSError as e:
+            if e.args[0] == errno.EAGAIN:
+                return
+            data = b''
+        if not data:
+            self.drop(conn)
+
+    def drop(self, conn):
+        if self.subscribers.pop(conn, None) is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
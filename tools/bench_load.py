@@ -0,0 +1,248 @@
+"""
+Benchmark - Carga nos servidores HTTP
+Requisições/s, latência p50/p99 e pico de heap por endpoint
+
+No PC, com o servidor simulado (tools/host_sim):
+
+    python tools/bench_load.py dashboard --clients 4 --requests 400 --save base.json
+    python tools/bench_load.py dashboard --compare base.json
+
+Motores HTTP (select x asyncio) e soak (rodadas até completar o tempo):
+
+    python tools/bench_load.py dashboard --engine select --clients 8 --save select.json
+    python tools/bench_load.py dashboard --engine asyncio --clients 8 --compare select.json
+    python tools/bench_load.py dashboard --engine asyncio --soak 600
+
+Contra o ESP32 (sem pico de heap, que só o host_sim mede):
+
+    python tools/bench_load.py --url http://192.168.1.50:8080 /api/sensors /api/status
+
+- Cada cliente usa uma conexão keep-alive (reconecta se o servidor fechar)
+- Endpoints medidos um de cada vez, todos os clientes ao mesmo tempo
+- --save/--compare: resultado em JSON para comparar mudanças com a base
+- --soak: repete os endpoints por N segundos; p50 é a mediana das rodadas,
+  p99 o pior; no fim, heap alocado (com tracemalloc) e contadores do servidor
+"""
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+ENDPOINTS = {
+    'dashboard': ['/', '/api/sensors', '/api/status', '/api/history?points=120', '/api/metrics'],
+    'setup': ['/', '/api/scan', '/api/status'],
+}
+
+def wait_port(host, port, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=0.5).close()
+            return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+def client(host, port, path, count, latencies, errors, timeout):
+    """Faz count GETs numa conexão keep-alive; latências em ms"""
+    conn = http.client.HTTPConnection(host, port, timeout=timeout)
+    for _ in range(count):
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status >= 400 and resp.status != 404:
+                errors.append(resp.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+    conn.close()
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * p / 100), len(values) - 1)]
+
+def run_endpoint(host, port, path, clients, requests, timeout):
+    latencies, errors = [], []
+    per_client = max(requests // clients, 1)
+    threads = [threading.Thread(target=client, args=(host, port, path, per_client, latencies, errors, timeout))
+               for _ in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50),
+        'p99_ms': percentile(latencies, 99),
+    }
+
+def soak(host, port, endpoints, clients, requests, timeout, seconds):
+    """Rodadas de todos os endpoints até completar seconds"""
+    rounds = {path: [] for path in endpoints}
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        for path in endpoints:
+            rounds[path].append(run_endpoint(host, port, path, clients, requests, timeout))
+    results = {}
+    for path, runs in rounds.items():
+        elapsed = sum(r['requests'] / r['rps'] for r in runs if r['rps'])
+        total = sum(r['requests'] for r in runs)
+        results[path] = {
+            'requests': total,
+            'errors': sum(r['errors'] for r in runs),
+            'rps': total / elapsed if elapsed else 0.0,
+            'p50_ms': percentile([r['p50_ms'] for r in runs], 50),
+            'p99_ms': max(r['p99_ms'] for r in runs),
+            'rounds': len(runs),
+        }
+    return results
+
+def server_state(host, port, timeout):
+    """Heap alocado (/api/metrics) e contadores HTTP (/api/status); {} se indisponível"""
+    state = {}
+    try:
+        conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        conn.request('GET', '/api/metrics')
+        for line in conn.getresponse().read().decode().splitlines():
+            if line.startswith('monitor_heap_alloc_bytes '):
+                state['heap_alloc'] = int(line.split()[1])
+        conn.request('GET', '/api/status')
+        data = json.loads(conn.getresponse().read()).get('data', {})
+        state['http'] = data.get('http')
+        conn.close()
+    except (OSError, ValueError, http.client.HTTPException):
+        pass
+    return state
+
+def start_server(server, port, trace_heap, stats, miners, engine):
+    cmd = [sys.executable, os.path.join(HERE, 'host_sim', 'run.py'), server, '--port', str(port), '--stats', stats]
+    if engine:
+        cmd += ['--engine', engine]
+    if trace_heap:
+        cmd.append('--trace-heap')
+    if miners:
+        cmd += ['--miners', miners]
+    return subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+
+def delta(new, old):
+    if not old:
+        return ''
+    return f" ({(new - old) / old * 100:+.0f}%)"
+
+def heap(r, b):
+    """Pico de heap (só medido com tracemalloc no host_sim)"""
+    if not r['heap_peak']:
+        return '-'
+    return f"{r['heap_peak']}{delta(r['heap_peak'], b.get('heap_peak'))}"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('server', nargs='?', choices=sorted(ENDPOINTS), default='dashboard')
+    parser.add_argument('endpoints', nargs='*')
+    parser.add_argument('--url', help='Servidor já rodando (ex.: o ESP32); sem host_sim')
+    parser.add_argument('--port', type=int, default=18080)
+    parser.add_argument('--clients', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=400, help='Requisições por endpoint')
+    parser.add_argument('--timeout', type=float, default=10.0)
+    parser.add_argument('--no-heap', action='store_true', help='Sem tracemalloc (latência mais fiel)')
+    parser.add_argument('--miners', help='miners.json para o dashboard simulado')
+    parser.add_argument('--engine', choices=['select', 'asyncio'], help='Motor HTTP do host_sim')
+    parser.add_argument('--soak', type=int, metavar='SEGUNDOS', help='Repete os endpoints por N segundos')
+    parser.add_argument('--save', help='Grava o resultado (JSON)')
+    parser.add_argument('--compare', help='Resultado base (JSON) para comparar')
+    args = parser.parse_args()
+
+    endpoints = args.endpoints or ENDPOINTS[args.server]
+    proc = None
+    stats = os.path.join(tempfile.gettempdir(), f'bench_load_{os.getpid()}.json')
+    if args.url:
+        url = urlparse(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = '127.0.0.1', args.port
+        proc = start_server(args.server, port, not args.no_heap, stats, args.miners, args.engine)
+        if not wait_port(host, port, 15):
+            proc.kill()
+            sys.exit(f"[BENCH] {args.server} não subiu na porta {port}")
+
+    results = {}
+    before = after = {}
+    alive = True
+    try:
+        for path in endpoints:
+            # Aquecimento: assets/snapshots em cache, conexões abertas
+            run_endpoint(host, port, path, 1, 5, args.timeout)
+        if args.soak:
+            before = server_state(host, port, args.timeout)
+            results = soak(host, port, endpoints, args.clients, args.requests, args.timeout, args.soak)
+            after = server_state(host, port, args.timeout)
+            alive = proc is None or proc.poll() is None
+        else:
+            for path in endpoints:
+                results[path] = run_endpoint(host, port, path, args.clients, args.requests, args.timeout)
+    finally:
+        if proc:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(10)
+
+    peaks = {}
+    if proc and os.path.exists(stats):
+        with open(stats) as f:
+            peaks = json.load(f).get('heap_peaks', {})
+        os.remove(stats)
+    for path, r in results.items():
+        r['heap_peak'] = peaks.get(path.split('?', 1)[0], 0)
+
+    base = {}
+    if args.compare:
+        with open(args.compare) as f:
+            base = json.load(f)
+
+    engine = f" ({args.engine})" if args.engine else ''
+    print(f"[BENCH] {args.url or args.server}{engine}: {args.clients} clientes, {args.requests} requisições por endpoint")
+    print(f"{'endpoint':<28} {'req/s':>14} {'p50 ms':>14} {'p99 ms':>14} {'heap pico':>16} {'erros':>6}")
+    for path, r in results.items():
+        b = base.get(path, {})
+        print(f"{path:<28} {r['rps']:>8.0f}{delta(r['rps'], b.get('rps')):>6} "
+              f"{r['p50_ms']:>8.2f}{delta(r['p50_ms'], b.get('p50_ms')):>6} "
+              f"{r['p99_ms']:>8.2f}{delta(r['p99_ms'], b.get('p99_ms')):>6} "
+              f"{heap(r, b):>16} {r['errors']:>6}")
+
+    if args.soak:
+        rounds = min(r['rounds'] for r in results.values())
+        print(f"[BENCH] Soak: {args.soak}s, {rounds} rodadas, servidor {'vivo' if alive and after else 'CAIU'}")
+        if before.get('heap_alloc') is not None and after.get('heap_alloc') is not None and not args.no_heap:
+            print(f"[BENCH] Heap alocado: {before['heap_alloc']} → {after['heap_alloc']} "
+                  f"({after['heap_alloc'] - before['heap_alloc']:+d} bytes)")
+        if after.get('http'):
+            print(f"[BENCH] Servidor: {after['http']}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"[BENCH] Resultado gravado em {args.save}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark - Memória do estado das mineradoras
+Compara dict por mineradora (JSON parseado) com a tabela em colunas (miner_table)
+
+    python tools/bench_miner_memory.py --counts 50 200 500
+
+No PC mede com tracemalloc; no MicroPython (mpremote run) com gc.mem_alloc().
+- json: resposta summary+stats inteira parseada e guardada por mineradora
+- dict: só os campos usados, mas um dict por mineradora
+- tabela: MinerTable (arrays) preenchida pelo extrator em streaming
+- pico de parse: json.loads da resposta vs MinerReply em pedaços de 512 bytes
+"""
+
+import gc
+import os
+import sys
+import time
+
+if not hasattr(time, 'ticks_ms'):
+    # CPython: ticks do MicroPython usados pela MinerTable
+    time.ticks_ms = lambda: int(time.monotonic() * 1000) & 0x3FFFFFFF
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import json
+from miner_table import MinerTable, MinerReply
+from fake_miner import reply
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+def measure(build):
+    """(bytes retidos, pico) alocados por build()"""
+    gc.collect()
+    if tracemalloc:
+        tracemalloc.start()
+        keep = build()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    else:
+        before = gc.mem_alloc()
+        keep = build()
+        gc.collect()
+        current = peak = gc.mem_alloc() - before
+    del keep
+    return current, peak
+
+def feed(parser, raw):
+    parser.reset()
+    for i in range(0, len(raw), 512):
+        parser.feed(raw[i:i + 512])
+    return parser
+
+def main():
+    counts = [int(c) for c in sys.argv[sys.argv.index('--counts') + 1:]] if '--counts' in sys.argv else [50, 200, 500]
+    replies = [reply(i)[:-1] for i in range(max(counts))]
+
+    print(f"{'mineradoras':>12} {'json':>10} {'dict':>10} {'tabela':>10}")
+    for n in counts:
+        def as_json():
+            return [json.loads(replies[i]) for i in range(n)]
+
+        def as_dict():
+            parser = MinerReply()
+            out = []
+            for i in range(n):
+                feed(parser, replies[i])
+                out.append({'hashrate': parser.hashrate, 'temp': parser.temp, 'fan': parser.fan,
+                            'online': True, 'last_seen': 0, 'errors': 0})
+            return out
+
+        def as_table():
+            parser = MinerReply()
+            table = MinerTable(n)
+            for i in range(n):
+                table.update(i, feed(parser, replies[i]))
+            return table
+
+        j = measure(as_json)[0]
+        d = measure(as_dict)[0]
+        t = measure(as_table)[0]
+        print(f"{n:>12} {j / 1024:>9.1f}K {d / 1024:>9.1f}K {t / 1024:>9.1f}K")
+
+    raw = replies[0]
+    print(f"Pico de parse por resposta ({len(raw)} bytes): "
+          f"json.loads {measure(lambda: json.loads(raw))[1] / 1024:.1f}K, "
+          f"extrator {measure(lambda: feed(MinerReply(), raw))[1] / 1024:.1f}K")
+
+if __name__ == '__main__':
+    main()
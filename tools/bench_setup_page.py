@@ -0,0 +1,98 @@
+"""
+Benchmark - Página de Setup (modo AP)
+Mede o tempo até a primeira renderização da página de setup
+
+Roda no PC (CPython), conectado na rede MonitorMiner_Setup:
+
+    python tools/bench_setup_page.py http://192.168.4.1:8080 --runs 10
+
+Simula o browser: baixa o HTML e depois CSS + JS em paralelo, cada um
+numa conexão nova (o setup responde com Connection: close).
+- primeira renderização = HTML e CSS completos (CSS bloqueia o render)
+- carga completa = HTML, CSS e JS completos
+"""
+
+import argparse
+import socket
+import threading
+import time
+from urllib.parse import urlparse
+
+ASSETS = ['/css/style.css', '/js/setup_wifi.js']
+
+def fetch(host, port, path, timeout):
+    """GET com Connection: close; retorna (status, bytes, segundos)"""
+    start = time.perf_counter()
+    s = socket.create_connection((host, port), timeout=timeout)
+    try:
+        s.sendall(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+        data = b''
+        while True:
+            chunk = s.recv(4096)
+            if not chunk:
+                break
+            data += chunk
+            # Resposta completa assim que o corpo atinge o Content-Length
+            end = data.find(b'\r\n\r\n')
+            if end >= 0:
+                head = data[:end].lower()
+                i = head.find(b'content-length:')
+                if i >= 0:
+                    length = int(head[i + 15:].split(b'\r\n', 1)[0])
+                    if len(data) - end - 4 >= length:
+                        break
+    finally:
+        s.close()
+    status = int(data.split(b' ', 2)[1]) if data else 0
+    return status, len(data), time.perf_counter() - start
+
+def page_load(host, port, timeout):
+    """Uma carga da página; retorna (primeira renderização, carga completa) em ms"""
+    start = time.perf_counter()
+    fetch(host, port, '/', timeout)
+    html_done = time.perf_counter() - start
+
+    done = {}
+
+    def worker(path):
+        fetch(host, port, path, timeout)
+        done[path] = time.perf_counter() - start
+
+    threads = [threading.Thread(target=worker, args=(p,)) for p in ASSETS]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    first_paint = max(html_done, done['/css/style.css'])
+    full_load = max([html_done] + list(done.values()))
+    return first_paint * 1000, full_load * 1000
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('url', nargs='?', default='http://192.168.4.1:8080')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--timeout', type=float, default=10.0)
+    args = parser.parse_args()
+
+    url = urlparse(args.url)
+    host, port = url.hostname, url.port or 80
+
+    paints, loads = [], []
+    for i in range(args.runs):
+        paint, load = page_load(host, port, args.timeout)
+        paints.append(paint)
+        loads.append(load)
+        print(f"[BENCH] #{i + 1}: primeira renderização {paint:.0f}ms, carga completa {load:.0f}ms")
+
+    print("=" * 40)
+    print(f"[BENCH] Primeira renderização: mediana {median(paints):.0f}ms, pior {max(paints):.0f}ms")
+    print(f"[BENCH] Carga completa:        mediana {median(loads):.0f}ms, pior {max(loads):.0f}ms")
+    print("=" * 40)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Build Bundle - Pacote único dos assets web (minificados + gzip)
+Gera web.pack para enviar ao ESP32 junto com o código
+
+    python tools/build_bundle.py              # grava web.pack na raiz
+    python tools/build_bundle.py --list       # mostra o índice de um web.pack
+
+Formato (little-endian):
+    b'MMPK' | u32 tamanho do índice | índice JSON | corpos gzip | padding
+    índice: {"version": 1, "files": [[caminho, offset, tamanho, etag, content_type], ...]}
+
+- offset absoluto no arquivo: o servidor faz seek() e transmite o corpo gzip
+- ETag = sha256 do corpo gzip (8 bytes em hex), como em assets.py
+- Minificação conservadora por linha (comentários, indentação, linhas vazias);
+  o gzip faz o resto
+- Padding no fim: a ferramenta de upload corta os últimos bytes dos arquivos
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import struct
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+MAGIC = b'MMPK'
+VERSION = 1
+PADDING = b'\n' * 64
+
+FILES = [
+    'web/index.html',
+    'web/setup_wifi.html',
+    'web/css/style.css',
+    'web/js/dashboard.js',
+    'web/js/setup_wifi.js',
+]
+
+CONTENT_TYPES = {
+    'html': 'text/html',
+    'css': 'text/css',
+    'js': 'application/javascript',
+    'json': 'application/json',
+}
+
+def minify_css(text):
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.S)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    text = re.sub(r':\s+', ':', text)
+    return text.replace(';}', '}').strip()
+
+def minify_js(text):
+    out = []
+    in_block = False
+    for line in text.splitlines():
+        s = line.strip()
+        if in_block:
+            if '*/' in s:
+                in_block = False
+            continue
+        if s.startswith('/*'):
+            in_block = '*/' not in s
+            continue
+        if not s or s.startswith('//'):
+            continue
+        out.append(s)
+    return '\n'.join(out)
+
+def minify_html(text):
+    text = re.sub(r'<!--(?!\[).*?-->', '', text, flags=re.S)
+    return '\n'.join(s for s in (line.strip() for line in text.splitlines()) if s)
+
+MINIFIERS = {'css': minify_css, 'js': minify_js, 'html': minify_html}
+
+def build(files, output):
+    bodies = []
+    for path in files:
+        with open(os.path.join(ROOT, path), encoding='utf-8') as f:
+            text = f.read()
+        ext = path.rsplit('.', 1)[-1]
+        minified = MINIFIERS.get(ext, lambda t: t)(text).encode('utf-8')
+        # mtime=0: mesmo conteúdo gera o mesmo pacote (e o mesmo ETag)
+        body = gzip.compress(minified, compresslevel=9, mtime=0)
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        bodies.append((path, body, etag, CONTENT_TYPES.get(ext, 'application/octet-stream'), len(text.encode('utf-8')), len(minified)))
+
+    # Offsets dependem do tamanho do índice: calcula até estabilizar
+    offset_base = 0
+    while True:
+        entries = []
+        offset = offset_base
+        for path, body, etag, ctype, _, _ in bodies:
+            entries.append([path, offset, len(body), etag, ctype])
+            offset += len(body)
+        index = json.dumps({'version': VERSION, 'files': entries}, separators=(',', ':')).encode()
+        base = len(MAGIC) + 4 + len(index)
+        if base == offset_base:
+            break
+        offset_base = base
+
+    with open(output, 'wb') as f:
+        f.write(MAGIC + struct.pack('<I', len(index)) + index)
+        for _, body, _, _, _, _ in bodies:
+            f.write(body)
+        f.write(PADDING)
+
+    total_src = total_gz = 0
+    for path, body, etag, _, src, mini in bodies:
+        total_src += src
+        total_gz += len(body)
+        print(f"[BUNDLE] {path:<24} {src:>6} → {mini:>6} minificado → {len(body):>5} gzip  {etag}")
+    print(f"[BUNDLE] {output}: {os.path.getsize(output)} bytes ({total_src} bytes de origem, {total_gz} gzip)")
+
+def show(path):
+    with open(path, 'rb') as f:
+        magic, size = struct.unpack('<4sI', f.read(8))
+        if magic != MAGIC:
+            raise SystemExit(f"[BUNDLE] {path} não é um pacote ({magic!r})")
+        index = json.loads(f.read(size))
+        for name, offset, length, etag, ctype in index['files']:
+            f.seek(offset)
+            raw = gzip.decompress(f.read(length))
+            print(f"[BUNDLE] {name:<24} offset {offset:>6}  {length:>5} gzip  {len(raw):>6} bytes  {ctype}  {etag}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--output', default=os.path.join(ROOT, 'web.pack'))
+    parser.add_argument('--list', action='store_true', help='Mostra o índice do pacote')
+    args = parser.parse_args()
+    if args.list:
+        show(args.output)
+    else:
+        build(FILES, args.output)
+
+if __name__ == '__main__':
+    main()
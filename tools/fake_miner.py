@@ -0,0 +1,144 @@
+"""
+Fake Miner - API cgminer/bmminer simulada para testes no PC
+Sobe N mineradoras falsas em 127.0.0.1 (uma porta cada)
+
+    python tools/fake_miner.py --count 100 --dead 10 --slow 5 --config /tmp/miners.json
+
+- Responde {"command": "summary+stats"} como um Antminer (JSON + \\x00, fecha)
+- --dead: portas sem servidor (conexão recusada)
+- --slow: aceitam mas respondem depois de --delay segundos (testa timeout)
+- --truncated: fecham a conexão no meio do número do "GHS 5s" (sem \\x00)
+- --chunk: resposta enviada em pedaços de N bytes (tokens cortados entre recv())
+- --config: grava um miners.json apontando para as portas simuladas
+"""
+
+import argparse
+import json
+import random
+import selectors
+import socket
+import time
+
+def reply(i):
+    """Resposta summary+stats com valores plausíveis"""
+    ghs = round(random.uniform(95000, 110000), 2)
+    temps = [random.randint(60, 80) for _ in range(3)]
+    fans = [random.randint(5400, 6000) for _ in range(2)]
+    data = {
+        "summary": [{
+            "STATUS": [{"STATUS": "S", "When": int(time.time()), "Code": 11, "Msg": "Summary", "Description": "cgminer 4.11.1"}],
+            "SUMMARY": [{"Elapsed": 86400 + i, "GHS 5s": ghs, "GHS av": ghs - 100, "Accepted": 1000 + i,
+                         "Rejected": i % 7, "Hardware Errors": i % 3, "Utility": 1.5}],
+            "id": 1
+        }],
+        "stats": [{
+            "STATUS": [{"STATUS": "S", "When": int(time.time()), "Code": 70, "Msg": "CGMiner stats", "Description": "cgminer 4.11.1"}],
+            "STATS": [
+                {"BMMiner": "2.0.0", "Miner": "49.0.1.3", "CompileTime": "Mon Jan 1 00:00:00 CST 2024", "Type": "Antminer S19"},
+                {"STATS": 0, "ID": "BC50", "Elapsed": 86400 + i, "GHS 5s": ghs, "GHS av": ghs - 100,
+                 "fan_num": 2, "fan1": fans[0], "fan2": fans[1],
+                 "temp_num": 3, "temp1": temps[0] - 15, "temp2": temps[1] - 15, "temp3": temps[2] - 15,
+                 "temp2_1": temps[0], "temp2_2": temps[1], "temp2_3": temps[2],
+                 "chain_acn1": 76, "chain_acn2": 76, "chain_acn3": 76,
+                 "chain_acs1": " oooooooo oooooooo oooooooo oooooooo oooooooo oooooooo oooooooo oooooooo oooooooo oooo",
+                 "chain_acs2": " oooooooo oooooooo oooooooo oooooooo oooooooo oooooooo oooooooo oooooooo oooooooo oooo",
+                 "chain_acs3": " oooooooo oooooooo oooooooo oooooooo oooooooo oooooooo oooooooo oooooooo oooooooo oooo",
+                 "chain_rate1": round(ghs / 3, 2), "chain_rate2": round(ghs / 3, 2), "chain_rate3": round(ghs / 3, 2),
+                 "temp_max": max(temps), "Device Hardware%": 0.0001, "no_matching_work": 0}
+            ],
+            "id": 1
+        }],
+        "id": 1
+    }
+    return json.dumps(data).encode() + b'\x00'
+
+def truncate(body):
+    """Corta a resposta no meio do primeiro número de GHS 5s"""
+    return body[:body.index(b'"GHS 5s": ') + 12]
+
+def send(conn, body, chunk):
+    """Envia inteira ou em pedaços (com pausa: cada um chega num segmento)"""
+    if not chunk:
+        conn.sendall(body)
+        return
+    conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    for i in range(0, len(body), chunk):
+        conn.sendall(body[i:i + chunk])
+        time.sleep(0.001)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--count', type=int, default=20)
+    parser.add_argument('--base-port', type=int, default=14028)
+    parser.add_argument('--dead', type=int, default=0)
+    parser.add_argument('--slow', type=int, default=0)
+    parser.add_argument('--delay', type=float, default=10.0)
+    parser.add_argument('--truncated', type=int, default=0)
+    parser.add_argument('--chunk', type=int, default=0, help='Bytes por send() (0: resposta inteira)')
+    parser.add_argument('--config', help='Grava miners.json com os hosts simulados')
+    args = parser.parse_args()
+
+    sel = selectors.DefaultSelector()
+    hosts = []
+    for i in range(args.count):
+        port = args.base_port + i
+        hosts.append(f"127.0.0.1:{port}")
+        if i < args.dead:
+            continue  # Porta fechada: conexão recusada
+        srv = socket.socket()
+        srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        srv.bind(('127.0.0.1', port))
+        srv.listen(8)
+        srv.setblocking(False)
+        slow = i < args.dead + args.slow
+        truncated = not slow and i < args.dead + args.slow + args.truncated
+        sel.register(srv, selectors.EVENT_READ, ('listen', i, slow, truncated))
+
+    if args.config:
+        with open(args.config, 'w') as f:
+            json.dump({"port": 4028, "interval_s": 30, "timeout_ms": 3000,
+                       "max_inflight": 8, "hosts": hosts}, f, indent=2)
+        print(f"[FAKE] Configuração gravada em {args.config}")
+
+    print(f"[FAKE] {args.count} mineradoras ({args.dead} mortas, {args.slow} lentas, "
+          f"{args.truncated} truncadas) nas portas {args.base_port}-{args.base_port + args.count - 1}")
+
+    pending = []        # (horário de resposta, socket, índice, truncada)
+    served = 0
+    while True:
+        timeout = max(0, pending[0][0] - time.time()) if pending else 1.0
+        for key, _ in sel.select(timeout):
+            kind, i, slow, truncated = key.data
+            if kind == 'listen':
+                conn, _ = key.fileobj.accept()
+                conn.setblocking(False)
+                sel.register(conn, selectors.EVENT_READ, ('conn', i, slow, truncated))
+            else:
+                conn = key.fileobj
+                try:
+                    data = conn.recv(256)
+                except OSError:
+                    data = b''
+                sel.unregister(conn)
+                if not data:
+                    conn.close()
+                    continue
+                pending.append((time.time() + (args.delay if slow else 0.005), conn, i, truncated))
+                pending.sort(key=lambda p: p[0])
+
+        now = time.time()
+        while pending and pending[0][0] <= now:
+            _, conn, i, truncated = pending.pop(0)
+            body = reply(i)
+            try:
+                conn.setblocking(True)
+                send(conn, truncate(body) if truncated else body, args.chunk)
+                served += 1
+            except OSError:
+                pass
+            conn.close()
+            if served % 100 == 0:
+                print(f"[FAKE] {served} respostas")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,10 @@
+"""
+Host Sim - Monitor Miner v3.0
+Roda os servidores do ESP32 no PC (CPython) para medir desempenho
+
+- stubs/: network e machine falsos (WLAN conectada em 127.0.0.1, scan fixo)
+- mpshim: time.ticks_*/sleep_ms e gc.mem_free/mem_alloc com heap simulado
+- run.py: sobe dashboard ou setup numa cópia da árvore (data/ descartável)
+- test_miners.py: extrator e poller das mineradoras contra o fake_miner.py
+- test_history_log.py: log binário com registro incompleto no fim do segmento
+"""
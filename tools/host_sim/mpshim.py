@@ -0,0 +1,86 @@
+"""
+MicroPython shim - APIs do MicroPython sobre o CPython
+
+- time.ticks_ms/ticks_us/ticks_diff/ticks_add com o wrap de 30 bits do port
+- time.sleep_ms/sleep_us
+- gc.mem_alloc/mem_free: heap simulado (tracemalloc se trace_heap, senão fixo)
+- gc.threshold: aceito e ignorado
+"""
+
+import gc
+import time
+
+TICKS_PERIOD = 1 << 30
+TICKS_MAX = TICKS_PERIOD - 1
+TICKS_HALF = TICKS_PERIOD // 2
+
+_t0 = time.perf_counter()
+
+def ticks_ms():
+    return int((time.perf_counter() - _t0) * 1000) & TICKS_MAX
+
+def ticks_us():
+    return int((time.perf_counter() - _t0) * 1000000) & TICKS_MAX
+
+def ticks_diff(a, b):
+    d = (a - b) & TICKS_MAX
+    return d - TICKS_PERIOD if d >= TICKS_HALF else d
+
+def ticks_add(t, delta):
+    return (t + delta) & TICKS_MAX
+
+def sleep_ms(ms):
+    time.sleep(ms / 1000)
+
+def sleep_us(us):
+    time.sleep(us / 1000000)
+
+class Heap:
+    """Heap simulado do ESP32: alocado = memória rastreada desde install()"""
+
+    def __init__(self, size, trace):
+        self.size = size
+        self.trace = trace
+        self.base = 0
+        if trace:
+            import tracemalloc
+            self.tracemalloc = tracemalloc
+            tracemalloc.start()
+            self.base = tracemalloc.get_traced_memory()[0]
+
+    def alloc(self):
+        if not self.trace:
+            return self.size // 2
+        return max(self.tracemalloc.get_traced_memory()[0] - self.base, 0)
+
+    def free(self):
+        return max(self.size - self.alloc(), 0)
+
+    def mark(self):
+        """Zera o pico e retorna o alocado atual"""
+        if self.trace:
+            self.tracemalloc.reset_peak()
+        return self.alloc()
+
+    def peak_since(self, mark):
+        """Pico acima de mark desde o último mark()"""
+        if not self.trace:
+            return 0
+        return max(self.tracemalloc.get_traced_memory()[1] - self.base - mark, 0)
+
+heap = None
+
+def install(heap_size=120000, trace_heap=False):
+    """Instala as APIs em time e gc (chamar antes de importar o servidor)"""
+    global heap
+    heap = Heap(heap_size, trace_heap)
+    time.ticks_ms = ticks_ms
+    time.ticks_us = ticks_us
+    time.ticks_diff = ticks_diff
+    time.ticks_add = ticks_add
+    time.sleep_ms = sleep_ms
+    time.sleep_us = sleep_us
+    gc.mem_alloc = heap.alloc
+    gc.mem_free = heap.free
+    gc.threshold = lambda *args: None
+    return heap
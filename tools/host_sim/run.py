@@ -0,0 +1,116 @@
+"""
+Host Sim - sobe um servidor do ESP32 no PC
+
+    python tools/host_sim/run.py dashboard --port 8080
+    python tools/host_sim/run.py setup --port 8081 --trace-heap --stats /tmp/heap.json
+    python tools/host_sim/run.py dashboard --engine asyncio
+
+- Roda numa cópia da árvore (sem tools/ e .git): data/ do repositório não é tocado
+- Socket de escuta (porta 8080 do ESP32) redirecionado para 127.0.0.1:--port
+- --engine: motor HTTP (padrão: o de data/config.json, como no main.py)
+- --miners: miners.json usado no lugar de data/miners.json (ver fake_miner.py)
+- --trace-heap: gc.mem_alloc() vem do tracemalloc e o pico por rota é medido;
+  com --stats, os picos são gravados em JSON ao encerrar (SIGINT/SIGTERM)
+"""
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(os.path.dirname(HERE))
+
+SERVERS = {'dashboard': 'dashboard', 'setup': 'setup_wifi'}
+DEVICE_PORT = 8080
+
+def copy_tree(dest):
+    """Cópia dos arquivos do device (o servidor grava em data/)"""
+    ignore = shutil.ignore_patterns('.git', 'tools', '__pycache__', '*.pyc')
+    shutil.copytree(ROOT, dest, ignore=ignore, dirs_exist_ok=True)
+
+def redirect_bind(port):
+    """bind((ip, 8080)) do servidor vira bind(('127.0.0.1', port))"""
+    bind = socket.socket.bind
+
+    def patched(self, addr):
+        if isinstance(addr, tuple) and addr[1] == DEVICE_PORT:
+            addr = ('127.0.0.1', port)
+        return bind(self, addr)
+    socket.socket.bind = patched
+
+def track_peaks(heap, peaks):
+    """Pico de heap por rota, medido em volta do Router.dispatch"""
+    from router import Router
+    dispatch = Router.dispatch
+
+    def patched(self, conn, req):
+        path = req.path.split('?', 1)[0]
+        mark = heap.mark()
+        try:
+            return dispatch(self, conn, req)
+        finally:
+            peak = heap.peak_since(mark)
+            if peak > peaks.get(path, 0):
+                peaks[path] = peak
+    Router.dispatch = patched
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('server', choices=sorted(SERVERS))
+    parser.add_argument('--port', type=int, default=DEVICE_PORT)
+    parser.add_argument('--workdir', help='Árvore já copiada (padrão: diretório temporário)')
+    parser.add_argument('--miners', help='miners.json com os hosts (ex.: gerado pelo fake_miner.py)')
+    parser.add_argument('--engine', choices=['select', 'asyncio'], help='Motor HTTP (padrão: data/config.json)')
+    parser.add_argument('--heap-size', type=int, default=120000, help='Heap simulado em bytes')
+    parser.add_argument('--trace-heap', action='store_true')
+    parser.add_argument('--stats', help='Grava picos de heap por rota (JSON) ao encerrar')
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='host_sim_')
+    copy_tree(workdir)
+    if args.miners:
+        shutil.copy(args.miners, os.path.join(workdir, 'data', 'miners.json'))
+    print(f"[HOST] {args.server} em http://127.0.0.1:{args.port} (árvore em {workdir})")
+
+    sys.path.insert(0, os.path.join(HERE, 'stubs'))
+    sys.path.insert(0, HERE)
+    sys.path.insert(0, workdir)
+    os.chdir(workdir)
+
+    import mpshim
+    heap = mpshim.install(args.heap_size, args.trace_heap)
+    redirect_bind(args.port)
+
+    peaks = {}
+    if args.trace_heap:
+        track_peaks(heap, peaks)
+
+    def stop(signum, frame):
+        if args.stats:
+            with open(args.stats, 'w') as f:
+                json.dump({'heap_peaks': peaks, 'heap_size': args.heap_size}, f, indent=2)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+        os._exit(0)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    # Mesmo caminho do main.py: motor único, modo registrado com start()
+    from config_store import store
+    engine = args.engine or store.get_str('server', 'engine', 'select')
+    if engine == 'asyncio':
+        from async_server import AsyncHttpServer as Server
+    else:
+        from http_server import HttpServer as Server
+    server = Server()
+    print(f"[HOST] Motor HTTP: {server.engine}")
+    __import__(SERVERS[args.server]).start(server)
+    server.run()
+
+if __name__ == '__main__':
+    main()
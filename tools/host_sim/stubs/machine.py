@@ -0,0 +1,10 @@
+"""
+machine (stub) - reset() encerra o processo do host_sim
+"""
+
+def reset():
+    print("[HOST] machine.reset() - encerrando")
+    raise SystemExit(3)
+
+def freq(*args):
+    return 240000000
@@ -0,0 +1,71 @@
+"""
+network (stub) - WLAN simulada para o host_sim
+
+Estado compartilhado por interface; testes mudam os atributos do módulo
+(IP, CONNECT_OK, SCAN).
+"""
+
+STA_IF = 0
+AP_IF = 1
+
+STAT_IDLE = 0
+STAT_CONNECTING = 1001
+STAT_WRONG_PASSWORD = 202
+STAT_NO_AP_FOUND = 201
+STAT_CONNECT_FAIL = 203
+STAT_GOT_IP = 1010
+
+IP = '127.0.0.1'
+CONNECT_OK = True          # connect() conecta na hora ou falha com NO_AP_FOUND
+SCAN = [
+    (b'MinerFarm', b'\x24\x0a\xc4\x00\x00\x01', 6, -48, 3, False),
+    (b'MinerFarm-2G', b'\x24\x0a\xc4\x00\x00\x02', 11, -63, 4, False),
+    (b'Visitantes', b'\x24\x0a\xc4\x00\x00\x03', 1, -77, 0, False),
+]
+
+_state = {}
+
+class WLAN:
+    def __init__(self, interface=STA_IF):
+        self.interface = interface
+        self._s = _state.setdefault(interface, {
+            'active': False,
+            'connected': interface == STA_IF,   # Dashboard sobe com link
+            'status': STAT_GOT_IP if interface == STA_IF else STAT_IDLE,
+            'ifconfig': None,
+        })
+
+    def active(self, value=None):
+        if value is None:
+            return self._s['active']
+        self._s['active'] = bool(value)
+
+    def isconnected(self):
+        return self._s['connected']
+
+    def status(self, *args):
+        return self._s['status']
+
+    def connect(self, ssid=None, password=None, bssid=None):
+        if CONNECT_OK:
+            self._s['connected'] = True
+            self._s['status'] = STAT_GOT_IP
+        else:
+            self._s['status'] = STAT_NO_AP_FOUND
+
+    def disconnect(self):
+        self._s['connected'] = False
+        self._s['status'] = STAT_IDLE
+
+    def ifconfig(self, value=None):
+        if value is not None:
+            self._s['ifconfig'] = tuple(value)
+            return
+        return self._s['ifconfig'] or (IP, '255.255.255.0', IP, '8.8.8.8')
+
+    def scan(self):
+        return list(SCAN)
+
+    def config(self, *args, **kwargs):
+        if args:
+            return {'bssid': SCAN[0][1], 'channel': SCAN[0][2], 'essid': 'MonitorMiner_Setup'}.get(args[0])
@@ -0,0 +1,98 @@
+"""
+Teste do log binário - HistoryLog depois de queda de energia
+
+    python -m unittest tools/host_sim/test_history_log.py
+
+- Segmento com registro incompleto no fim (gravação cortada): o boot seguinte
+  não acrescenta atrás da cauda, a exportação CSV continua só com linhas válidas
+- Busca binária (?from=) no segmento com a cauda incompleta
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+sys.path.insert(0, ROOT)
+
+import mpshim
+mpshim.install()
+
+import http_writer
+from history_log import HistoryLog
+
+FIELDS = [('temperature', 1, 'h'), ('humidity', 1, 'h'), ('power', 1, 'i')]
+
+class Conn:
+    """Socket falso: acumula o que o writer envia"""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def send(self, data):
+        self.data += data
+        return len(data)
+
+def export_rows(log, start=0, end=0xFFFFFFFF):
+    conn = Conn()
+    w = http_writer.ChunkedWriter(conn, 'text/csv', chunked=False)
+    log.export(w, start, end)
+    w.close()
+    body = bytes(conn.data).split(b'\r\n\r\n', 1)[1].decode()
+    return [line.split(',') for line in body.splitlines()[1:]]
+
+class HistoryLogTornTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix='hist_')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def open(self):
+        return HistoryLog(FIELDS, self.dir, segment_bytes=16384, flush_records=1)
+
+    def append(self, log, ts):
+        log.append(ts, (20 + ts % 10, 50.5, 1200.0))
+
+    def check(self, rows, expected_ts):
+        self.assertEqual([int(r[0]) for r in rows], expected_ts)
+        for r in rows:
+            self.assertTrue(20 <= float(r[1]) < 30, r)
+            self.assertEqual((r[2], r[3]), ('50.5', '1200.0'), r)
+
+    def test_torn_tail(self):
+        log = self.open()
+        for ts in range(1000, 1010):
+            self.append(log, ts)
+
+        # Queda de energia no meio do próximo registro: 5 bytes de um registro de 12
+        with open(log._path(1), 'ab') as f:
+            f.write(b'\x01\x02\x03\x04\x05')
+
+        log = self.open()
+        self.assertEqual(log.stats()['records'], 10)
+        for ts in range(1010, 1020):
+            self.append(log, ts)
+        self.assertEqual(len(log.index), 2, 'lote depois da cauda vai para segmento novo')
+
+        self.check(export_rows(log), list(range(1000, 1020)))
+        self.check(export_rows(log, 1005, 1014), list(range(1005, 1015)))
+
+        # Boot seguinte: índice e exportação continuam iguais
+        log = self.open()
+        self.check(export_rows(log, 1003), list(range(1003, 1020)))
+
+    def test_stray_file(self):
+        with open(os.path.join(self.dir, 'notas.bin'), 'wb') as f:
+            f.write(b'x' * 30)
+        log = self.open()
+        self.append(log, 5)
+        self.check(export_rows(log), [5])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+"""
+Teste das mineradoras - MinerReply e MinerPoller contra o fake_miner.py
+
+    python -m unittest tools/host_sim/test_miners.py
+
+- Extrator: resposta em pedaços cortados em qualquer byte (token no meio de
+  dois recv()) dá o mesmo resultado da resposta inteira
+- Resposta truncada: número cortado no fim nunca é guardado pela metade
+- Poller de verdade (sockets, select()) contra o fake_miner em subprocesso:
+  porta recusada, mineradora que não responde (timeout), resposta truncada
+  e respostas em pedaços de 7 bytes
+"""
+
+import json
+import os
+import select
+import subprocess
+import sys
+import time
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TOOLS = os.path.dirname(HERE)
+ROOT = os.path.dirname(TOOLS)
+sys.path.insert(0, HERE)
+sys.path.insert(0, TOOLS)
+sys.path.insert(0, ROOT)
+
+import mpshim
+mpshim.install()
+
+import fake_miner
+from miner_poller import MinerPoller
+from miner_table import MinerReply
+
+BASE_PORT = 24028
+
+def expected(body):
+    """Valores que o extrator deve achar (GH/s inteiro, máximos de temp e fan)"""
+    data = json.loads(body.rstrip(b'\x00'))
+    stats = data['stats'][0]['STATS'][1]
+    temps = [v for k, v in stats.items() if k.startswith('temp') and k != 'temp_num']
+    fans = [v for k, v in stats.items() if k.startswith('fan') and k != 'fan_num']
+    return int(data['summary'][0]['SUMMARY'][0]['GHS 5s']), max(temps), max(fans), set(temps)
+
+def extract(*pieces):
+    reply = MinerReply()
+    for piece in pieces:
+        reply.feed(piece)
+    return reply
+
+class MinerReplyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.body = fake_miner.reply(3)
+        self.hashrate, self.temp, self.fan, self.temps = expected(self.body)
+
+    def check(self, reply):
+        self.assertEqual((reply.hashrate, reply.temp, reply.fan), (self.hashrate, self.temp, self.fan))
+
+    def test_whole(self):
+        self.check(extract(self.body))
+
+    def test_split_anywhere(self):
+        """Dois pedaços, corte em cada byte da resposta"""
+        for cut in range(1, len(self.body)):
+            with self.subTest(cut=cut):
+                self.check(extract(self.body[:cut], self.body[cut:]))
+
+    def test_small_chunks(self):
+        for size in (1, 2, 3, 7, 64, 512):
+            with self.subTest(size=size):
+                self.check(extract(*[self.body[i:i + size] for i in range(0, len(self.body), size)]))
+
+    def test_truncated(self):
+        """Qualquer prefixo: valor ausente (-1) ou o valor completo, nunca metade do número"""
+        for cut in range(1, len(self.body)):
+            with self.subTest(cut=cut):
+                reply = extract(self.body[:cut])
+                self.assertIn(reply.hashrate, (-1, self.hashrate))
+                self.assertTrue(reply.temp == -1 or reply.temp in self.temps)
+                self.assertTrue(reply.fan == -1 or 5400 <= reply.fan <= self.fan)
+
+    def test_truncated_in_hashrate(self):
+        reply = extract(fake_miner.truncate(self.body))
+        self.assertEqual(reply.hashrate, -1)
+
+class CountingReply(MinerReply):
+    """Conta os pedaços recebidos (prova que a resposta chegou cortada)"""
+
+    def reset(self):
+        super().reset()
+        self.pieces = 0
+
+    def feed(self, data):
+        self.pieces += 1
+        super().feed(data)
+
+class MinerPollerTest(unittest.TestCase):
+    """Mineradoras: 0 morta, 1 lenta, 2 truncada, 3 e 4 normais (pedaços de 7 bytes)"""
+
+    COUNT = 5
+    TIMEOUT_MS = 800
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = subprocess.Popen(
+            [sys.executable, '-u', os.path.join(TOOLS, 'fake_miner.py'), '--count', str(cls.COUNT),
+             '--base-port', str(BASE_PORT), '--dead', '1', '--slow', '1', '--delay', '10',
+             '--truncated', '1', '--chunk', '7'],
+            stdout=subprocess.PIPE, text=True)
+        cls.fake.stdout.readline()  # Linha de resumo: portas já em escuta
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake.kill()
+        cls.fake.wait()
+
+    def poll_all(self):
+        """Roda o poller num select() até cada mineradora ter um resultado"""
+        results = {}
+
+        def handler(idx, reply):
+            if idx not in results:
+                results[idx] = None if reply is None else (reply.hashrate, reply.temp, reply.fan, reply.pieces)
+
+        hosts = [f"127.0.0.1:{BASE_PORT + i}" for i in range(self.COUNT)]
+        poller = MinerPoller(hosts, handler, CountingReply, interval_ms=500, timeout_ms=self.TIMEOUT_MS)
+        deadline = time.time() + 5
+        while len(results) < self.COUNT and time.time() < deadline:
+            poller.run()
+            wait = poller.timeout_ms(100) / 1000
+            readable, writable, _ = select.select(poller.readers, poller.writers, [], wait)
+            for sock in writable:
+                poller.on_writable(sock)
+            for sock in readable:
+                poller.on_readable(sock)
+        poller.pause()
+        return results, poller
+
+    def test_farm(self):
+        results, poller = self.poll_all()
+        self.assertEqual(len(results), self.COUNT)
+
+        self.assertIsNone(results[0], 'porta recusada')
+        self.assertIsNone(results[1], 'sem resposta dentro do timeout')
+        self.assertGreaterEqual(poller.timeouts, 1)
+        self.assertEqual(results[2][0], -1, 'número truncado não pode virar hashrate')
+
+        for idx in (3, 4):
+            hashrate, temp, fan, pieces = results[idx]
+            self.assertTrue(95000 <= hashrate <= 110000, hashrate)
+            self.assertTrue(60 <= temp <= 80, temp)
+            self.assertTrue(5400 <= fan <= 6000, fan)
+            self.assertGreater(pieces, 1, 'resposta deveria chegar em vários recv()')
+
+if __name__ == '__main__':
+    unittest.main()
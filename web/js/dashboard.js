@@ -1,67 +1,128 @@
 // Dashboard - Monitor Miner v3.0
 console.log('[DASHBOARD] dashboard.js carregando...');
 
-// Atualizar dados
+// Estado atual (deltas do SSE são mesclados aqui)
+const state = { sensors: null };
+let pollTimer = null;
+let stream = null;
+let streamFailures = 0;
+
+// Atualizar cards dos sensores
+function renderSensors(data) {
+    // Atualizar temperatura
+    document.getElementById('temperature').textContent = 
+        data.temperature ? data.temperature.toFixed(1) + '°C' : '--°C';
+
+    // Atualizar umidade
+    document.getElementById('humidity').textContent = 
+        data.humidity ? data.humidity.toFixed(0) + '%' : '--%';
+
+    // Atualizar mineradoras
+    document.getElementById('minersTotal').textContent = data.miners.total || 0;
+    document.getElementById('minersOnline').textContent = data.miners.online || 0;
+    document.getElementById('minersOffline').textContent = data.miners.offline || 0;
+
+    // Atualizar energia
+    document.getElementById('powerConsumption').textContent = 
+        (data.power.consumption || 0).toFixed(2) + ' kW';
+    document.getElementById('powerStatus').textContent = 
+        'Status: ' + (data.power.status || 'Desconhecido');
+}
+
+// Atualizar informações do sistema
+function renderStatus(data) {
+    document.getElementById('systemVersion').textContent = data.version || '3.0';
+    document.getElementById('systemMode').textContent = data.mode || '--';
+    document.getElementById('systemIp').textContent = data.ip || '--';
+    document.getElementById('systemMemory').textContent = 
+        ((data.memory_free || 0) / 1024).toFixed(1) + ' KB';
+    
+    // Calcular uptime
+    const uptimeSeconds = data.uptime || 0;
+    const hours = Math.floor(uptimeSeconds / 3600);
+    const minutes = Math.floor((uptimeSeconds % 3600) / 60);
+    document.getElementById('systemUptime').textContent = 
+        `${hours}h ${minutes}m`;
+}
+
+// Timestamp + mostrar conteúdo
+function markUpdated() {
+    const now = new Date();
+    document.getElementById('lastUpdate').textContent = 
+        'Última atualização: ' + now.toLocaleTimeString('pt-BR');
+
+    document.getElementById('loading').style.display = 'none';
+    document.getElementById('cardsGrid').style.display = 'grid';
+    document.getElementById('systemInfo').style.display = 'block';
+}
+
+// ============================================================================
+// SSE (/api/events): estado completo ao conectar, depois só deltas
+// ============================================================================
+
+function startStream() {
+    if (!window.EventSource) {
+        startPolling();
+        return;
+    }
+
+    stream = new EventSource('/api/events');
+
+    stream.addEventListener('update', (event) => {
+        const msg = JSON.parse(event.data);
+        if (msg.sensors) {
+            state.sensors = Object.assign(state.sensors || {}, msg.sensors);
+            renderSensors(state.sensors);
+        }
+        if (msg.status) {
+            renderStatus(msg.status);
+        }
+        streamFailures = 0;
+        markUpdated();
+    });
+
+    stream.onerror = () => {
+        // EventSource reconecta sozinho; CLOSED = recusado (ex.: 503 lotado)
+        streamFailures++;
+        if (stream.readyState === EventSource.CLOSED || streamFailures >= 3) {
+            console.warn('[DASHBOARD] SSE indisponível - usando polling');
+            stream.close();
+            stream = null;
+            startPolling();
+            // Tentar o stream de novo mais tarde
+            setTimeout(() => {
+                stopPolling();
+                streamFailures = 0;
+                startStream();
+            }, 60000);
+        }
+    };
+}
+
+// ============================================================================
+// Polling (fallback quando o stream falha)
+// ============================================================================
+
 async function updateDashboard() {
     try {
-        // Buscar dados dos sensores
-        const sensorsResponse = await fetch('/api/sensors');
+        // Sensores e status em paralelo (mesma conexão keep-alive)
+        const [sensorsResponse, statusResponse] = await Promise.all([
+            fetch('/api/sensors'),
+            fetch('/api/status')
+        ]);
         const sensorsData = await sensorsResponse.json();
-
-        // Buscar status do sistema
-        const statusResponse = await fetch('/api/status');
         const statusData = await statusResponse.json();
 
         if (sensorsData.success) {
-            const data = sensorsData.data;
-
-            // Atualizar temperatura
-            document.getElementById('temperature').textContent = 
-                data.temperature ? data.temperature.toFixed(1) + '°C' : '--°C';
-
-            // Atualizar umidade
-            document.getElementById('humidity').textContent = 
-                data.humidity ? data.humidity.toFixed(0) + '%' : '--%';
-
-            // Atualizar mineradoras
-            document.getElementById('minersTotal').textContent = data.miners.total || 0;
-            document.getElementById('minersOnline').textContent = data.miners.online || 0;
-            document.getElementById('minersOffline').textContent = data.miners.offline || 0;
-
-            // Atualizar energia
-            document.getElementById('powerConsumption').textContent = 
-                (data.power.consumption || 0).toFixed(2) + ' kW';
-            document.getElementById('powerStatus').textContent = 
-                'Status: ' + (data.power.status || 'Desconhecido');
+            state.sensors = sensorsData.data;
+            renderSensors(state.sensors);
         }
 
         if (statusData.success) {
-            const data = statusData.data;
-
-            // Atualizar informações do sistema
-            document.getElementById('systemVersion').textContent = data.version || '3.0';
-            document.getElementById('systemMode').textContent = data.mode || '--';
-            document.getElementById('systemIp').textContent = data.ip || '--';
-            document.getElementById('systemMemory').textContent = 
-                ((data.memory_free || 0) / 1024).toFixed(1) + ' KB';
-            
-            // Calcular uptime
-            const uptimeSeconds = data.uptime || 0;
-            const hours = Math.floor(uptimeSeconds / 3600);
-            const minutes = Math.floor((uptimeSeconds % 3600) / 60);
-            document.getElementById('systemUptime').textContent = 
-                `${hours}h ${minutes}m`;
+            renderStatus(statusData.data);
         }
 
-        // Atualizar timestamp
-        const now = new Date();
-        document.getElementById('lastUpdate').textContent = 
-            'Última atualização: ' + now.toLocaleTimeString('pt-BR');
-
-        // Mostrar conteúdo
-        document.getElementById('loading').style.display = 'none';
-        document.getElementById('cardsGrid').style.display = 'grid';
-        document.getElementById('systemInfo').style.display = 'block';
+        markUpdated();
 
     } catch (error) {
         console.error('Erro ao atualizar dashboard:', error);
@@ -70,11 +131,20 @@ async function updateDashboard() {
     }
 }
 
-// Atualizar a cada 5 segundos
-setInterval(updateDashboard, 5000);
+function startPolling() {
+    if (pollTimer) return;
+    updateDashboard();
+    // Atualizar a cada 5 segundos
+    pollTimer = setInterval(updateDashboard, 5000);
+}
+
+function stopPolling() {
+    clearInterval(pollTimer);
+    pollTimer = null;
+}
 
-// Carregar dados ao iniciar
-window.addEventListener('load', updateDashboard);
+// Conectar ao stream ao iniciar
+window.addEventListener('load', startStream);
 
 console.log('[DASHBOARD] dashboard.js carregado!');
 
@@ -17,26 +17,54 @@ function scanNetworks() {
     networks.classList.remove('active');
     debug.textContent = 'Buscando redes...';
     
-    fetch('/api/scan')
+    // Cache do ESP32 responde na hora; refresh=1 agenda um scan novo em segundo plano
+    fetchScan('/api/scan?refresh=1', 0);
+}
+
+function fetchScan(url, attempt) {
+    const scanBtn = document.getElementById('scanBtn');
+    const loading = document.getElementById('loading');
+    const debug = document.getElementById('debug');
+
+    fetch(url)
         .then(response => response.json())
         .then(data => {
-            debug.textContent = 'Scan OK! ' + (data.networks ? data.networks.length : 0) + ' redes';
-            if (data.success && data.networks && data.networks.length > 0) {
+            const count = data.networks ? data.networks.length : 0;
+            debug.textContent = 'Scan OK! ' + count + ' redes' + (data.age_ms >= 0 ? ' (há ' + Math.round(data.age_ms / 1000) + 's)' : '');
+            if (data.success && count > 0) {
                 displayNetworks(data.networks);
-            } else {
+            } else if (!data.scanning) {
                 showEmptyState();
             }
+            // Scan em andamento: consulta de novo até o resultado novo chegar
+            if (data.scanning && attempt < 5) {
+                setTimeout(() => fetchScan('/api/scan', attempt + 1), 1500);
+                return;
+            }
+            loading.classList.remove('active');
+            scanBtn.disabled = false;
         })
         .catch(error => {
             console.error('[JS] Erro:', error);
             debug.textContent = 'Erro: ' + error.message;
-        })
-        .finally(() => {
             loading.classList.remove('active');
             scanBtn.disabled = false;
         });
 }
 
+function waitDashboard(url, attempt) {
+    // Celular volta para a rede da casa depois que o AP cai: tenta até o dashboard responder
+    fetch(url + 'api/status', {cache: 'no-store'})
+        .then(response => { if (response.ok) location.href = url; else throw new Error(response.status); })
+        .catch(() => {
+            if (attempt < 30) {
+                setTimeout(() => waitDashboard(url, attempt + 1), 1000);
+            } else {
+                showMessage('Dashboard em ' + url + ' (conecte-se à rede ' + selectedNetwork + ')', 'success');
+            }
+        });
+}
+
 function displayNetworks(list) {
     const dropdown = document.getElementById('networkSelect');
     const dropdownSection = document.getElementById('networkDropdownSection');
@@ -112,8 +140,9 @@ function connectWiFi() {
     .then(data => {
         console.log('[JS] Resposta:', data);
         if (data.success) {
-            showMessage('Conectado! Reiniciando...', 'success');
-            setTimeout(() => location.href = '/', 3000);
+            // ESP32 troca para o dashboard sem reiniciar; o AP cai em seguida
+            showMessage('Conectado! Abrindo o dashboard em ' + data.dashboard, 'success');
+            waitDashboard(data.dashboard, 0);
         } else {
             showMessage('Falha: ' + (data.error || 'Erro'), 'error');
         }